@@ -0,0 +1,374 @@
+import argparse
+import gc
+import time
+from typing import List, Optional, Tuple
+
+from ccmodel.code_models import pointers
+from ccmodel.code_models.variants import (
+    AdjustedType,
+    AnnotateAttr,
+    ArrayType,
+    AtomicType,
+    AttrFactory,
+    AttributedType,
+    AvailabilityAttr,
+    BasicType,
+    BlockPointerType,
+    BuiltinType,
+    CXXConstructorDecl,
+    CXXMethodDecl,
+    CXXRecordDecl,
+    CapturedDecl,
+    ClassTemplateDecl,
+    ClassTemplatePartialSpecializationDecl,
+    ClassTemplateSpecializationDecl,
+    ConstantArrayType,
+    DeclFactory,
+    DecltypeType,
+    DependentNameType,
+    EnumConstantDecl,
+    EnumDecl,
+    FieldDecl,
+    FriendDecl,
+    FunctionDecl,
+    FunctionProtoType,
+    FunctionTemplateDecl,
+    FunctionType,
+    IndirectFieldDecl,
+    InjectedClassNameType,
+    LinkageSpecDecl,
+    MemberPointerType,
+    NamespaceAliasDecl,
+    NamespaceDecl,
+    ParmVarDecl,
+    PointerType,
+    RecordDecl,
+    ReferenceType,
+    SentinelAttr,
+    SkippableVariant,
+    SubstTemplateTypeParmType,
+    TagDecl,
+    TagType,
+    TemplateNonTypeParmDecl,
+    TemplateSpecializationType,
+    TemplateTemplateParmDecl,
+    TemplateTypeParmDecl,
+    TemplateTypeParmType,
+    TranslationUnitDecl,
+    Type,
+    TypeAliasDecl,
+    TypeAliasTemplateDecl,
+    TypeDecl,
+    TypeFactory,
+    TypedefDecl,
+    TypedefType,
+    UsingDirectiveDecl,
+    ValueDecl,
+    VarDecl,
+    VariableArrayType,
+    VisibilityAttr
+)
+from ccmodel.reader import CcsReader, clear_pointers
+from bench_load import default_headers, find_headers
+
+# Times parsing the variants out of converted headers, e.g. the test_hh ones
+# bench_load reads, once through the kind registries and once through the
+# if/elif chains they replaced. The chains below are copied from the
+# factories as they were before the registries, and are swapped in for the
+# registry lookups for the baseline run. Stmt and expr nodes go through the
+# registries in both runs.
+
+
+class BaselineAttrFactory(object):
+
+    def create_variant(
+            obj: dict,
+            save: bool = True,
+            parent: Optional["Variant"] = None) -> "Attribute":
+
+        if obj is None:
+            return None
+
+        out = None
+        variant = obj["kind"]
+        content = obj["content"]
+
+        if content["skipped"]:
+            out = SkippableVariant.load_json(content)
+        if variant == "AvailabilityAttr":
+            out = AvailabilityAttr.load_json(content)
+        elif variant == "SentinelAttr":
+            out = SentinelAttr.load_json(content)
+        elif variant == "AnnotateAttr":
+            out = AnnotateAttr.load_json(content)
+        elif variant == "VisibilityAttr":
+            out = VisibilityAttr.load_json(content)
+        else:
+            return None
+
+        out.clang_kind = obj["clang_kind"]
+        out.kind = variant
+        out._json = obj
+        out._save = save
+        out._parent = parent
+
+        return out
+
+
+class BaselineTypeFactory(object):
+
+    def create_variant(
+            type_obj: dict,
+            parent: Optional["Variant"] = None) -> "Type":
+
+        if type_obj is None:
+            return None
+
+        out = None
+        variant = type_obj["kind"]
+        content = type_obj["content"]
+
+        if content["skipped"]:
+            out = SkippableVariant.load_json(content)
+        if variant == "AdjustedType":
+            out = AdjustedType.load_json(content)
+        elif variant == "ArrayType":
+            out = ArrayType.load_json(content)
+        elif variant == "ConstantArrayType":
+            out = ConstantArrayType.load_json(content)
+        elif variant == "VariableArrayType":
+            out = VariableArrayType.load_json(content)
+        elif variant == "AtomicType":
+            out = AtomicType.load_json(content)
+        elif variant == "AttributedType":
+            out = AttributedType.load_json(content)
+        elif variant == "BlockPointerType":
+            out = BlockPointerType.load_json(content)
+        elif variant == "BuiltinType":
+            out = BuiltinType.load_json(content)
+        elif variant == "DecltypeType":
+            out = DecltypeType.load_json(content)
+        elif variant == "FunctionType":
+            out = FunctionType.load_json(content)
+        elif variant == "FunctionProtoType":
+            out = FunctionProtoType.load_json(content)
+        elif variant == "MemberPointerType":
+            out = MemberPointerType.load_json(content)
+        elif variant == "PointerType":
+            out = PointerType.load_json(content)
+        elif variant == "ReferenceType":
+             out = ReferenceType.load_json(content)
+        elif variant == "TagType":
+            out = TagType.load_json(content)
+        elif variant == "TypedefType":
+            out = TypedefType.load_json(content)
+        elif variant == "TemplateTypeParmType":
+            out = TemplateTypeParmType.load_json(content)
+        elif variant == "SubstTemplateTypeParmType":
+            out = SubstTemplateTypeParmType.load_json(content)
+        elif variant == "TemplateSpecializationType":
+            out = TemplateSpecializationType.load_json(content)
+        elif variant == "InjectedClassNameType":
+            out = InjectedClassNameType.load_json(content)
+        elif variant == "DependentNameType":
+            out = DependentNameType.load_json(content)
+        elif variant == "RecordType":
+            out = TagType.load_json(content)
+        elif variant == "EnumType":
+            out = TagType.load_json(content)
+        elif variant == "LValueReferenceType":
+            out = BasicType.load_json(content)
+        elif variant == "RValueReferenceType":
+            out = BasicType.load_json(content)
+        elif variant == "DependentSizedArrayType":
+            out = ArrayType.load_json(content)
+        elif variant == "IncompleteArrayType":
+            out = ArrayType.load_json(content)
+        elif variant == "ParenType":
+            out = BasicType.load_json(content)
+        else:
+            out = Type.load_json(content)
+
+        out.clang_kind = type_obj["clang_kind"]
+        out.kind = variant
+        out._save = True
+        out._json = type_obj
+        out._parent = parent
+
+        return out
+
+
+class BaselineDeclFactory(object):
+
+    def create_variant(
+            obj: dict,
+            save: bool = True,
+            parent: Optional["Variant"] = None) -> "Decl":
+
+        if obj is None:
+            return None
+
+        out = None
+        variant = obj["kind"]
+        content = obj["content"]
+
+        if content is None and obj["skipped"]:
+            out = SkippableVariant.load_json(obj)
+        elif content["skipped"]:
+            out = SkippableVariant.load_json(content)
+        elif variant == "CapturedDecl":
+            out = CapturedDecl.load_json(content)
+        elif variant == "LinkageSpecDecl":
+            out = LinkageSpecDecl.load_json(content)
+        elif variant == "NamespaceDecl":
+            out = NamespaceDecl.load_json(content)
+        elif variant == "TypeDecl":
+            out = TypeDecl.load_json(content)
+        elif variant == "TagDecl":
+            out = TagDecl.load_json(content)
+        elif variant == "ValueDecl":
+            out = ValueDecl.load_json(content)
+        elif variant == "TranslationUnitDecl":
+            out = TranslationUnitDecl.load_json(content)
+        elif variant == "TypedefDecl":
+            out = TypedefDecl.load_json(content)
+        elif variant == "EnumDecl":
+            out = EnumDecl.load_json(content)
+        elif variant == "RecordDecl":
+            out = RecordDecl.load_json(content)
+        elif variant == "EnumConstantDecl":
+            out = EnumConstantDecl.load_json(content)
+        elif variant == "IndirectFieldDecl":
+            out = IndirectFieldDecl.load_json(content)
+        elif variant == "FunctionDecl":
+            out = FunctionDecl.load_json(content)
+        elif variant == "FieldDecl":
+            out = FieldDecl.load_json(content)
+        elif variant == "VarDecl":
+            out = VarDecl.load_json(content)
+        elif variant == "UsingDirectiveDecl":
+            out = UsingDirectiveDecl.load_json(content)
+        elif variant == "NamespaceAliasDecl":
+            out = NamespaceAliasDecl.load_json(content)
+        elif variant == "CXXRecordDecl":
+            out = CXXRecordDecl.load_json(content)
+        elif variant == "ClassTemplateSpecializationDecl":
+            out = ClassTemplateSpecializationDecl.load_json(content)
+        elif variant == "CXXConstructorDecl":
+            out = CXXConstructorDecl.load_json(content)
+        elif variant == "ClassTemplateDecl":
+            out = ClassTemplateDecl.load_json(content)
+        elif variant == "FunctionTemplateDecl":
+            out = FunctionTemplateDecl.load_json(content)
+        elif variant == "FriendDecl":
+            out = FriendDecl.load_json(content)
+        elif variant == "TypeAliasDecl":
+            out = TypeAliasDecl.load_json(content)
+        elif variant == "TypeAliasTemplateDecl":
+            out = TypeAliasTemplateDecl.load_json(content)
+        elif variant == "ClassTemplatePartialSpecializationDecl":
+            out = ClassTemplatePartialSpecializationDecl.load_json(content)
+        elif variant == "TemplateTypeParmDecl":
+            out = TemplateTypeParmDecl.load_json(content)
+        elif variant == "NonTypeTemplateParmDecl":
+            out = TemplateNonTypeParmDecl.load_json(content)
+        elif variant == "TemplateTemplateParmDecl":
+            out = TemplateTemplateParmDecl.load_json(content)
+        elif variant == "ParmVarDecl":
+            out = ParmVarDecl.load_json(content)
+        elif variant == "CXXMethodDecl":
+            out = CXXMethodDecl.load_json(content)
+        else:
+            return None
+
+        out.clang_kind = obj["clang_kind"]
+        out.kind = variant
+        out._save = save
+        out._json = obj
+        out._parent = parent
+
+        return out
+
+
+baseline_factories = {
+        AttrFactory: BaselineAttrFactory.create_variant,
+        TypeFactory: BaselineTypeFactory.create_variant,
+        DeclFactory: BaselineDeclFactory.create_variant
+        }
+
+
+def parse_time(out_dir: str, ccs_files: List[str]) -> Tuple[float, int]:
+    # Decoding is left out, only the factory calls are timed.
+    total = 0.
+    n_variants = 0
+    for ccs in ccs_files:
+        reader = CcsReader(out_dir)
+        header = reader.open_header(reader.find_ccs(ccs))
+        header.load_translation_unit()
+        gc.collect()
+        tic = time.perf_counter()
+        header.parse_translation_unit()
+        total += time.perf_counter() - tic
+        n_variants += len(pointers.pointer_map)
+        clear_pointers()
+    return total, n_variants
+
+
+def baseline_parse_time(
+        out_dir: str,
+        ccs_files: List[str]) -> Tuple[float, int]:
+    registries = {x: x.create_variant for x in baseline_factories}
+    try:
+        for factory, create_variant in baseline_factories.items():
+            factory.create_variant = create_variant
+        return parse_time(out_dir, ccs_files)
+    finally:
+        for factory, create_variant in registries.items():
+            factory.create_variant = create_variant
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+            description="Benchmark variant factory dispatch"
+            )
+    parser.add_argument("out_dir", help="ccm output directory")
+    parser.add_argument(
+            "headers",
+            nargs="*",
+            help="Converted headers to parse, the test_hh ones by default"
+            )
+    parser.add_argument(
+            "-n",
+            type=int,
+            default=5,
+            help="Rounds; the best one is reported"
+            )
+    args = parser.parse_args()
+
+    ccs_files = find_headers(args.out_dir, args.headers or default_headers)
+    if not len(ccs_files):
+        raise SystemExit(f"No headers found in {args.out_dir}")
+
+    chain = None
+    table = None
+    for _ in range(args.n):
+        chain_time, n_chain = baseline_parse_time(args.out_dir, ccs_files)
+        table_time, n_variants = parse_time(args.out_dir, ccs_files)
+        if n_chain != n_variants:
+            raise SystemExit(
+                    f"Baseline parsed {n_chain} variants, " +
+                    f"registries {n_variants}"
+                    )
+        chain = chain_time if chain is None else min(chain, chain_time)
+        table = table_time if table is None else min(table, table_time)
+
+    print(f"headers:  {len(ccs_files)}")
+    print(f"variants: {n_variants}")
+    print(f"chain:    {chain:.4f} [s]")
+    print(f"registry: {table:.4f} [s]")
+    print(f"speedup:  {chain / table:.2f}x")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import gc
+import os
+import time
+from typing import List
+
+from ccmodel.reader import CcsReader, clear_pointers
+
+# Times loading the test_hh headers from a ccm output directory, e.g. after
+#   ccm -f test/test_hh/class_test.hh -f test/test_hh/enumeration_test.hh
+#       -f test/test_hh/function_test.hh -dir <out_dir>
+# Each round reads every header from scratch. Reading a .ccs is split into
+# decoding the file, parsing the variants out of the decoded JSON, and
+# linking them, i.e. replacing pointers and building the id maps.
+default_headers = [
+        "class_test.ccs",
+        "enumeration_test.ccs",
+        "function_test.ccs"
+        ]
+
+
+def find_headers(out_dir: str, names: List[str]) -> List[str]:
+    out = []
+    for root, _, files in os.walk(out_dir):
+        out.extend(
+                os.path.relpath(os.path.join(root, x), out_dir) for
+                x in files if x in names
+                )
+    return sorted(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+            description="Benchmark loading the test_hh headers"
+            )
+    parser.add_argument("out_dir", help="ccm output directory")
+    parser.add_argument(
+            "-n",
+            type=int,
+            default=5,
+            help="Rounds; the best one is reported"
+            )
+    parser.add_argument(
+            "--iterative",
+            action="store_true",
+            help="Load with the explicit-stack loader"
+            )
+    args = parser.parse_args()
+
+    ccs_files = find_headers(args.out_dir, default_headers)
+    if not len(ccs_files):
+        raise SystemExit(f"No test_hh headers found in {args.out_dir}")
+
+    best = None
+    n_variants = 0
+    for _ in range(args.n):
+        times = [0., 0., 0.]
+        n_variants = 0
+        for ccs in ccs_files:
+            reader = CcsReader(args.out_dir, iterative=args.iterative)
+            gc.collect()
+            tic = time.perf_counter()
+            header = reader.open_header(reader.find_ccs(ccs))
+            header.load_translation_unit()
+            toc = time.perf_counter()
+            header.parse_translation_unit()
+            tac = time.perf_counter()
+            header.build_all_ids_map()
+            header.resolve_pointers()
+            tuc = time.perf_counter()
+            times[0] += toc - tic
+            times[1] += tac - toc
+            times[2] += tuc - tac
+            n_variants += len(header._pointer_map)
+            clear_pointers()
+        if best is None or sum(times) < sum(best):
+            best = times
+
+    print(f"headers:  {len(ccs_files)}")
+    print(f"variants: {n_variants}")
+    print(f"decode:   {best[0]:.3f} [s]")
+    print(f"parse:    {best[1]:.3f} [s]")
+    print(f"link:     {best[2]:.3f} [s]")
+    print(f"total:    {sum(best):.3f} [s]")
+    return
+
+
+if __name__ == "__main__":
+    main()
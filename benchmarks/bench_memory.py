@@ -0,0 +1,81 @@
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from typing import Iterator
+
+from ccmodel.code_models.basic import Variant
+from ccmodel.reader import CcsReader
+
+# Loads one header and reports the memory held by its variants. The shallow
+# size counts each variant object and its __dict__, if it has one, which is
+# the part a slotted layout changes. The traced total also includes the
+# decoded JSON the variants keep a reference to.
+
+
+def variant_fields(obj: Variant) -> Iterator[object]:
+    if hasattr(obj, "__dict__"):
+        yield from vars(obj).values()
+    for cls in type(obj).__mro__:
+        for attr in cls.__dict__.get("__slots__", ()):
+            if attr not in ("__dict__", "__weakref__") and hasattr(obj, attr):
+                yield getattr(obj, attr)
+    return
+
+
+def variants(root: object) -> Iterator[Variant]:
+    seen = set()
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, Variant):
+            yield obj
+            stack.extend(
+                    x for x in variant_fields(obj) if
+                    isinstance(x, (Variant, list, tuple, dict))
+                    )
+    return
+
+
+def shallow_size(obj: Variant) -> int:
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(vars(obj))
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+            description="Benchmark in-memory size of loaded variants"
+            )
+    parser.add_argument("out_dir", help="ccm output directory")
+    parser.add_argument("ccs", help=".ccs file relative to the output dir")
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    tic = time.perf_counter()
+    header = CcsReader(args.out_dir).read(args.ccs)
+    toc = time.perf_counter()
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = list(variants(header.translation_unit))
+    shallow = sum(shallow_size(x) for x in nodes)
+    print(f"load:     {toc - tic:.3f} [s]")
+    print(f"variants: {len(nodes)}")
+    print(f"shallow:  {shallow / len(nodes):.1f} [bytes/node]")
+    print(f"traced:   {traced / len(nodes):.1f} [bytes/node]")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import sys
 import pathlib
 import os
+import importlib.metadata
 from loguru import logger
 from warnings import warn
 
@@ -13,6 +14,11 @@ ccmodel_top = str(
             ).parents[0]
         )
 
+try:
+    ccmodel_version = importlib.metadata.version("ccmodel")
+except importlib.metadata.PackageNotFoundError:
+    ccmodel_version = "0.0.0"
+
 def log_parsed_objects(record):
     return record["extra"]["log_parsed"]
 
@@ -1,24 +1,57 @@
 import argparse
+import graphlib
 import os
+import shutil
 import sys
+import tempfile
 import orjson as json
 import time
+from contextlib import nullcontext
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    FIRST_COMPLETED,
+    as_completed,
+    wait
+)
 from pathlib import Path
 from warnings import warn
 from typing import (
     Tuple,
-    List
+    List,
+    Dict,
+    Optional,
+    Set
 )
 
 import ccmodel.reader as reader
-import ccmodel.code_models.pointers as pointers
-from ccmodel.code_models.basic import (
-    Name,
-    Include
+from ccmodel.manifest import (
+    CcmManifest,
+    args_hash,
+    file_fingerprint,
+    file_hash
+)
+from ccmodel.watcher import CcmWatcher
+from ccmodel.storage import (
+    ccs_format,
+    codecs,
+    index,
+    prune,
+    renumber,
+    strings
+)
+from ccmodel.storage.database import CcmDatabaseError
+from ccmodel.storage.shards import open_database
+from ccmodel.utils.files import write_file_atomic
+from ccmodel.utils.locks import FileLock, lock_path
+from ccmodel.utils.profiling import (
+    CcmProfile,
+    peak_rss_kb
 )
-from ccmodel.code_models.variants import (
-    IdContainer
+from ccmodel.utils.compile_commands import (
+    load_compile_commands,
+    group_by_args
 )
+import ccmodel.code_models.pointers as pointers
 from ccmodel.__config__ import (
     clang_config,
     ccmodel_config
@@ -36,6 +69,11 @@ ccm_cl.add_argument(
         nargs="+",
         help="List of files to parse"
         )
+ccm_cl.add_argument(
+        "--compile-commands",
+        help="Parse the translation units of a compile_commands.json",
+        default=None
+        )
 ccm_cl.add_argument(
         "-I",
         "--include-paths",
@@ -89,6 +127,137 @@ ccm_cl.add_argument(
         action="store_true",
         default=False
         )
+ccm_cl.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of parallel clang backend processes (0 for all cores)",
+        type=int,
+        default=1
+        )
+ccm_cl.add_argument(
+        "--queue-size",
+        help=(
+            "Maximum number of files in clang or waiting for conversion " +
+            "(0 for twice the job count)"
+            ),
+        type=int,
+        default=0
+        )
+ccm_cl.add_argument(
+        "--no-pipeline",
+        help=(
+            "Run all clang invocations before any post-processing " +
+            "(always the case with one job)"
+            ),
+        action="store_true",
+        default=False
+        )
+ccm_cl.add_argument(
+        "--watch",
+        help="Stay resident, reparsing files as they or their includes change",
+        action="store_true",
+        default=False
+        )
+ccm_cl.add_argument(
+        "--watch-poll",
+        help="Poll for changes even if file system events are available",
+        action="store_true",
+        default=False
+        )
+ccm_cl.add_argument(
+        "--watch-interval",
+        help="Seconds between polls in watch mode",
+        type=float,
+        default=1.0
+        )
+ccm_cl.add_argument(
+        "--watch-settle",
+        help="Seconds without changes before a burst of changes is rebuilt",
+        type=float,
+        default=0.5
+        )
+ccm_cl.add_argument(
+        "--include-depth",
+        help=(
+            "Include levels processed by --process-main-includes " +
+            "(-1 for the full closure)"
+            ),
+        type=int,
+        default=1
+        )
+ccm_cl.add_argument(
+        "--profile",
+        help="Write per-stage and per-file timings and sizes to this file",
+        default=None
+        )
+ccm_cl.add_argument(
+        "--profile-cprofile",
+        help=(
+            "Also dump a cProfile of the driver process for each stage " +
+            "next to the --profile report"
+            ),
+        action="store_true",
+        default=False
+        )
+ccm_cl.add_argument(
+        "--format",
+        help=(
+            "On-disk .ccs format; binary splits the file into sections " +
+            "that can be read on their own"
+            ),
+        choices=ccs_format.formats,
+        default="json"
+        )
+ccm_cl.add_argument(
+        "--compress",
+        help="Compress .ccs output with this codec",
+        choices=codecs.codecs,
+        default="none"
+        )
+ccm_cl.add_argument(
+        "--index",
+        help=(
+            "Write a .idx offset index next to each .ccs for random " +
+            "access by qualified name or pointer"
+            ),
+        action="store_true",
+        default=False
+        )
+ccm_cl.add_argument(
+        "--out-db",
+        help=(
+            "Store translation units in this SQLite database instead of " +
+            ".ccs files under the ccm directory"
+            ),
+        default=None
+        )
+ccm_cl.add_argument(
+        "--shards",
+        help=(
+            "Split the --out-db database into this many shard files " +
+            "under a directory, with a global symbol table"
+            ),
+        type=int,
+        default=0
+        )
+ccm_cl.add_argument(
+        "--keep-path",
+        help=(
+            "Only write declarations located in files matching this glob " +
+            "(repeatable)"
+            ),
+        action="append",
+        default=[]
+        )
+ccm_cl.add_argument(
+        "--drop-path",
+        help=(
+            "Leave out declarations located in files matching this glob " +
+            "(repeatable)"
+            ),
+        action="append",
+        default=[]
+        )
 ccm_cl.add_argument(
         "--pretty",
         help="Pretty print JSON out",
@@ -102,6 +271,7 @@ class CcmOpt(object):
     def __init__(self):
         self.verbosity = None
         self.out_dir = None
+        self.scratch_dir = None
         self.delete_out = False
         self.use_docker = False
         self.force = False
@@ -110,12 +280,33 @@ class CcmOpt(object):
         self.include_paths = []
         self.recursion_level = -1
         self.process_main_includes = False
+        self.include_depth = 1
+        self.profile = None
+        self.format = "json"
+        self.compress = "none"
+        self.index = False
+        self.out_db = None
+        self.shards = 0
+        self.keep_paths = []
+        self.drop_paths = []
+        self.profile_cprofile = False
         self.clang_args = []
+        self.file_args = {}
+        self.jobs = 1
+        self.queue_size = 0
+        self.pipeline = True
+        self.watch = False
+        self.watch_poll = False
+        self.watch_interval = 1.0
+        self.watch_settle = 0.5
         return
 
 ccm_opt = CcmOpt()
 include_stage = False
-main_includes = []
+manifest = None
+profile = None
+# Largest docker batch in pipeline mode.
+max_pipeline_batch = 8
 
 def handle_command_line() -> Tuple[argparse.Namespace, argparse.Namespace]:
 
@@ -125,11 +316,31 @@ def handle_command_line() -> Tuple[argparse.Namespace, argparse.Namespace]:
     ccm_opt.delete_out_dir = ccm.delete_out
     ccm_opt.use_docker = ccm.use_docker
     ccm_opt.force = ccm.force
-    ccm_opt.ccm_files = ccm.files
+    ccm_opt.ccm_files = ccm.files if ccm.files is not None else []
     ccm_opt.pretty = ccm.pretty
     ccm_opt.include_paths.extend(ccm.include_paths)
     ccm_opt.recursion_level = ccm.recursion_level
     ccm_opt.process_main_includes = ccm.process_main_includes
+    ccm_opt.include_depth = ccm.include_depth
+    ccm_opt.profile = ccm.profile
+    ccm_opt.format = ccm.format
+    ccm_opt.compress = ccm.compress
+    ccm_opt.index = ccm.index
+    if ccm.out_db is not None:
+        ccm_opt.out_db = os.path.abspath(ccm.out_db)
+    ccm_opt.shards = ccm.shards
+    ccm_opt.keep_paths = ccm.keep_path
+    ccm_opt.drop_paths = ccm.drop_path
+    ccm_opt.profile_cprofile = ccm.profile_cprofile
+    ccm_opt.jobs = ccm.jobs if ccm.jobs > 0 else os.cpu_count()
+    ccm_opt.queue_size = (
+            ccm.queue_size if ccm.queue_size > 0 else 2 * ccm_opt.jobs
+            )
+    ccm_opt.pipeline = not ccm.no_pipeline
+    ccm_opt.watch = ccm.watch
+    ccm_opt.watch_poll = ccm.watch_poll
+    ccm_opt.watch_interval = ccm.watch_interval
+    ccm_opt.watch_settle = ccm.watch_settle
 
     for file_idx in range(len(ccm_opt.ccm_files)):
         if not ccm_opt.ccm_files[file_idx].startswith(os.sep):
@@ -141,11 +352,30 @@ def handle_command_line() -> Tuple[argparse.Namespace, argparse.Namespace]:
                 os.getcwd(),
                 ccm_opt.out_dir
                 )
+    if ccm.compile_commands is not None:
+        ccm_opt.file_args = load_compile_commands(ccm.compile_commands)
+        ccm_opt.ccm_files.extend(
+                [
+                    x for x in ccm_opt.file_args.keys() if
+                    x not in ccm_opt.ccm_files
+                    ]
+                )
 
     ccm_opt.clang_args.extend(clang)
     for path in ccm_opt.include_paths:
         ccm_opt.clang_args.extend(["-I", path])
 
+    if ccm_opt.index and ccm_opt.compress != "none":
+        ccmodel_config.logger.bind(stage_log=True, color="red").error(
+                "--index needs uncompressed output\n"
+                )
+        sys.exit(-1)
+    if ccm_opt.shards > 0 and ccm_opt.out_db is None:
+        ccmodel_config.logger.bind(stage_log=True, color="red").error(
+                "--shards needs --out-db\n"
+                )
+        sys.exit(-1)
+
     globs = [x for x in ccm_opt.ccm_files if "*" in x]
     if len(ccm_opt.ccm_files) == 0 or len(globs):
         ccmodel_config.logger.bind(stage_log=True, color="red").error(
@@ -155,60 +385,231 @@ def handle_command_line() -> Tuple[argparse.Namespace, argparse.Namespace]:
 
     return
 
-def set_main_include_paths() -> bool:
-    ccm_opt.ccm_files = []
-    for main_inc in main_includes:
-        search_path = main_inc.search_path
-        file_ = main_inc.file
-        ccm_opt.ccm_files.append(file_)
-    ccm_opt.ccm_files = list(set(ccm_opt.ccm_files))
-    return bool(len(ccm_opt.ccm_files))
+def get_out_paths(
+        file_: str,
+        out_dir: str,
+        scratch_dir: Optional[str] = None) -> Tuple[str, str]:
+    rel_dir = os.path.dirname(file_).lstrip(os.sep)
+    basename_noext = os.path.basename(file_).split(".")[0]
+    clang_name = basename_noext + "-clang.json"
+    ccs_name = basename_noext + ".ccs"
+
+    # Raw clang output goes to this run's scratch directory, so concurrent
+    # runs sharing an out dir never see each other's partial files.
+    clang_file = os.path.join(
+            scratch_dir if scratch_dir is not None else out_dir,
+            rel_dir,
+            clang_name)
+    ccs_file = os.path.join(
+            out_dir,
+            rel_dir,
+            ccs_name)
+    return ccs_file, clang_file
+
+def get_clang_out() -> None:
+    for file_ in ccm_opt.ccm_files:
+        ccs_file, clang_file = get_out_paths(
+                file_,
+                ccm_opt.out_dir,
+                ccm_opt.scratch_dir
+                )
+        yield ccs_file, clang_file, file_
+    return
+
+def run_clang_backend(
+        tool_type: int,
+        files: List[str],
+        file_args: List[str],
+        opt: CcmOpt) -> List[Tuple[str, bool, dict]]:
+
+    tic = time.perf_counter()
+    clang_out_dir = (
+            opt.scratch_dir if opt.scratch_dir is not None else opt.out_dir
+            )
+    clang_files = [
+            get_out_paths(file_, opt.out_dir, opt.scratch_dir)[1] for
+            file_ in files
+            ]
+    for clang_file in clang_files:
+        if os.path.exists(clang_file):
+            os.remove(clang_file)
+
+    if tool_type == clang_config.ToolType.DOCKER:
+        cp.docker_command(
+                files,
+                opt.include_paths,
+                clang_out_dir,
+                opt.verbosity > 1,
+                opt.recursion_level,
+                [*opt.clang_args, *file_args],
+                opt.pretty
+                )
+    elif tool_type == clang_config.ToolType.PLUGIN:
+        cp.command(
+                files,
+                opt.include_paths,
+                clang_out_dir,
+                opt.verbosity > 1,
+                os.path.join(ctu.clang_tool_path, "libtooling"),
+                "clang_tool.dylib",
+                opt.recursion_level,
+                [*opt.clang_args, *file_args],
+                opt.pretty
+                )
 
-def call_clang() -> None:
+    toc = time.perf_counter()
+
+    # One backend call covers the whole batch, so each file is charged an
+    # equal share of it and the profile totals add up to the wall time.
+    results = []
+    for file_, clang_file in zip(files, clang_files):
+        ok = os.path.exists(clang_file)
+        results.append(
+                (
+                    file_,
+                    ok,
+                    {
+                        "backend_time": (toc - tic) / len(files),
+                        "backend_batch": len(files),
+                        "backend_peak_rss_kb": peak_rss_kb(True),
+                        "clang_json_bytes": (
+                            os.path.getsize(clang_file) if ok else 0
+                            )
+                        }
+                    )
+                )
+    return results
+
+def split_files(files: List[str], n_chunks: int) -> List[List[str]]:
+    n_chunks = max(1, min(n_chunks, len(files)))
+    return [files[idx::n_chunks] for idx in range(n_chunks)]
+
+def clang_tasks(
+        max_batch: Optional[int] = None) -> List[Tuple[List[str], List[str]]]:
+    # Files sharing an effective argument set can share a backend call. Only
+    # the docker backend gains from that, since each call starts a container,
+    # so its files are split only as far as the job count, or into batches of
+    # at most max_batch files. The plugin backend runs one clang per file
+    # either way, and single files balance best across the workers.
+    tasks = []
+    for files, file_args in group_by_args(
+            ccm_opt.ccm_files,
+            ccm_opt.file_args
+            ):
+        n_chunks = len(files)
+        if clang_config.tool_type == clang_config.ToolType.DOCKER:
+            n_chunks = ccm_opt.jobs
+            if max_batch is not None:
+                n_chunks = max(n_chunks, -(-len(files) // max_batch))
+        tasks.extend(
+                [
+                    (chunk, file_args) for
+                    chunk in split_files(files, n_chunks)
+                    ]
+                )
+    return tasks
+
+def output_format(opt: Optional[CcmOpt] = None) -> str:
+    opt = opt if opt is not None else ccm_opt
+    label = ccs_format.format_label(
+            opt.format,
+            opt.compress,
+            opt.index
+            )
+    if len(opt.keep_paths) or len(opt.drop_paths):
+        # Different filters produce different output, so they are part of
+        # the format a .ccs is checked against.
+        label += "+paths-" + args_hash(
+                ["--keep-path", *opt.keep_paths, "--drop-path", *opt.drop_paths]
+                )[:8]
+    if opt.out_db is not None:
+        label += f"@{opt.out_db}"
+    return label
+
+def backend_version() -> str:
+    return f"clang-{ctu.clang_version_req}"
+
+def file_clang_args(file_: str) -> List[str]:
+    return [*ccm_opt.clang_args, *ccm_opt.file_args.get(file_, [])]
+
+def report_clang_results(results: List[Tuple[str, bool, dict]]) -> None:
+    failed = [file_ for file_, ok, _ in results if not ok]
+    if profile is not None:
+        for file_, _, stats in results:
+            profile.add_file(file_, stats)
+    for file_ in failed:
+        ccmodel_config.logger.bind(stage_log=True, color="red")\
+                .opt(colors=True)\
+                .error(
+                f"Clang produced no output for {os.path.relpath(file_)}\n"
+                )
+    ccm_opt.ccm_files = [
+            file_ for file_ in ccm_opt.ccm_files if
+            file_ not in failed
+            ]
+    return
+
+def prepare_backend() -> None:
 
     pre_processing_notification = ""
     if include_stage:
         pre_processing_notification = "Begin processing of main includes\n"
     else:
         pre_processing_notification = "Begin clang preprocessing\n"
+    # The include stage can run on its own when every root is up-to-date.
+    if clang_config.tool_type == clang_config.ToolType.INVALID:
         clang_config.use_docker = ccm_opt.use_docker
         clang_config._find_tool()
 
-
     ccmodel_config.logger.bind(stage_log=True).info(
             pre_processing_notification
             )
 
-    tic = time.perf_counter()
-    if clang_config.tool_type == clang_config.ToolType.DOCKER:
-        cp.docker_command(
-                ccm_opt.ccm_files,
-                ccm_opt.include_paths,
-                ccm_opt.out_dir,
-                ccm_opt.verbosity > 1,
-                ccm_opt.recursion_level,
-                ccm_opt.clang_args,
-                ccm_opt.pretty
-                )
-    elif clang_config.tool_type == clang_config.ToolType.PLUGIN:
-        cp.command(
-                ccm_opt.ccm_files,
-                ccm_opt.include_paths,
-                ccm_opt.out_dir,
-                ccm_opt.verbosity > 1,
-                os.path.join(ctu.clang_tool_path, "libtooling"),
-                "clang_tool.dylib",
-                ccm_opt.recursion_level,
-                ccm_opt.clang_args,
-                ccm_opt.pretty
-                )
-    else:
+    if clang_config.tool_type not in (
+            clang_config.ToolType.DOCKER,
+            clang_config.ToolType.PLUGIN
+            ):
         ccmodel_config.logger.bind(stage_log=True, color="red")\
                 .opt(colors=True)\
                 .error(
                 "Clang tool backend type resolution failed\n"
                 )
         sys.exit(-1)
+
+    return
+
+def call_clang() -> Dict[str, dict]:
+
+    prepare_backend()
+
+    tic = time.perf_counter()
+    results = []
+    tasks = clang_tasks()
+    snapshots = {x: source_snapshot(x) for x in ccm_opt.ccm_files}
+    if ccm_opt.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(
+                max_workers=min(ccm_opt.jobs, len(tasks))
+                ) as pool:
+            futures = [
+                    pool.submit(
+                        run_clang_backend,
+                        clang_config.tool_type,
+                        *task,
+                        ccm_opt
+                        ) for task in tasks
+                    ]
+            for future in as_completed(futures):
+                results.extend(future.result())
+    else:
+        for task in tasks:
+            results.extend(
+                    run_clang_backend(
+                        clang_config.tool_type,
+                        *task,
+                        ccm_opt
+                        )
+                    )
+    report_clang_results(results)
     toc = time.perf_counter()
 
     ccmodel_config.logger.bind(stage_log=True, color="green")\
@@ -217,26 +618,7 @@ def call_clang() -> None:
             f"Clang preprocessing complete in {toc - tic} [s]\n\n"
             )
 
-    return
-
-def get_clang_out() -> None:
-    for file_ in ccm_opt.ccm_files:
-        clang_out_dir = os.path.join(
-                ccm_opt.out_dir,
-                os.path.dirname(file_).lstrip(os.sep)
-                )
-        basename_noext = os.path.basename(file_).split(".")[0]
-        clang_name = basename_noext + "-clang.json"
-        ccs_name = basename_noext + ".ccs"
-
-        clang_file = os.path.join(
-                clang_out_dir,
-                clang_name)
-        ccs_file = os.path.join(
-                clang_out_dir,
-                ccs_name)
-        yield ccs_file, clang_file, file_
-    return
+    return snapshots
 
 def remove_host(path: str) -> str:
     if path.startswith(os.sep + "host"):
@@ -245,98 +627,432 @@ def remove_host(path: str) -> str:
                 os.sep + "host"
                 )
         path_out = os.sep + path_out
-        return os.path.normpath(out)
+        return os.path.normpath(path_out)
     return os.path.normpath(path)
 
-def ccm_process() -> None:
-    global main_includes
+def scan_translation_unit(data: dict) -> Tuple[Set[str], int]:
+    # The backend only records the main file's own inclusion directives, so
+    # the rest of the include closure is recovered from the files that
+    # contributed declarations to the translation unit. The same walk counts
+    # declarations for profiling.
+    files = set()
+    n_decls = 0
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if type(node) is dict:
+            if "begin" in node and "end" in node:
+                file_ = node.get("file")
+                if type(file_) is str:
+                    files.add(file_)
+            kind = node.get("kind")
+            if type(kind) is str and kind.endswith("Decl"):
+                n_decls += 1
+            stack.extend(node.values())
+        elif type(node) is list:
+            stack.extend(node)
+    return files, n_decls
+
+def source_snapshot(full_file: str) -> dict:
+    # Taken before clang is handed the file, so that an edit made while it
+    # runs shows up as a change on the next build instead of being recorded
+    # as what the .ccs was built from. Only the dependencies of the last
+    # build are known at this point.
+    dependencies = {}
+    for dep, recorded in recorded_dependencies(full_file).items():
+        if os.path.isfile(dep):
+            dependencies[dep] = file_fingerprint(dep, recorded)
+    return {
+            "started": time.time(),
+            "m_time": os.path.getmtime(full_file),
+            "source_hash": file_hash(full_file),
+            "dependencies": dependencies
+            }
+
+def fingerprint_dependencies(
+        full_file: str,
+        includes: List[dict],
+        source_files: Set[str],
+        snapshot: Optional[dict] = None) -> Dict[str, dict]:
+    # Dependencies fingerprinted in the snapshot keep that fingerprint. A
+    # file first seen in clang's output is fingerprinted now, unless it was
+    # modified after the snapshot and may not be what clang read: that one
+    # is recorded without a hash, which the next build takes as a change.
+    taken = snapshot["dependencies"] if snapshot is not None else {}
+    started = snapshot["started"] if snapshot is not None else None
+    dep_files = set(inc["file"] for inc in includes)
+    dep_files.update(source_files)
+    dep_files.discard(full_file)
+    dependencies = {}
+    for dep in sorted(dep_files):
+        if dep in taken:
+            dependencies[dep] = taken[dep]
+            continue
+        if not os.path.isfile(dep):
+            continue
+        fingerprint = file_fingerprint(dep)
+        if started is not None and fingerprint["m_time"] >= started:
+            fingerprint = {"m_time": None, "size": None, "hash": None}
+        dependencies[dep] = fingerprint
+    return dependencies
 
-    main_includes = []
-    for ccs_file, clang_file, full_file in get_clang_out():
+def recorded_dependencies(full_file: str) -> Dict[str, dict]:
+    entry = manifest[full_file]
+    return entry.get("dependencies", {}) if entry is not None else {}
 
-        tic = time.perf_counter()
+def convert_clang_output(
+        ccs_file: str,
+        clang_file: str,
+        full_file: str,
+        opt: CcmOpt,
+        snapshot: Optional[dict] = None) -> Tuple[dict, dict]:
+
+    tic = time.perf_counter()
+    if snapshot is not None:
+        m_time = snapshot["m_time"]
+        source_hash = snapshot["source_hash"]
+    else:
         m_time = os.path.getmtime(full_file)
-        with open(clang_file, "rb") as data_file:
-            data = json.loads(data_file.read())
+        source_hash = file_hash(full_file)
+    clang_args = [*opt.clang_args, *opt.file_args.get(full_file, [])]
+    with open(clang_file, "rb") as data_file:
+        raw = data_file.read()
+    read_toc = time.perf_counter()
+    data = strings.replace_none_sentinels(json.loads(raw))
+    decode_toc = time.perf_counter()
+
+    source_files, n_decls = scan_translation_unit(data)
+    scan_toc = time.perf_counter()
 
-        full_file = remove_host(full_file)
+    full_file = remove_host(full_file)
+    for inc in data["content"]["includes"]:
+        inc["search_path"] = remove_host(inc["search_path"])
+        inc["file"] = remove_host(inc["file"])
+    source_files = set(remove_host(x) for x in source_files)
+    host_toc = time.perf_counter()
 
-        for inc in data["content"]["includes"]:
-            inc["search_path"] = remove_host(inc["search_path"])
-            inc["file"] = remove_host(inc["file"])
+    dependencies = fingerprint_dependencies(
+            full_file,
+            data["content"]["includes"],
+            source_files,
+            snapshot
+            )
+    dep_toc = time.perf_counter()
+
+    n_pruned, n_stubs = prune.prune_translation_unit(
+            data,
+            opt.keep_paths,
+            opt.drop_paths
+            )
+    # The header counts the declarations the .ccs actually holds.
+    n_kept = n_decls
+    if n_pruned:
+        n_kept = scan_translation_unit(data)[1]
+    prune_toc = time.perf_counter()
 
-        out = {
-                "file": full_file,
-                "includes": data["content"]["includes"],
-                "m_time": m_time,
-                "translation_unit": data
-                }
+    out = {
+            "file": full_file,
+            "includes": data["content"]["includes"],
+            "m_time": m_time,
+            "dependencies": dependencies,
+            "tool_version": ccmodel_config.ccmodel_version,
+            "backend": backend_version(),
+            "format": output_format(opt),
+            "source_hash": source_hash,
+            "args_hash": args_hash(clang_args),
+            "pointer_count": renumber.renumber_pointers(data),
+            "decl_count": n_kept,
+            "none_as_null": True,
+            "string_table": strings.intern_strings(data),
+            "translation_unit": data
+            }
+    intern_toc = time.perf_counter()
 
-        main_includes.extend(
-                [Include.load_json(x) for x in out["includes"]]
+    # Database rows carry declaration offsets when the payload is left
+    # uncompressed. A compressed payload still gets its rows, without them.
+    index_entries = None
+    if opt.index or (opt.out_db is not None and opt.compress == "none"):
+        index_entries = []
+    serialized = ccs_format.encode_ccs(
+            out,
+            opt.format,
+            opt.pretty,
+            opt.compress,
+            index_entries
+            )
+    if opt.out_db is not None and index_entries is None:
+        index_entries = index.collect_entries(
+                out["translation_unit"],
+                out["string_table"]
                 )
-        with open(ccs_file, "wb") as out_file:
-            if ccm_opt.pretty:
-                out_file.write(
-                        json.dumps(
-                            out,
-                            option=json.OPT_INDENT_2
+    serialize_toc = time.perf_counter()
+
+    ccs_key = os.path.relpath(ccs_file, opt.out_dir)
+    if opt.out_db is not None:
+        database = open_database(opt.out_db, opt.shards)
+        database.write_header(
+                ccs_key,
+                out,
+                ccs_format.format_label(opt.format, opt.compress),
+                serialized,
+                index_entries
+                )
+        database.close()
+    else:
+        write_file_atomic(ccs_file, serialized)
+        idx_file = index.index_path(ccs_file)
+        if opt.index:
+            write_file_atomic(
+                    idx_file,
+                    index.encode_index(
+                        index_entries,
+                        len(serialized),
+                        out["string_table"]
                         )
                     )
-            else:
-                out_file.write(
-                        json.dumps(
-                            out
-                            )
-                        )
-        toc = time.perf_counter()
+        elif os.path.exists(idx_file):
+            os.remove(idx_file)
 
-        ccmodel_config.logger.bind(stage_log=True).info(
-                f"{os.path.relpath(full_file)} parsed in {toc - tic} [s]\n"
-                )
+    os.remove(clang_file)
+    toc = time.perf_counter()
+
+    entry = {
+            "ccs": ccs_key,
+            "m_time": m_time,
+            "includes": out["includes"],
+            "dependencies": out["dependencies"]
+            }
+    if opt.out_db is not None:
+        entry["db"] = opt.out_db
+    stats = {
+            "convert_time": toc - tic,
+            "read_time": read_toc - tic,
+            "decode_time": decode_toc - read_toc,
+            "scan_time": scan_toc - decode_toc,
+            "remove_host_time": host_toc - scan_toc,
+            "dependency_time": dep_toc - host_toc,
+            "prune_time": prune_toc - dep_toc,
+            "renumber_intern_time": intern_toc - prune_toc,
+            "serialize_time": serialize_toc - intern_toc,
+            "write_time": toc - serialize_toc,
+            "read_bytes": len(raw),
+            "written_bytes": len(serialized),
+            "declarations": n_decls,
+            "pruned_declarations": n_pruned,
+            "stub_declarations": n_stubs,
+            "includes": len(out["includes"]),
+            "dependencies": len(out["dependencies"]),
+            "convert_peak_rss_kb": peak_rss_kb()
+            }
+    return entry, stats
+
+def report_ccs_written(full_file: str, entry: dict, stats: dict) -> None:
+    entry["clang_args"] = file_clang_args(full_file)
+    entry["format"] = output_format()
+    manifest.update(full_file, entry)
+    if profile is not None:
+        profile.add_file(full_file, stats)
+    ccmodel_config.logger.bind(stage_log=True).info(
+            f"{os.path.relpath(full_file)} parsed in " +
+            f"{stats['convert_time']} [s]\n"
+            )
+    return
+
+def ccm_process(snapshots: Dict[str, dict]) -> None:
+    jobs = list(get_clang_out())
+    if ccm_opt.jobs > 1 and len(jobs) > 1:
+        # Workers hand back only the include list, so the parent never holds
+        # more than the bookkeeping for a translation unit.
+        with ProcessPoolExecutor(
+                max_workers=min(ccm_opt.jobs, len(jobs))
+                ) as pool:
+            futures = {
+                    pool.submit(
+                        convert_clang_output,
+                        ccs_file,
+                        clang_file,
+                        full_file,
+                        ccm_opt,
+                        snapshots.get(full_file)
+                        ): full_file for
+                    ccs_file, clang_file, full_file in jobs
+                    }
+            for future in as_completed(futures):
+                entry, stats = future.result()
+                report_ccs_written(futures[future], entry, stats)
+    else:
+        for ccs_file, clang_file, full_file in jobs:
+            entry, stats = convert_clang_output(
+                    ccs_file,
+                    clang_file,
+                    full_file,
+                    ccm_opt,
+                    snapshots.get(full_file)
+                    )
+            report_ccs_written(full_file, entry, stats)
 
-        os.remove(clang_file)
+    return
+
+def pipeline_workers(jobs: int) -> Tuple[int, int]:
+    # Both stages share the one job budget, clang getting the larger half.
+    clang_jobs = max(1, (jobs + 1) // 2)
+    return clang_jobs, max(1, jobs - clang_jobs)
+
+def pipeline_ccm() -> None:
+
+    prepare_backend()
+
+    tic = time.perf_counter()
+    clang_jobs, convert_jobs = pipeline_workers(ccm_opt.jobs)
+    # Small batches let conversion start soon after a file lands, and let
+    # every clang worker hold one within the queue bound.
+    max_batch = min(max_pipeline_batch, ccm_opt.queue_size // clang_jobs)
+    tasks = list(reversed(clang_tasks(max(1, max_batch))))
+    results = []
+    snapshots = {}
+    clang_pending = {}
+    convert_pending = {}
+    # Files handed to clang whose output has not been converted yet.
+    n_pending = 0
+    with ProcessPoolExecutor(max_workers=clang_jobs) as clang_pool, \
+            ProcessPoolExecutor(max_workers=convert_jobs) as convert_pool:
+        while tasks or clang_pending or convert_pending:
+            # Clang is only fed while the queue has room for the whole batch,
+            # which caps the -clang.json files sitting on disk at any one
+            # time. An idle pipeline always takes the next batch.
+            while (
+                    tasks and
+                    len(clang_pending) < clang_jobs and
+                    (
+                        n_pending == 0 or
+                        n_pending + len(tasks[-1][0]) <= ccm_opt.queue_size
+                        )
+                    ):
+                files, file_args = tasks.pop()
+                snapshots.update((x, source_snapshot(x)) for x in files)
+                clang_pending[
+                        clang_pool.submit(
+                            run_clang_backend,
+                            clang_config.tool_type,
+                            files,
+                            file_args,
+                            ccm_opt
+                            )
+                        ] = None
+                n_pending += len(files)
+            done, _ = wait(
+                    [*clang_pending, *convert_pending],
+                    return_when=FIRST_COMPLETED
+                    )
+            for future in done:
+                if future in clang_pending:
+                    del clang_pending[future]
+                    for file_, ok, stats in future.result():
+                        results.append((file_, ok, stats))
+                        if not ok:
+                            del snapshots[file_]
+                            n_pending -= 1
+                            continue
+                        ccs_file, clang_file = get_out_paths(
+                                file_,
+                                ccm_opt.out_dir,
+                                ccm_opt.scratch_dir
+                                )
+                        convert_pending[
+                                convert_pool.submit(
+                                    convert_clang_output,
+                                    ccs_file,
+                                    clang_file,
+                                    file_,
+                                    ccm_opt,
+                                    snapshots.pop(file_)
+                                    )
+                                ] = file_
+                else:
+                    full_file = convert_pending.pop(future)
+                    n_pending -= 1
+                    entry, stats = future.result()
+                    report_ccs_written(full_file, entry, stats)
+    report_clang_results(results)
+    toc = time.perf_counter()
+
+    ccmodel_config.logger.bind(stage_log=True, color="green")\
+            .opt(colors=True)\
+            .info(
+            "Clang preprocessing and conversion complete in " +
+            f"{toc - tic} [s]\n\n"
+            )
 
     return
 
 def check_for_updates() -> None:
     if not bool(len(ccm_opt.ccm_files)):
         return
-    remove_files = []
+    remove_files = set()
+    checked = {}
     for file_ in ccm_opt.ccm_files:
-        basename = os.path.basename(file_)
-        ccs_filename = basename.split(".")[0] + ".ccs"
-        
-        ccs_path = os.path.join(
-                ccm_opt.out_dir,
-                os.path.dirname(file_).lstrip(os.sep),
-                ccs_filename)
-
-        if os.path.exists(ccs_path):
-            with open(ccs_path, "rb") as ccs_file:
-                data = json.loads(ccs_file.read())
-            src_mtime = os.path.getmtime(file_)
-            data_mtime = data["m_time"]
-            if src_mtime == data_mtime:
-                rel_file = os.path.relpath(file_)
-                if ccm_opt.force:
-                    ccmodel_config.logger.bind(stage_log=True).info(
-                            f"Force update {rel_file}\n"
-                            )
-                    continue
-                ccmodel_config.logger.bind(stage_log=True).info(
-                        f"{rel_file} up-to-date\n"
-                        )
-                remove_files.append(file_)
+        rel_file = os.path.relpath(file_)
+        stale_reason = manifest.stale_reason(
+                file_,
+                checked,
+                file_clang_args(file_),
+                output_format()
+                )
+        if (
+                stale_reason == "no manifest entry" and
+                ccm_opt.format == "binary" and
+                ccm_opt.out_db is None and
+                manifest.adopt(
+                    file_,
+                    get_out_paths(file_, ccm_opt.out_dir)[0],
+                    checked,
+                    file_clang_args(file_),
+                    output_format()
+                    )
+                ):
+            stale_reason = None
+            ccmodel_config.logger.bind(stage_log=True).info(
+                    f"{rel_file} adopted from its .ccs header\n"
+                    )
+        if stale_reason is not None:
+            ccmodel_config.logger.bind(stage_log=True).info(
+                    f"{rel_file} out-of-date: {stale_reason}\n"
+                    )
+            continue
+        if ccm_opt.force:
+            ccmodel_config.logger.bind(stage_log=True).info(
+                    f"Force update {rel_file}\n"
+                    )
+            continue
+        ccmodel_config.logger.bind(stage_log=True).info(
+                f"{rel_file} up-to-date\n"
+                )
+        remove_files.add(file_)
     ccm_opt.ccm_files = [
             file_ for file_ in ccm_opt.ccm_files if
             file_ not in remove_files
             ]
     return
 
+def profile_stage(name: str):
+    if profile is None:
+        return nullcontext()
+    return profile.stage(
+            name,
+            len(ccm_opt.ccm_files),
+            include_stage=include_stage
+            )
+
 def main_ccm() -> None:
-    call_clang()
-    ccm_process()
+    # A single job runs the stages one after the other in this process.
+    if ccm_opt.pipeline and ccm_opt.jobs > 1:
+        with profile_stage("pipeline"):
+            pipeline_ccm()
+        return
+    with profile_stage("clang"):
+        snapshots = call_clang()
+    with profile_stage("convert"):
+        ccm_process(snapshots)
     return
 
 def make_output_directories() -> None:
@@ -376,12 +1092,66 @@ def make_output_directories() -> None:
                 not os.path.exists(x)
                 ]
             )
+    # Another ccm process may create the same directories at any point.
     for dir_ in make_dirs:
-        if not os.path.exists(dir_):
-            Path(dir_).mkdir(parents=True)
+        Path(dir_).mkdir(parents=True, exist_ok=True)
+
+    scratch_root = os.path.join(ccm_opt.out_dir, ".ccm-tmp")
+    Path(scratch_root).mkdir(exist_ok=True)
+    ccm_opt.scratch_dir = tempfile.mkdtemp(
+            prefix=f"run-{os.getpid()}-",
+            dir=scratch_root
+            )
+    for dir_ in file_dirs:
+        Path(
+                os.path.join(
+                    ccm_opt.scratch_dir,
+                    os.path.relpath(dir_, ccm_opt.out_dir)
+                    )
+                ).mkdir(parents=True, exist_ok=True)
     return
 
+def lock_translation_units() -> Tuple[List[FileLock], List[FileLock]]:
+    # A translation unit locked by another ccm process is left to that
+    # process. Units locked here are checked again against the manifest,
+    # since another process may have finished them since the first check.
+    held = {}
+    busy = []
+    for file_ in ccm_opt.ccm_files:
+        lock = FileLock(lock_path(get_out_paths(file_, ccm_opt.out_dir)[0]))
+        if lock.acquire(blocking=False):
+            held[file_] = lock
+            continue
+        ccmodel_config.logger.bind(stage_log=True).info(
+                f"{os.path.relpath(file_)} is being built by another " +
+                "ccm process\n"
+                )
+        busy.append(lock)
+
+    manifest.load()
+    checked = {}
+    for file_, lock in list(held.items()):
+        if ccm_opt.force or manifest.stale_reason(
+                file_,
+                checked,
+                file_clang_args(file_),
+                output_format()
+                ) is not None:
+            continue
+        ccmodel_config.logger.bind(stage_log=True).info(
+                f"{os.path.relpath(file_)} built by another ccm process\n"
+                )
+        lock.release()
+        del held[file_]
+    ccm_opt.ccm_files = [
+            file_ for file_ in ccm_opt.ccm_files if
+            file_ in held
+            ]
+    return list(held.values()), busy
+
 def ensure_cleanup() -> None:
+    if ccm_opt.scratch_dir is None:
+        return
     warning_issued = False
     for _, clang_file, _ in get_clang_out():
         if os.path.exists(clang_file):
@@ -395,33 +1165,199 @@ def ensure_cleanup() -> None:
                     )
                 warning_issued = True
             os.remove(clang_file)
+    shutil.rmtree(ccm_opt.scratch_dir, ignore_errors=True)
+    ccm_opt.scratch_dir = None
     return
 
-def main() -> None:
-    global include_stage
-
-    if ccm_opt.verbosity > 0:
-        ccmodel_config.logger.enable("ccmodel")
-    check_for_updates()
+def run_stage() -> None:
+    with profile_stage("check"):
+        check_for_updates()
     if not len(ccm_opt.ccm_files):
+        # Entries adopted from .ccs headers are kept even when nothing
+        # needs building.
+        manifest.save()
         ensure_cleanup()
         return
     make_output_directories()
-    main_ccm()
-    ensure_cleanup()
-    if ccm_opt.process_main_includes and not include_stage:
-        include_stage = True
-        set_main_include_paths()
-        main()
+    held, busy = lock_translation_units()
+    try:
+        if len(ccm_opt.ccm_files):
+            main_ccm()
+        with profile_stage("manifest"):
+            manifest.save()
+    finally:
+        for lock in held:
+            lock.release()
+        ensure_cleanup()
+    # Units built by another process are only reported once that
+    # process is done with them.
+    for lock in busy:
+        with lock:
+            pass
+    if len(busy):
+        manifest.load()
+    return
+
+def include_graph(roots: List[str]) -> Dict[str, Set[str]]:
+    graph = {root: set() for root in roots}
+    frontier = list(roots)
+    depth = 0
+    while len(frontier) and (
+            ccm_opt.include_depth < 0 or
+            depth < ccm_opt.include_depth
+            ):
+        next_frontier = []
+        for file_ in frontier:
+            entry = manifest[file_]
+            if entry is None:
+                continue
+            for inc in entry["includes"]:
+                inc_file = os.path.normpath(inc["file"])
+                graph[file_].add(inc_file)
+                if inc_file not in graph:
+                    graph[inc_file] = set()
+                    next_frontier.append(inc_file)
+        frontier = next_frontier
+        depth += 1
+    return graph
+
+def schedule_includes(
+        graph: Dict[str, Set[str]]) -> graphlib.TopologicalSorter:
+    while True:
+        sorter = graphlib.TopologicalSorter(graph)
+        try:
+            sorter.prepare()
+            return sorter
+        except graphlib.CycleError as err:
+            cycle = err.args[1]
+            ccmodel_config.logger.bind(stage_log=True, color="yellow")\
+                    .opt(colors=True)\
+                    .warning(
+                    "Include cycle: " +
+                    " -> ".join(os.path.relpath(x) for x in cycle) +
+                    "\n"
+                    )
+            # Members of the cycle are still processed, just without any
+            # ordering between them.
+            for file_, inc_file in zip(cycle, cycle[1:]):
+                graph[file_].discard(inc_file)
+                graph[inc_file].discard(file_)
+    return None
+
+def process_include_closure(roots: List[str]) -> None:
+    global include_stage
+
+    # Headers are processed before the files that include them, one wave of
+    # ready files at a time. Include lists are only known once a file has
+    # been parsed, so the graph is rebuilt until no new files turn up; on an
+    # incremental run the manifest already holds the whole graph.
+    root_set = set(roots)
+    processed = set()
+    graph = {}
+    while True:
+        graph = include_graph(roots)
+        if set(graph) <= processed:
+            break
+        sorter = schedule_includes(graph)
+        while sorter.is_active():
+            wave = sorter.get_ready()
+            todo = sorted(x for x in wave if x not in processed)
+            if len(todo):
+                include_stage = root_set.isdisjoint(todo)
+                ccm_opt.ccm_files = todo
+                run_stage()
+                processed.update(todo)
+            sorter.done(*wave)
+    include_stage = False
+
+    ccmodel_config.logger.bind(stage_log=True).info(
+            f"Include closure of {len(graph) - len(root_set)} headers\n"
+            )
+    return
+
+def main() -> None:
+    global manifest
+    global profile
+
+    if ccm_opt.verbosity > 0:
+        ccmodel_config.logger.enable("ccmodel")
+    if manifest is None:
+        manifest = CcmManifest(ccm_opt.out_dir)
+    if ccm_opt.out_db is not None:
+        # Create the schema once, before any worker opens the database.
+        try:
+            open_database(ccm_opt.out_db, ccm_opt.shards).close()
+        except CcmDatabaseError as err:
+            ccmodel_config.logger.bind(stage_log=True, color="red").error(
+                    f"{err}\n"
+                    )
+            sys.exit(-1)
+    if ccm_opt.profile is not None:
+        profile = CcmProfile(ccm_opt.profile, ccm_opt.profile_cprofile)
+    if ccm_opt.process_main_includes:
+        process_include_closure(list(ccm_opt.ccm_files))
+    else:
+        run_stage()
+    if profile is not None:
+        profile.save()
+        ccmodel_config.logger.bind(stage_log=True).info(
+                f"Profile written to {os.path.relpath(profile.path)}\n"
+                )
+        profile = None
     print("\n")
     ccmodel_config.logger.bind(stage_log=True, color="green")\
             .opt(colors=True)\
             .info("CCModel parsing complete!\n")
     return
 
+def watch_targets(sources: List[str]) -> Dict[str, Set[str]]:
+    targets = {}
+    for source in sources:
+        targets.setdefault(source, set()).add(source)
+        entry = manifest[source]
+        if entry is None:
+            continue
+        for dep in entry["dependencies"]:
+            targets.setdefault(dep, set()).add(source)
+    return targets
+
+def watch(sources: List[str]) -> None:
+    global include_stage
+
+    watcher = CcmWatcher(
+            ccm_opt.watch_interval,
+            ccm_opt.watch_settle,
+            ccm_opt.watch_poll
+            )
+    mode = "polling" if watcher.use_polling else "file system events"
+    try:
+        while True:
+            targets = watch_targets(sources)
+            watcher.watch(targets.keys())
+            ccmodel_config.logger.bind(stage_log=True).info(
+                    f"Watching {len(targets)} files ({mode})\n"
+                    )
+            changed = watcher.wait()
+            affected = set()
+            for path in changed:
+                affected.update(targets.get(path, set()))
+            if not affected:
+                continue
+            include_stage = False
+            ccm_opt.ccm_files = [x for x in sources if x in affected]
+            main()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+    return
+
 def run_ccm() -> None:
     handle_command_line()
+    sources = list(ccm_opt.ccm_files)
     main()
+    if ccm_opt.watch:
+        watch(sources)
     return
 
 if __name__ == "__main__":
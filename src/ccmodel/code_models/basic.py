@@ -1,5 +1,5 @@
-from abc import ABC, abstractmethod
-from typing import Optional, Union, List
+from abc import ABC, ABCMeta, abstractmethod
+from typing import Optional, Union, List, Iterator, Tuple
 import ccmodel.__config__.ccmodel_config as ccm_cfg
 import os
 import pdb
@@ -11,43 +11,64 @@ ccm_cfg.logger.enable("ccmodel")
 
 def register_ptr(ptr: int, variant: "Variant") -> int:
     pointers.pointer_map[ptr] = variant
+    if pointers.scope is not None and pointers.scope.registered is not None:
+        pointers.scope.registered.append(variant)
     return ptr
 
-class JsonWrapper(object):
-
-    def __init__(self, json: dict):
-        self._json = json
-        return
-
-    def __call__(self) -> dict:
-        return self._json
-
-    def __getitem__(self, key: str) -> Union[dict, str, None]:
-        out = None
-        try:
-            out = self._json[key]
-            if out == "None":
-                return None
-            if type(out) is dict:
-                out = JsonWrapper(out)
-        except KeyError:
-            pass
+def resolve_string(value: Union[str, int, None]) -> Optional[str]:
+    # Interned strings are indices into the string table of the .ccs being
+    # loaded.
+    if type(value) is int:
+        return pointers.string_table[value]
+    return value
+
+class VariantMeta(ABCMeta):
+
+    # Python allows only one base with a non-empty __slots__ layout, but the
+    # variants lean on multiple inheritance, e.g. ValueDecl(NamedDecl,
+    # QualTypeMixin). Classes created with mixin=True keep their __slots__ out
+    # of their own layout, so they can sit next to any slotted base. Every
+    # other class stores the fields of its MRO that its bases do not hold yet,
+    # which gives each concrete class a single slotted base chain. Classes
+    # that declare no __slots__ get a __dict__.
+    def __new__(mcls, name, bases, namespace, mixin=False, **kwargs):
+        fields = namespace.get("__slots__", ("__dict__",))
+        if type(fields) is str:
+            fields = (fields,)
+        namespace["_fields"] = tuple(fields)
+        held = []
+        wanted = []
+        for base in bases:
+            for cls in reversed(base.__mro__):
+                held.extend(cls.__dict__.get("__slots__", ()))
+                wanted.extend(cls.__dict__.get("_fields", ()))
+        wanted.extend(fields)
+        slots = []
+        if not mixin:
+            for field in wanted:
+                if field not in held and field not in slots:
+                    slots.append(field)
+        namespace["__slots__"] = tuple(slots)
+        out = super().__new__(mcls, name, bases, namespace, **kwargs)
+        # Every slot of the instance layout, in MRO order.
+        out._slot_names = tuple(dict.fromkeys(
+                field for cls in reversed(out.__mro__) for
+                field in cls.__dict__.get("__slots__", ())
+                ))
         return out
 
-    def keys(self):
-        for key in self._json.keys():
-            yield key
-
-    def values(self):
-        for val in self._json.values():
-            yield val
-
-    def items(self):
-        for item in self._json.items():
-            yield item
 
+class Variant(ABC, metaclass=VariantMeta):
 
-class Variant(ABC):
+    __slots__ = (
+            "clang_kind",
+            "kind",
+            "_json",
+            "_references",
+            "_referenced",
+            "_save",
+            "_parent"
+            )
 
     def __init__(self):
         super().__init__()
@@ -68,14 +89,11 @@ class Variant(ABC):
         if obj is None:
             return None
         out = None
-        data = obj
-        if type(obj) is dict:
-            data = JsonWrapper(obj)
-        if data["skipped"]:
+        if obj.get("skipped"):
             out = SkippableVariant()
         else:
             out = cls()
-        out.load_content(data)
+        out.load_content(obj)
         out._parent = parent
         return out
 
@@ -84,7 +102,7 @@ class Variant(ABC):
         pass
 
     def dump_ccms(self) -> dict:
-        return self._json()
+        return self._json
 
     def get_qualified_id(self) -> Optional[str]:
         return None
@@ -92,11 +110,24 @@ class Variant(ABC):
     def get_id(self) -> Optional[str]:
         return None
 
+    def fields(self) -> Iterator[Tuple[str, object]]:
+        for attr in type(self)._slot_names:
+            if attr == "__dict__":
+                yield from list(vars(self).items())
+            elif hasattr(self, attr):
+                yield attr, getattr(self, attr)
+        return
+
     def replace_pointers(self) -> None:
-        for attr, val in vars(self).items():
+        for attr, val in self.fields():
             if isinstance(val, pointers.Pointer):
                 ptd_to = val()
                 if ptd_to is None and not val._none_ptr:
+                    if pointers.scope is not None:
+                        # In a lazy load the target may sit in a context
+                        # that has not been materialized yet.
+                        pointers.scope.unresolved.add(self)
+                        continue
                     ccm_cfg.logger.bind(stage_log=True, color="yellow")\
                             .opt(colors=True)\
                             .warning(
@@ -108,6 +139,8 @@ class Variant(ABC):
 
 class SkippableVariant(Variant):
 
+    __slots__ = ("skipped", "reason", "id", "pointer")
+
     def __init__(self):
         super().__init__()
         self.skipped = False
@@ -115,16 +148,18 @@ class SkippableVariant(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.skipped = obj["skipped"]
+        self.skipped = obj.get("skipped")
         if self.skipped:
-            self.reason = obj["reason"]
-            self.id = Name.load_json(obj["id"])
-            self.pointer = register_ptr(obj["pointer"], self)
+            self.reason = obj.get("reason")
+            self.id = Name.load_json(obj.get("id"))
+            self.pointer = register_ptr(obj.get("pointer"), self)
         return self.skipped == True
 
 
 class Include(Variant):
 
+    __slots__ = ("search_path", "file")
+
     def __init__(self):
         super().__init__()
         self.search_path = ""
@@ -132,13 +167,15 @@ class Include(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.search_path = os.path.normpath(obj["search_path"])
-        self.file = os.path.normpath(obj["file"])
+        self.search_path = os.path.normpath(obj.get("search_path"))
+        self.file = os.path.normpath(obj.get("file"))
         return
 
 
 class SourceLocation(Variant):
 
+    __slots__ = ("line", "column")
+
     def __init__(self):
         super().__init__()
         self.line = None
@@ -146,8 +183,8 @@ class SourceLocation(Variant):
         return
 
     def load_content(self, obj: dict) -> None:
-        self.line = obj["line"]
-        self.column = obj["column"]
+        self.line = obj.get("line")
+        self.column = obj.get("column")
         del self.kind
         del self.clang_kind
         return
@@ -155,6 +192,8 @@ class SourceLocation(Variant):
 
 class SourceRange(Variant):
 
+    __slots__ = ("file", "begin", "end")
+
     def __init__(self):
         super().__init__()
         self.file = None
@@ -164,17 +203,19 @@ class SourceRange(Variant):
 
     def load_content(self, obj: dict) -> None:
         self.kind = "SourceRange"
-        self.file = obj["file"]
-        self.begin = SourceLocation.load_json(obj["begin"])
-        self.end = SourceLocation.load_json(obj["end"])
+        self.file = resolve_string(obj.get("file"))
+        self.begin = SourceLocation.load_json(obj.get("begin"))
+        self.end = SourceLocation.load_json(obj.get("end"))
         return
 
     def in_file(self, file_req: str) -> bool:
         return self.file == file_req
 
 
-class Name(Variant):
-    
+class NameMixin(Variant, mixin=True):
+
+    __slots__ = ("name", "qual_name")
+
     def __init__(self):
         super().__init__()
         self.name = ""
@@ -188,9 +229,16 @@ class Name(Variant):
         return self.name
 
     def load_content(self, obj: dict) -> dict:
-        self.name = obj["name"]
-        self.qual_name = obj["qual_name"]
+        self.name = resolve_string(obj.get("name"))
+        self.qual_name = obj.get("qual_name")
+        if self.qual_name is not None:
+            self.qual_name = [resolve_string(x) for x in self.qual_name]
         return obj
 
     def resolve_names(self) -> None:
         pass
+
+
+class Name(NameMixin):
+
+    __slots__ = ()
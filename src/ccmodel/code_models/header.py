@@ -1,19 +1,25 @@
 from .basic import (
     Include,
-    JsonWrapper,
     SkippableVariant
 )
 import ccmodel.code_models.variants as variants
 import ccmodel.code_models.pointers as pointers
+from ccmodel.storage.ccs_format import CcsFile
+from ccmodel.storage.database import CcmDatabase
+from ccmodel.storage.strings import replace_none_sentinels
 
 import orjson as json
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 class Header(object):
 
-    def __init__(self, ccs_path: str):
+    def __init__(
+            self,
+            ccs_path: str,
+            lazy: bool = False,
+            iterative: bool = False):
         global pointer_map
 
         self.file = ""
@@ -21,10 +27,14 @@ class Header(object):
         self.m_time = -1
         self.translation_unit = None
         self.file_loaded = False
+        self.lazy = lazy
+        self.iterative = iterative
+        self._scope = None
 
         self.ccs_path = ccs_path
         self.ccs_basename = os.path.basename(ccs_path)
         self.ccs = {}
+        self._ccs_file = None
         self.load_ccs_file()
 
         self._pointer_map = {}
@@ -44,9 +54,32 @@ class Header(object):
         return None
 
     def parse_translation_unit(self) -> None:
-        self.translation_unit = (
-                variants.DeclFactory.create_variant(self.ccs["translation_unit"])
-                )
+        if not len(self.ccs):
+            self.load_translation_unit()
+        string_table = self.ccs.get("string_table")
+        pointers.string_table = string_table if string_table is not None else []
+        pointer_count = self.ccs.get("pointer_count")
+        if pointer_count is not None:
+            pointers.pointer_map = pointers.DensePointerMap(pointer_count)
+        if self.lazy:
+            # Contexts below the translation unit keep their declarations
+            # raw and load them in this scope when first accessed.
+            self._scope = pointers.LoadScope()
+            self._scope.register_ids = self.build_all_ids_map
+            self._scope.iterative = self.iterative
+            pointers.scope = self._scope
+        if self.iterative:
+            # Deeply nested code would otherwise exhaust the Python stack.
+            self.translation_unit = pointers.load_iteratively(
+                    variants.DeclFactory.create_variant,
+                    self.ccs["translation_unit"]
+                    )
+        else:
+            self.translation_unit = (
+                    variants.DeclFactory.create_variant(
+                        self.ccs["translation_unit"]
+                        )
+                    )
         return
 
     def merge_includes(self, inc: Dict[str, "Header"]) -> None:
@@ -83,15 +116,22 @@ class Header(object):
             qt.replace_pointers()
         for typedef in pointers.typedefs:
             typedef.link_typedef()
-        self._pointer_map = dict(sorted(pointers.pointer_map.items()))
+        if isinstance(pointers.pointer_map, pointers.DensePointerMap):
+            self._pointer_map = pointers.pointer_map
+        else:
+            self._pointer_map = dict(sorted(pointers.pointer_map.items()))
         return
 
-    def build_all_ids_map(self) -> None:
+    def build_all_ids_map(
+            self,
+            loaded: Optional[List["Variant"]] = None) -> None:
+        if loaded is None:
+            loaded = pointers.pointer_map.values()
         processed = []
         for named_decl in [
-                x for x in pointers.pointer_map.values() if
+                x for x in loaded if
                 isinstance(x, variants.NamedDecl) and
-                not type(x) is variants.NamedDecl
+                type(x) is not variants.NamedDecl
                 ]:
             if named_decl in processed:
                 continue
@@ -109,19 +149,31 @@ class Header(object):
         return
 
     def load_ccs_file(self) -> None:
+        # Only the metadata and include list are read here; the translation
+        # unit itself is loaded when it is first parsed.
+        self.ccs = {}
         try:
-            with open(self.ccs_path, "rb") as ccs_file:
-                self.ccs = JsonWrapper(json.loads(ccs_file.read()))
-            self.file = self.ccs["file"]
+            self._ccs_file = CcsFile(self.ccs_path)
+            self._ccs_file.validate()
+            metadata = self._ccs_file.metadata()
+            self.file = metadata["file"]
             self.includes = [
-                    Include.load_json(x) for x in self.ccs["includes"]
+                    Include.load_json(x) for x in metadata["includes"]
                     ]
-            self.m_time = self.ccs["m_time"]
+            self.m_time = metadata["m_time"]
             self.file_loaded = True
         except FileNotFoundError:
             self.file_loaded = False
         return
 
+    def load_translation_unit(self) -> None:
+        self.ccs = self._ccs_file.load()
+        self._ccs_file.release()
+        if not self.ccs.get("none_as_null"):
+            # Written before the sentinels were replaced on write.
+            replace_none_sentinels(self.ccs["translation_unit"])
+        return
+
     def extract_translation_unit(self) -> None:
         self.parse_translation_unit()
         self.build_all_ids_map()
@@ -136,3 +188,36 @@ class Header(object):
                 else:
                     print(f"- {key}: {type(val).__name__}")
         return list(self._all_ids.keys())
+
+
+class DbHeader(Header):
+
+    def __init__(
+            self,
+            database: CcmDatabase,
+            ccs_key: str,
+            lazy: bool = False,
+            iterative: bool = False):
+        self._database = database
+        super().__init__(ccs_key, lazy, iterative)
+        return
+
+    def load_ccs_file(self) -> None:
+        self.ccs = {}
+        metadata = self._database.metadata(self.ccs_path)
+        if metadata is None:
+            self.file_loaded = False
+            return
+        self.file = metadata["file"]
+        self.includes = [Include.load_json(x) for x in metadata["includes"]]
+        self.m_time = metadata["m_time"]
+        self.file_loaded = True
+        return
+
+    def load_translation_unit(self) -> None:
+        self._ccs_file = CcsFile(
+                self.ccs_path,
+                self._database.payload(self.ccs_path)
+                )
+        Header.load_translation_unit(self)
+        return
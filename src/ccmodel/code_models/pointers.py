@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Callable, Iterator, List, Optional, Tuple
 import copy
 import pdb
 
@@ -6,6 +6,9 @@ pointer_map = {}
 qual_types = []
 short_types = {}
 typedefs = []
+string_table = []
+scope = None
+load_stack = None
 
 
 class Pointer(object):
@@ -24,3 +27,166 @@ class Pointer(object):
         ):
                 return None
         return pointer_map[self._pointer]
+
+
+class DensePointerMap(object):
+
+    # Pointer map for .ccs files written with dense pointer ids: variants
+    # sit in a list at their id, so lookups are list indexing and iteration
+    # is already in pointer order. Keys that are not ids, e.g. the None of a
+    # variant written without a pointer, are kept aside as a dict would.
+    def __init__(self, size: int = 0):
+        self._variants = [None] * size
+        self._other = {}
+        return
+
+    def __contains__(self, ptr: int) -> bool:
+        if (
+                type(ptr) is int and
+                0 <= ptr < len(self._variants) and
+                self._variants[ptr] is not None
+                ):
+            return True
+        return len(self._other) > 0 and ptr in self._other
+
+    def __getitem__(self, ptr: int) -> "Variant":
+        if ptr in self._other:
+            return self._other[ptr]
+        if ptr not in self:
+            raise KeyError(ptr)
+        return self._variants[ptr]
+
+    def __setitem__(self, ptr: int, variant: "Variant") -> None:
+        if type(ptr) is not int or ptr < 0:
+            self._other[ptr] = variant
+            return
+        if ptr >= len(self._variants):
+            self._variants.extend([None] * (ptr + 1 - len(self._variants)))
+        self._variants[ptr] = variant
+        return
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for ptr, _ in self.items():
+            yield ptr
+
+    def get(self, ptr: int, default: Optional["Variant"] = None):
+        return self[ptr] if ptr in self else default
+
+    def keys(self) -> Iterator[int]:
+        return iter(self)
+
+    def values(self) -> Iterator["Variant"]:
+        for _, variant in self.items():
+            yield variant
+
+    def items(self) -> Iterator[Tuple[int, "Variant"]]:
+        for ptr, variant in enumerate(self._variants):
+            if variant is not None:
+                yield ptr, variant
+        yield from list(self._other.items())
+
+
+class LoadScope(object):
+
+    # The module-level load state of one lazily loaded header. Contexts
+    # keep the scope they were read in, so the children they materialize
+    # later register in, and resolve against, their own header's pointer
+    # map, long after the reader has cleared the globals.
+    def __init__(self):
+        self.pointer_map = pointer_map
+        self.short_types = short_types
+        self.string_table = string_table
+        self.unresolved = set()
+        self.registered = None
+        self.register_ids: Optional[Callable[[List["Variant"]], None]] = None
+        self.iterative = False
+        self._saved = []
+        return
+
+    def __deepcopy__(self, memo: dict) -> "LoadScope":
+        # Copied variants still belong to the same header.
+        return self
+
+    def __enter__(self) -> "LoadScope":
+        global pointer_map, qual_types, short_types, typedefs
+        global string_table, scope
+        self._saved.append(
+                (
+                    pointer_map,
+                    qual_types,
+                    short_types,
+                    typedefs,
+                    string_table,
+                    scope,
+                    self.registered
+                    )
+                )
+        pointer_map = self.pointer_map
+        qual_types = []
+        short_types = self.short_types
+        typedefs = []
+        string_table = self.string_table
+        scope = self
+        self.registered = []
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global pointer_map, qual_types, short_types, typedefs
+        global string_table, scope
+        (
+                pointer_map,
+                qual_types,
+                short_types,
+                typedefs,
+                string_table,
+                scope,
+                self.registered
+                ) = self._saved.pop()
+        return
+
+    def resolve(self) -> None:
+        # Variants loaded since entering the scope are resolved first. Then
+        # earlier ones with missing targets get another try, since their
+        # targets may just have been materialized.
+        registered = self.registered
+        retry = self.unresolved
+        self.registered = []
+        self.unresolved = set()
+        for variant in registered:
+            variant.replace_pointers()
+        for qt in qual_types:
+            qt.replace_pointers()
+        for typedef in typedefs:
+            typedef.link_typedef()
+        for variant in retry:
+            variant.replace_pointers()
+        if self.register_ids is not None:
+            self.register_ids(registered)
+        return
+
+
+def load_iteratively(load: Callable[..., object], *args) -> object:
+    # Runs a load with an explicit stack. Contexts and statements push the
+    # loads of their children to load_stack instead of making them in place,
+    # so the Python stack stays flat however deeply the source nests. The
+    # children one load pushes are popped in the order they were pushed,
+    # before anything pushed earlier, which visits the tree in the same
+    # order as the recursive loaders.
+    global load_stack
+    saved = load_stack
+    stack = load_stack = []
+    try:
+        out = load(*args)
+        stack.reverse()
+        while stack:
+            task, task_args = stack.pop()
+            mark = len(stack)
+            task(*task_args)
+            if len(stack) - mark > 1:
+                stack[mark:] = reversed(stack[mark:])
+    finally:
+        load_stack = saved
+    return out
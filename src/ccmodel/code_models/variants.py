@@ -1,14 +1,20 @@
 from .basic import (
-    JsonWrapper,
     Include,
     Variant,
+    VariantMeta,
     SkippableVariant,
     Name,
+    NameMixin,
     SourceRange,
     SourceLocation,
-    register_ptr
+    register_ptr,
+    resolve_string
 )
 import ccmodel.code_models.pointers as pointers
+from ccmodel.rules.code_model_map import (
+        code_models,
+        default_code_model
+        )
 from ccmodel.utils.code_utils import (
         split_id,
         form_id,
@@ -22,6 +28,12 @@ from typing import (
 import copy
 import pdb
 
+attr_models = code_models["attr"]
+type_models = code_models["type"]
+decl_models = code_models["decl"]
+stmt_models = code_models["stmt"]
+expr_models = code_models["expr"]
+
 ################################# attrs #######################################
 
 
@@ -35,6 +47,8 @@ class AttrPointer(pointers.Pointer):
 
 class VersionTuple(Variant):
 
+    __slots__ = ("major", "minor", "subminor", "build")
+
     def __init__(self):
         super().__init__()
         self.major = None
@@ -44,15 +58,17 @@ class VersionTuple(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.major = obj["major"]
-        self.minor = obj["minor"]
-        self.subminor = obj["subminor"]
-        self.build = obj["build"]
+        self.major = obj.get("major")
+        self.minor = obj.get("minor")
+        self.subminor = obj.get("subminor")
+        self.build = obj.get("build")
         return obj
 
 
 class Attribute(Variant):
 
+    __slots__ = ("pointer", "location", "attr")
+
     def __init__(self):
         super().__init__()
         self.pointer = -1
@@ -61,27 +77,33 @@ class Attribute(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.pointer = register_ptr(obj["pointer"], self)
-        self.location = SourceRange.load_json(obj["location"])
-        self.attr = obj["attr"]
+        self.pointer = register_ptr(obj.get("pointer"), self)
+        self.location = SourceRange.load_json(obj.get("location"))
+        self.attr = obj.get("attr")
         return
 
 
+@default_code_model("attr", "VisibilityAttr")
 class VisibilityAttr(Attribute):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self.kind = ""
         return
 
     def load_content(self, obj: dict) -> dict:
-        Attribute.load_content(self, obj["attr"])
-        self.kind = obj["kind"]
+        Attribute.load_content(self, obj.get("attr"))
+        self.kind = obj.get("kind")
         return obj
 
 
+@default_code_model("attr", "AnnotateAttr")
 class AnnotateAttr(Attribute):
 
+    __slots__ = ("annotation",)
+
     def __init__(self):
         super().__init__()
         self.annotation = ""
@@ -91,8 +113,11 @@ class AnnotateAttr(Attribute):
         return obj
 
 
+@default_code_model("attr", "AvailabilityAttr")
 class AvailabilityAttr(Attribute):
 
+    __slots__ = ("platform", "introduced")
+
     def __init__(self):
         super().__init__()
         self.platform = ""
@@ -100,14 +125,17 @@ class AvailabilityAttr(Attribute):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Attribute.load_content(self, obj["attr"])
-        self.platform = obj["platform"]
-        self.introduced = obj["introduced"]
+        Attribute.load_content(self, obj.get("attr"))
+        self.platform = obj.get("platform")
+        self.introduced = obj.get("introduced")
         return obj
 
 
+@default_code_model("attr", "SentinelAttr")
 class SentinelAttr(Attribute):
 
+    __slots__ = ("sentinel", "null_pos")
+
     def __init__(self):
         super().__init__()
         self.sentinel = None
@@ -115,9 +143,9 @@ class SentinelAttr(Attribute):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Attribute.load_content(self, obj["attr"])
-        self.sentinel = obj["sentinel"]
-        self.null_pos = obj["null_pos"]
+        Attribute.load_content(self, obj.get("attr"))
+        self.sentinel = obj.get("sentinel")
+        self.null_pos = obj.get("null_pos")
         return obj
 
 
@@ -131,24 +159,13 @@ class AttrFactory(object):
         if obj is None:
             return None
 
-        out = None
-        variant = obj["kind"]
-        content = obj["content"]
-
-        if content["skipped"]:
-            out = SkippableVariant.load_json(content)
-        if variant == "AvailabilityAttr":
-            out = AvailabilityAttr.load_json(content)
-        elif variant == "SentinelAttr":
-            out = SentinelAttr.load_json(content)
-        elif variant == "AnnotateAttr":
-            out = AnnotateAttr.load_json(content)
-        elif variant == "VisibilityAttr":
-            out = VisibilityAttr.load_json(content)
-        else:
+        variant = obj.get("kind")
+        model = attr_models.get(variant)
+        if model is None:
             return None
+        out = model.load_json(obj.get("content"))
 
-        out.clang_kind = obj["clang_kind"]
+        out.clang_kind = obj.get("clang_kind")
         out.kind = variant
         out._json = obj
         out._save = save
@@ -178,6 +195,8 @@ class TypePointer(pointers.Pointer):
 
 class Type(Variant):
 
+    __slots__ = ("pointer", "desugared_type")
+
     def __init__(self):
         super().__init__()
         self.pointer = -1
@@ -185,8 +204,8 @@ class Type(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.pointer = register_ptr(obj["pointer"], self)
-        self.desugared_type = TypePointer(obj["desugared_type"], self)
+        self.pointer = register_ptr(obj.get("pointer"), self)
+        self.desugared_type = TypePointer(obj.get("desugared_type"), self)
         return obj
 
     def resolve_type(self) -> str:
@@ -196,7 +215,16 @@ class Type(Variant):
         pass
 
 
-class QualType(Variant):
+class QualTypeMixin(Variant, mixin=True):
+
+    __slots__ = (
+            "type_object",
+            "type",
+            "canonical",
+            "is_const",
+            "is_volatile",
+            "is_restrict"
+            )
 
     def __init__(self):
         super().__init__()
@@ -211,12 +239,12 @@ class QualType(Variant):
 
     def load_content(self, obj: dict) -> dict:
         self.kind = "QualType"
-        self.type_object = TypePointer(obj["type_pointer"], self)
-        self.type = obj["type"]
-        self.canonical = obj["canonical"]
-        self.is_const = obj["is_const"]
-        self.is_restrict = obj["is_restrict"]
-        self.is_volatile = obj["is_volatile"]
+        self.type_object = TypePointer(obj.get("type_pointer"), self)
+        self.type = resolve_string(obj.get("type"))
+        self.canonical = resolve_string(obj.get("canonical"))
+        self.is_const = obj.get("is_const")
+        self.is_restrict = obj.get("is_restrict")
+        self.is_volatile = obj.get("is_volatile")
 
         if (
                 self.type not in pointers.short_types and
@@ -259,31 +287,56 @@ class QualType(Variant):
             pointers.short_types[self.canonical] = self.type
         return
 
+
+class QualType(QualTypeMixin):
+
+    __slots__ = ()
+
+
+@default_code_model(
+        "type",
+        "LValueReferenceType",
+        "RValueReferenceType",
+        "ParenType"
+        )
 class BasicType(Type):
 
+    __slots__ = ("qual_type",)
+
     def __init__(self):
         super().__init__()
         self.qual_type = None
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.qual_type = QualType.load_json(obj["qual_type"], parent=self)
+        Type.load_content(self, obj.get("type"))
+        self.qual_type = QualType.load_json(obj.get("qual_type"), parent=self)
         return obj
 
     def resolve_type(self) -> str:
         return self.qual_type.resolve_type()
 
 
+@default_code_model("type", "AdjustedType")
 class AdjustedType(BasicType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
 
+@default_code_model(
+        "type",
+        "ArrayType",
+        "DependentSizedArrayType",
+        "IncompleteArrayType"
+        )
 class ArrayType(Type):
 
+    __slots__ = ("element_type", "stride")
+
     def __init__(self):
         super().__init__()
         self.element_type = None
@@ -291,127 +344,154 @@ class ArrayType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
+        Type.load_content(self, obj.get("type"))
         self.element_type = QualType.load_json(
-                obj["element_type"],
+                obj.get("element_type"),
                 parent=self)
-        self.stride = obj["stride"]
+        self.stride = obj.get("stride")
         return obj
 
 
+@default_code_model("type", "ConstantArrayType")
 class ConstantArrayType(ArrayType):
 
+    __slots__ = ("size",)
+
     def __init__(self):
         super().__init__()
         self.size = -1
         return
 
     def load_content(self, obj: dict) -> dict:
-        ArrayType.load_content(self, obj["array_type"])
-        self.size = obj["size"]
+        ArrayType.load_content(self, obj.get("array_type"))
+        self.size = obj.get("size")
         return obj
 
     def resolve_type(self) -> str:
         return self.element_type + f"[{self.size}]"
 
 
+@default_code_model("type", "VariableArrayType")
 class VariableArrayType(ArrayType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self.pointer = -1
         return
 
     def load_content(self, obj: dict) -> dict:
-        ArrayType.load_content(self, obj["array_type"])
-        self.pointer = register_ptr(obj["pointer"], self)
+        ArrayType.load_content(self, obj.get("array_type"))
+        self.pointer = register_ptr(obj.get("pointer"), self)
         return obj
 
     def resolve_type(self) -> str:
         return ArrayType.resolve_type(self)
 
 
+@default_code_model("type", "AtomicType")
 class AtomicType(BasicType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
 
+@default_code_model("type", "AttributedType")
 class AttributedType(Type):
 
+    __slots__ = ("attr_kind",)
+
     def __init__(self):
         super().__init__()
         self.attr_kind = ""
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.attr_kind = obj["attr_kind"]
+        Type.load_content(self, obj.get("type"))
+        self.attr_kind = obj.get("attr_kind")
         return obj
 
     def resolve_type(self) -> str:
         return None
 
 
+@default_code_model("type", "BlockPointerType")
 class BlockPointerType(BasicType):
 
+    __slots__ = ("type_name",)
+
     def __init__(self):
         super().__init__()
         self.type_name = ""
         return
 
 
+@default_code_model("type", "BuiltinType")
 class BuiltinType(Type):
 
+    __slots__ = ("type_name",)
+
     def __init__(self):
         super().__init__()
         self.type_name = ""
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.type_name = obj["type_name"]
+        Type.load_content(self, obj.get("type"))
+        self.type_name = obj.get("type_name")
         return obj
 
     def resolve_type(self) -> str:
         return self.type_name
 
 
+@default_code_model("type", "DecltypeType")
 class DecltypeType(BasicType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
 
+@default_code_model("type", "FunctionType")
 class FunctionType(Type):
 
+    __slots__ = ("return_type",)
+
     def __init__(self):
         super().__init__()
         self.return_type = None
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.return_type = QualType.load_json(obj["return_type"], parent=self)
+        Type.load_content(self, obj.get("type"))
+        self.return_type = QualType.load_json(obj.get("return_type"), parent=self)
         return obj
 
     def resolve_type(self) -> str:
         return self.return_type.resolve_type()
 
 
+@default_code_model("type", "FunctionProtoType")
 class FunctionProtoType(FunctionType):
 
+    __slots__ = ("param_types",)
+
     def __init__(self):
         super().__init__()
         self.param_types = []
         return
 
     def load_content(self, obj: dict) -> dict:
-        FunctionType.load_content(self, obj["function_type"])
+        FunctionType.load_content(self, obj.get("function_type"))
         self.param_types = [
-                QualType.load_json(x, parent=self) for x in obj["param_types"]
+                QualType.load_json(x, parent=self) for x in obj.get("param_types")
                 ]
         return obj
 
@@ -424,8 +504,11 @@ class FunctionProtoType(FunctionType):
         return out
 
 
+@default_code_model("type", "MemberPointerType")
 class MemberPointerType(BasicType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
@@ -433,27 +516,38 @@ class MemberPointerType(BasicType):
 
 class ParenType(BasicType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
 
+@default_code_model("type", "PointerType")
 class PointerType(BasicType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
 
+@default_code_model("type", "ReferenceType")
 class ReferenceType(BasicType):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
 
+@default_code_model("type", "TagType", "RecordType", "EnumType")
 class TagType(Type):
 
+    __slots__ = ("decl", "_resolving")
+
     def __init__(self):
         super().__init__()
         self.decl = -1
@@ -462,8 +556,8 @@ class TagType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.decl = DeclPointer(obj["decl_pointer"], self)
+        Type.load_content(self, obj.get("type"))
+        self.decl = DeclPointer(obj.get("decl_pointer"), self)
         return obj
 
     def resolve_type(self) -> str:
@@ -483,8 +577,11 @@ class TagType(Type):
         return self.decl.get_qualified_id()
 
 
+@default_code_model("type", "TypedefType")
 class TypedefType(Type):
 
+    __slots__ = ("child_type", "decl")
+
     def __init__(self):
         super().__init__()
         self.child_type = None
@@ -492,11 +589,11 @@ class TypedefType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
+        Type.load_content(self, obj.get("type"))
         self.child_type = QualType.load_json(
-                obj["child_type"],
+                obj.get("child_type"),
                 parent=self)
-        self.decl = DeclPointer(obj["decl_pointer"], self)
+        self.decl = DeclPointer(obj.get("decl_pointer"), self)
         return obj
 
     def resolve_type(self) -> str:
@@ -507,8 +604,11 @@ class TypedefType(Type):
         return self.decl.underlying_type.type
 
 
+@default_code_model("type", "TemplateTypeParmType")
 class TemplateTypeParmType(Type):
 
+    __slots__ = ("id", "depth", "index", "variadic", "parameter", "is_pack")
+
     def __init__(self):
         super().__init__()
         self.id = ""
@@ -520,14 +620,14 @@ class TemplateTypeParmType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.id = obj["id"]
-        self.depth = obj["depth"]
-        self.index = obj["index"]
-        self.is_pack = obj["is_pack"]
-        self.parameter = DeclPointer(obj["parameter"], self)
+        Type.load_content(self, obj.get("type"))
+        self.id = obj.get("id")
+        self.depth = obj.get("depth")
+        self.index = obj.get("index")
+        self.is_pack = obj.get("is_pack")
+        self.parameter = DeclPointer(obj.get("parameter"), self)
         self.desugared_type = QualType.load_json(
-                obj["desugared_type"],
+                obj.get("desugared_type"),
                 parent=self
                 )
         return
@@ -538,8 +638,11 @@ class TemplateTypeParmType(Type):
         return self.id
 
 
+@default_code_model("type", "SubstTemplateTypeParmType")
 class SubstTemplateTypeParmType(Type):
 
+    __slots__ = ("replaced", "replacement_type")
+
     def __init__(self):
         super().__init__()
         self.replaced = -1
@@ -548,13 +651,13 @@ class SubstTemplateTypeParmType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.replaced = obj["replaced"]
+        Type.load_content(self, obj.get("type"))
+        self.replaced = obj.get("replaced")
         self.replacement_type = QualType.load_json(
-                obj["replacement_type"],
+                obj.get("replacement_type"),
                 parent=self)
         self.desugared_type = QualType.load_json(
-                obj["desugared_type"],
+                obj.get("desugared_type"),
                 parent=self
                 )
         return obj
@@ -563,8 +666,16 @@ class SubstTemplateTypeParmType(Type):
         return self.replacement_type.resolve_type()
 
 
+@default_code_model("type", "TemplateSpecializationType")
 class TemplateSpecializationType(Type):
 
+    __slots__ = (
+            "type_alias",
+            "template_decl",
+            "aliased_type",
+            "specialization_args"
+            )
+
     def __init__(self):
         super().__init__()
         self.type_alias = False
@@ -575,20 +686,20 @@ class TemplateSpecializationType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.type_alias = obj["type_alias"]
-        self.template_decl = DeclPointer(obj["template_decl"], self)
+        Type.load_content(self, obj.get("type"))
+        self.type_alias = obj.get("type_alias")
+        self.template_decl = DeclPointer(obj.get("template_decl"), self)
         self.aliased_type = QualType.load_json(
-                obj["aliased_type"],
+                obj.get("aliased_type"),
                 parent=self
                 )
         self.desugared_type = QualType.load_json(
-                obj["desugared_type"],
+                obj.get("desugared_type"),
                 parent=self
                 )
         self.specialization_args = [
                 TemplateArgument.load_json(x, parent=self) for x in
-                obj["specialization_args"]
+                obj.get("specialization_args")
                 ]
         return obj
 
@@ -604,8 +715,11 @@ class TemplateSpecializationType(Type):
         return out
 
 
+@default_code_model("type", "InjectedClassNameType")
 class InjectedClassNameType(Type):
 
+    __slots__ = ("injected_specialization_type",)
+
     def __init__(self):
         super().__init__()
         self.injected_specialization_type = None
@@ -613,14 +727,14 @@ class InjectedClassNameType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
+        Type.load_content(self, obj.get("type"))
         self.injected_specialization_type = (
                 QualType.load_json(
-                    obj["injected_specialization_type"],
+                    obj.get("injected_specialization_type"),
                     parent=self)
                 )
         self.desugared_type = QualType.load_json(
-                obj["desugared_type"],
+                obj.get("desugared_type"),
                 parent=self
                 )
         return obj
@@ -629,8 +743,11 @@ class InjectedClassNameType(Type):
         return self.injected_specialization_type.resolve_type()
 
 
+@default_code_model("type", "DependentNameType")
 class DependentNameType(Type):
 
+    __slots__ = ("identifier",)
+
     def __init__(self):
         Type.__init__(self)
         self.identifier = ""
@@ -638,10 +755,10 @@ class DependentNameType(Type):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Type.load_content(self, obj["type"])
-        self.identifier = obj["identifier"]
+        Type.load_content(self, obj.get("type"))
+        self.identifier = obj.get("identifier")
         self.desugared_type = QualType.load_json(
-                obj["desugared_type"],
+                obj.get("desugared_type"),
                 parent=self
                 )
         return obj
@@ -659,72 +776,11 @@ class TypeFactory(object):
         if type_obj is None:
             return None
 
-        out = None
-        variant = type_obj["kind"]
-        content = type_obj["content"]
-
-        if content["skipped"]:
-            out = SkippableVariant.load_json(content)
-        if variant == "AdjustedType":
-            out = AdjustedType.load_json(content)
-        elif variant == "ArrayType":
-            out = ArrayType.load_json(content)
-        elif variant == "ConstantArrayType":
-            out = ConstantArrayType.load_json(content)
-        elif variant == "VariableArrayType":
-            out = VariableArrayType.load_json(content)
-        elif variant == "AtomicType":
-            out = AtomicType.load_json(content)
-        elif variant == "AttributedType":
-            out = AttributedType.load_json(content)
-        elif variant == "BlockPointerType":
-            out = BlockPointerType.load_json(content)
-        elif variant == "BuiltinType":
-            out = BuiltinType.load_json(content)
-        elif variant == "DecltypeType":
-            out = DecltypeType.load_json(content)
-        elif variant == "FunctionType":
-            out = FunctionType.load_json(content)
-        elif variant == "FunctionProtoType":
-            out = FunctionProtoType.load_json(content)
-        elif variant == "MemberPointerType":
-            out = MemberPointerType.load_json(content)
-        elif variant == "PointerType":
-            out = PointerType.load_json(content)
-        elif variant == "ReferenceType":
-             out = ReferenceType.load_json(content)
-        elif variant == "TagType":
-            out = TagType.load_json(content)
-        elif variant == "TypedefType":
-            out = TypedefType.load_json(content)
-        elif variant == "TemplateTypeParmType":
-            out = TemplateTypeParmType.load_json(content)
-        elif variant == "SubstTemplateTypeParmType":
-            out = SubstTemplateTypeParmType.load_json(content)
-        elif variant == "TemplateSpecializationType":
-            out = TemplateSpecializationType.load_json(content)
-        elif variant == "InjectedClassNameType":
-            out = InjectedClassNameType.load_json(content)
-        elif variant == "DependentNameType":
-            out = DependentNameType.load_json(content)
-        elif variant == "RecordType":
-            out = TagType.load_json(content)
-        elif variant == "EnumType":
-            out = TagType.load_json(content)
-        elif variant == "LValueReferenceType":
-            out = BasicType.load_json(content)
-        elif variant == "RValueReferenceType":
-            out = BasicType.load_json(content)
-        elif variant == "DependentSizedArrayType":
-            out = ArrayType.load_json(content)
-        elif variant == "IncompleteArrayType":
-            out = ArrayType.load_json(content)
-        elif variant == "ParenType":
-            out = BasicType.load_json(content)
-        else:
-            out = Type.load_json(content)
+        # Kinds without a dedicated model load as a plain Type.
+        variant = type_obj.get("kind")
+        out = type_models.get(variant, Type).load_json(type_obj.get("content"))
 
-        out.clang_kind = type_obj["clang_kind"]
+        out.clang_kind = type_obj.get("clang_kind")
         out.kind = variant
         out._save = True
         out._json = type_obj
@@ -752,8 +808,11 @@ class StmtPointer(pointers.Pointer):
         return
 
 
+@default_code_model("stmt", "Stmt")
 class Stmt(Variant):
 
+    __slots__ = ("stmt", "pointer", "location", "content")
+
     def __init__(self):
         super().__init__()
         self.stmt = None
@@ -763,19 +822,36 @@ class Stmt(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.pointer = register_ptr(obj["pointer"], self)
-        self.location = SourceRange.load_json(obj["location"])
+        self.pointer = register_ptr(obj.get("pointer"), self)
+        self.location = SourceRange.load_json(obj.get("location"))
+        content = obj.get("content")
+        if pointers.load_stack is not None:
+            # Filled in from the stack once this statement is loaded.
+            self.content = [None] * len(content)
+            pointers.load_stack.extend(
+                    (self.load_child, (idx, stmt)) for
+                    idx, stmt in enumerate(content)
+                    )
+            return obj
         self.content = [
                 StmtFactory.create_variant(stmt, save=False, parent=self) for 
-                stmt in obj["content"]
+                stmt in content
                 ]
-        for obj in [x for x in self.content if x is not None]:
-            obj.parent(self)
         return obj
 
+    def load_child(self, idx: int, stmt: dict) -> None:
+        self.content[idx] = StmtFactory.create_variant(
+                stmt,
+                save=False,
+                parent=self
+                )
+        return
+
 
 class FullComment(Variant):
 
+    __slots__ = ("parent_pointer", "location", "text")
+
     def __init__(self):
         super().__init__()
         self.parent_pointer = -1
@@ -784,34 +860,38 @@ class FullComment(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.parent_pointer = register_ptr(obj["parent_pointer"], self)
-        self.location = SourceRange.load_json(obj["location"])
-        self.text = obj["text"]
+        self.parent_pointer = register_ptr(obj.get("parent_pointer"), self)
+        self.location = SourceRange.load_json(obj.get("location"))
+        self.text = obj.get("text")
         return obj
 
 
+@default_code_model("stmt", "DeclStmt")
 class DeclStmt(Stmt):
 
+    __slots__ = ("decls",)
+
     def __init__(self):
         super().__init__()
         self.decls = []
         return
 
     def load_content(self, obj: dict) -> dict:
-        Stmt.load_content(self, obj["stmt"])
-        for decl in obj["decls"]:
-            obj = DeclFactory.create_variant(
+        Stmt.load_content(self, obj.get("stmt"))
+        for decl in obj.get("decls"):
+            decl_obj = DeclFactory.create_variant(
                     decl,
                     save=False,
                     parent=self
                     )
-            if obj is not None:
-                self.decls.append(obj)
-                obj.parent(self)
+            if decl_obj is not None:
+                self.decls.append(decl_obj)
         return obj
 
 
-class IdContainer(object):
+class IdContainer(object, metaclass=VariantMeta, mixin=True):
+
+    __slots__ = ("_named_decls", "_identifier_map")
 
     def __init__(self):
         super().__init__()
@@ -820,12 +900,17 @@ class IdContainer(object):
         return
 
     def __getitem__(self, iden: str) -> Variant:
+        self.materialize()
         try:
             return self._identifier_map[iden]
         except KeyError:
             return None
 
+    def materialize(self) -> None:
+        return
+
     def ls(self, ilevel: int = 0) -> None:
+        self.materialize()
         lead_char = "|-" if ilevel else "-"
         indent = f"{4 * ilevel * ' '}"
         ccm_id = self._local_ccm_identifier
@@ -849,6 +934,20 @@ class IdContainer(object):
 
 class Decl(SkippableVariant):
 
+    __slots__ = (
+            "parent",
+            "location",
+            "owning_module",
+            "is_hidden",
+            "is_implicit",
+            "is_used",
+            "is_this_declaration_referenced",
+            "is_invalid_decl",
+            "attributes",
+            "full_comment",
+            "access_specifier"
+            )
+
     def __init__(self):
         super().__init__()
         self.pointer = -1
@@ -868,31 +967,33 @@ class Decl(SkippableVariant):
     def load_content(self, obj: dict) -> None:
         if SkippableVariant.load_content(self, obj):
             return
-        self.pointer = register_ptr(obj["pointer"], self)
-        self.parent = DeclPointer(obj["parent_pointer"], self)
-        self.location = SourceRange.load_json(obj["location"])
-        self.owning_module = obj["owning_module"]
-        self.is_hidden = obj["is_hidden"]
-        self.is_implicit = obj["is_implicit"]
-        self.is_used = obj["is_used"]
-        self.is_this_declaration_referenced = obj["is_this_declaration_referenced"]
-        self.is_invalid_decl = obj["is_invalid_decl"]
-        for attr in obj["attributes"]:
+        self.pointer = register_ptr(obj.get("pointer"), self)
+        self.parent = DeclPointer(obj.get("parent_pointer"), self)
+        self.location = SourceRange.load_json(obj.get("location"))
+        self.owning_module = obj.get("owning_module")
+        self.is_hidden = obj.get("is_hidden")
+        self.is_implicit = obj.get("is_implicit")
+        self.is_used = obj.get("is_used")
+        self.is_this_declaration_referenced = obj.get("is_this_declaration_referenced")
+        self.is_invalid_decl = obj.get("is_invalid_decl")
+        for attr in obj.get("attributes"):
             attr_obj = AttrFactory.create_variant(
-                    JsonWrapper(attr),
+                    attr,
                     save=False,
                     parent=self)
             if attr_obj is not None:
                 self.attributes.append(attr_obj)
         self.full_comment = FullComment.load_json(
-                obj["full_comment"],
+                obj.get("full_comment"),
                 parent=self
                 )
-        self.access_specifier = obj["access_specifier"]
+        self.access_specifier = obj.get("access_specifier")
         return
 
 
-class NamedDecl(Decl, Name):
+class NamedDecl(Decl, NameMixin):
+
+    __slots__ = ("_ccm_identifier", "_local_ccm_identifier")
 
     def __init__(self):
         super().__init__()
@@ -901,21 +1002,21 @@ class NamedDecl(Decl, Name):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Decl.load_content(self, obj["decl"])
-        Name.load_content(self, obj["id"])
+        Decl.load_content(self, obj.get("decl"))
+        NameMixin.load_content(self, obj.get("id"))
         return obj
 
     def get_qualified_id(self) -> str:
-        return Name.write_qual_name(self)
+        return NameMixin.write_qual_name(self)
 
     def get_id(self) -> str:
-        return Name.write_name(self)
+        return NameMixin.write_name(self)
 
     def set_ccm_identifier(self) -> None:
         if self._ccm_identifier != "":
             return
         self._local_ccm_identifier = self.name
-        if self._parent and "_ccm_identifier" in vars(self._parent):
+        if self._parent and hasattr(self._parent, "_ccm_identifier"):
             if self._parent._ccm_identifier == "":
                 self._parent.set_ccm_identifier()
             self._ccm_identifier = "::".join(
@@ -931,6 +1032,8 @@ class NamedDecl(Decl, Name):
 
 class DeclRef(SkippableVariant):
 
+    __slots__ = ("decl", "is_hidden", "qual_type")
+
     def __init__(self):
         super().__init__()
         self.decl = -1
@@ -943,15 +1046,17 @@ class DeclRef(SkippableVariant):
         if SkippableVariant.load_content(self, obj):
             return
         self.kind = "DeclRef"
-        self.decl = DeclPointer(obj["decl_pointer"], self)
-        self.id = obj["id"]
-        self.is_hidden = obj["is_hidden"]
-        self.qual_type = QualType.load_json(obj["qual_type"], parent=self)
+        self.decl = DeclPointer(obj.get("decl_pointer"), self)
+        self.id = obj.get("id")
+        self.is_hidden = obj.get("is_hidden")
+        self.qual_type = QualType.load_json(obj.get("qual_type"), parent=self)
         return
 
 
 class NestedNameSpecifierLoc(Variant):
 
+    __slots__ = ("ref",)
+
     def __init__(self):
         super().__init__()
         self.kind = ""
@@ -959,13 +1064,26 @@ class NestedNameSpecifierLoc(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.kind = obj["kind"]
-        self.ref = DeclRef.load_json(obj["ref"], parent=self)
+        self.kind = obj.get("kind")
+        self.ref = DeclRef.load_json(obj.get("ref"), parent=self)
         return obj
 
 
 class LambdaCapture(Variant):
 
+    __slots__ = (
+            "capture_kind",
+            "captures_this",
+            "captures_variable",
+            "captures_VLAtype",
+            "init_captured_vardecl",
+            "captured_var",
+            "is_implicit",
+            "location",
+            "is_pack_expansion",
+            "captures_VLAType"
+            )
+
     def __init__(self):
         super().__init__()
         self.capture_kind = ""
@@ -980,29 +1098,31 @@ class LambdaCapture(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.capture_kind = obj["capture_kind"]
-        self.captures_this = obj["captures_this"]
-        self.captures_variable = obj["captures_variable"]
-        self.captures_VLAType = obj["captures_VLAType"]
+        self.capture_kind = obj.get("capture_kind")
+        self.captures_this = obj.get("captures_this")
+        self.captures_variable = obj.get("captures_variable")
+        self.captures_VLAType = obj.get("captures_VLAType")
         self.init_captured_vardecl = DeclFactory.create_variant(
-                obj["init_captured_vardecl"],
+                obj.get("init_captured_vardecl"),
                 save=False,
                 parent=self
                 )
         self.captured_var = DeclRef.load_json(
-                obj["captured_var"],
+                obj.get("captured_var"),
                 parent=self
                 )
-        self.is_implicit = obj["is_implicit"]
+        self.is_implicit = obj.get("is_implicit")
         self.location = SourceRange(
-                obj["location"]
+                obj.get("location")
                 )
-        self.is_pack_expansion = obj["is_pack_expansion"]
+        self.is_pack_expansion = obj.get("is_pack_expansion")
         return obj
 
 
 class CXXCtorInitializer(Variant):
 
+    __slots__ = ("declaration", "qualified_type", "virtual_base", "init_expr")
+
     def __init__(self):
         super().__init__()
         self.declaration = None
@@ -1012,22 +1132,38 @@ class CXXCtorInitializer(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.kind = obj["kind"]
-        self.declaration = DeclRef.load_json(obj["declaration"], parent=self)
-        self.qualified_type = TypePointer(obj["qualified_type"], self)
-        self.virtual_base = obj["virtual_base"]
-        self.init_expr = StmtFactory.create_variant(obj["init_expr"])
+        self.kind = obj.get("kind")
+        self.declaration = DeclRef.load_json(obj.get("declaration"), parent=self)
+        self.qualified_type = TypePointer(obj.get("qualified_type"), self)
+        self.virtual_base = obj.get("virtual_base")
+        self.init_expr = StmtFactory.create_variant(obj.get("init_expr"))
         return obj
 
 
-class DeclContext(SkippableVariant, IdContainer):
+class DeclContext(SkippableVariant, IdContainer, mixin=True):
+
+    __slots__ = (
+            "c_linkage",
+            "has_external_lexical_storage",
+            "has_external_visible_storage",
+            "_declarations",
+            "_pending_declarations",
+            "_scope",
+            "context_pointer",
+            "n_anonymous_fields",
+            "n_anonymous_enums",
+            "n_anonymous_namespaces",
+            "n_anonymous_unions"
+            )
 
     def __init__(self):
         super().__init__()
         self.c_linkage = False
         self.has_external_lexical_storage = None
         self.has_external_visible_storage = None
-        self.declarations = []
+        self._declarations = []
+        self._pending_declarations = None
+        self._scope = None
         self.context_pointer = -1
         self.n_anonymous_fields = 0
         self.n_anonymous_enums = 0
@@ -1035,6 +1171,64 @@ class DeclContext(SkippableVariant, IdContainer):
         self.n_anonymous_unions = 0
         return
 
+    # Contexts read in a lazy load keep their raw declarations until first
+    # accessed. The translation unit always loads its own.
+    lazy_declarations = True
+
+    @property
+    def declarations(self) -> List[Union[Decl, "DeclContext"]]:
+        self.materialize()
+        return self._declarations
+
+    def materialize(self) -> None:
+        if self._pending_declarations is None:
+            return
+        pending = self._pending_declarations
+        scope = self._scope
+        self._pending_declarations = None
+        self._scope = None
+        with scope:
+            if scope.iterative:
+                pointers.load_iteratively(self.load_declarations, pending)
+            else:
+                self.load_declarations(pending)
+            scope.resolve()
+            self.build_id_map()
+        return
+
+    def load_declarations(self, declarations: List[dict]) -> None:
+        if pointers.load_stack is not None:
+            # Loaded after this context, at the positions they take here.
+            at = [len(self._declarations), len(self._named_decls)]
+            pointers.load_stack.extend(
+                    (self.insert_declaration, (decl, at)) for
+                    decl in declarations
+                    )
+            return
+        for decl in declarations:
+            decl_obj = DeclFactory.create_variant(
+                    decl,
+                    save=False,
+                    parent=self)
+            if decl_obj is not None:
+                self._declarations.append(decl_obj)
+            if isinstance(decl_obj, NamedDecl):
+                self._named_decls.append(decl_obj)
+        return
+
+    def insert_declaration(self, decl: dict, at: List[int]) -> None:
+        decl_obj = DeclFactory.create_variant(
+                decl,
+                save=False,
+                parent=self)
+        if decl_obj is not None:
+            self._declarations.insert(at[0], decl_obj)
+            at[0] += 1
+        if isinstance(decl_obj, NamedDecl):
+            self._named_decls.insert(at[1], decl_obj)
+            at[1] += 1
+        return
+
     def _get_decl_kind(self, decl_kind) -> List[Union[Decl, "DeclContext"]]:
         out = []
         for decl in self.declarations:
@@ -1077,53 +1271,58 @@ class DeclContext(SkippableVariant, IdContainer):
     def load_content(self, obj: dict) -> dict:
         if SkippableVariant.load_content(self, obj):
             return
-        self.c_linkage = obj["c_linkage"]
+        self.c_linkage = obj.get("c_linkage")
         self.has_external_lexical_storage = (
-                obj["has_external_lexical_storage"]
+                obj.get("has_external_lexical_storage")
                 )
         self.has_external_visible_storage = (
-                obj["has_external_visible_storage"]
+                obj.get("has_external_visible_storage")
                 )
-        for decl in obj["declarations"]:
-            decl_obj = DeclFactory.create_variant(
-                    JsonWrapper(decl),
-                    save=False,
-                    parent=self)
-            if decl_obj is not None:
-                self.declarations.append(decl_obj)
-            if isinstance(decl_obj, NamedDecl):
-                self._named_decls.append(decl_obj)
-        self.context_pointer = obj["pointer"]
+        if pointers.scope is not None and self.lazy_declarations:
+            self._pending_declarations = obj.get("declarations")
+            self._scope = pointers.scope
+        else:
+            self.load_declarations(obj.get("declarations"))
+        self.context_pointer = obj.get("pointer")
 
         return obj
 
 
+@default_code_model("decl", "CapturedDecl")
 class CapturedDecl(Decl, DeclContext):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
     def load_content(self, obj: dict) -> dict:
-        Decl.load_content(self, obj["decl"])
-        DeclContext.load_content(self, obj["content"])
+        Decl.load_content(self, obj.get("decl"))
+        DeclContext.load_content(self, obj.get("content"))
         return obj
 
 
+@default_code_model("decl", "LinkageSpecDecl")
 class LinkageSpecDecl(Decl, DeclContext):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
 
     def load_content(self, obj: dict) -> dict:
-        Decl.load_content(self, obj["decl"])
-        DeclContext.load_content(self, obj["context"])
+        Decl.load_content(self, obj.get("decl"))
+        DeclContext.load_content(self, obj.get("context"))
         return obj
 
 
+@default_code_model("decl", "NamespaceDecl")
 class NamespaceDecl(NamedDecl, DeclContext):
 
+    __slots__ = ("is_inline", "original_namespace")
+
     def __init__(self):
         super().__init__()
         self.is_inline = False
@@ -1131,10 +1330,10 @@ class NamespaceDecl(NamedDecl, DeclContext):
         return
 
     def load_content(self, obj: dict) -> dict:
-        NamedDecl.load_content(self, obj["named_decl"])
-        DeclContext.load_content(self, obj["context"])
-        self.is_inline = obj["is_inline"]
-        self.original_namespace = obj["original_namespace"]
+        NamedDecl.load_content(self, obj.get("named_decl"))
+        DeclContext.load_content(self, obj.get("context"))
+        self.is_inline = obj.get("is_inline")
+        self.original_namespace = obj.get("original_namespace")
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -1150,16 +1349,19 @@ class NamespaceDecl(NamedDecl, DeclContext):
         return
 
 
+@default_code_model("decl", "TypeDecl")
 class TypeDecl(NamedDecl):
 
+    __slots__ = ("type",)
+
     def __init__(self):
         super().__init__()
         self.type = -1
         return
 
     def load_content(self, obj: dict) -> dict:
-        NamedDecl.load_content(self, obj["named_decl"])
-        self.type = TypePointer(obj["type_pointer"], self)
+        NamedDecl.load_content(self, obj.get("named_decl"))
+        self.type = TypePointer(obj.get("type_pointer"), self)
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -1167,29 +1369,35 @@ class TypeDecl(NamedDecl):
         return
 
 
+@default_code_model("decl", "TagDecl")
 class TagDecl(TypeDecl, DeclContext):
 
+    __slots__ = ("tag_kind",)
+
     def __init__(self):
         super().__init__()
         self.tag_kind = ""
         return
 
     def load_content(self, obj: dict) -> dict:
-        TypeDecl.load_content(self, obj["type_decl"])
-        DeclContext.load_content(self, obj["context"])
-        self.tag_kind = obj["tag_kind"]
+        TypeDecl.load_content(self, obj.get("type_decl"))
+        DeclContext.load_content(self, obj.get("context"))
+        self.tag_kind = obj.get("tag_kind")
         return obj
 
 
-class ValueDecl(NamedDecl, QualType):
+@default_code_model("decl", "ValueDecl")
+class ValueDecl(NamedDecl, QualTypeMixin):
+
+    __slots__ = ()
 
     def __init__(self):
         super().__init__()
         return
 
     def load_content(self, obj: dict) -> dict:
-        NamedDecl.load_content(self, obj["named_decl"])
-        QualType.load_content(self, obj["qualified_type"])
+        NamedDecl.load_content(self, obj.get("named_decl"))
+        QualTypeMixin.load_content(self, obj.get("qualified_type"))
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -1197,8 +1405,13 @@ class ValueDecl(NamedDecl, QualType):
         return
 
 
+@default_code_model("decl", "TranslationUnitDecl")
 class TranslationUnitDecl(DeclContext):
-    
+
+    __slots__ = ("referenced_decls", "referenced_types", "integer_type_widths")
+
+    lazy_declarations = False
+
     def __init__(self):
         super().__init__()
         self.referenced_decls = []
@@ -1206,25 +1419,28 @@ class TranslationUnitDecl(DeclContext):
         return
 
     def load_content(self, obj: dict) -> dict:
-        DeclContext.load_content(self, obj["main_context"])
-        self.integer_type_widths = obj["integer_type_widths"]
-        for decl in obj["referenced_decls"]:
+        DeclContext.load_content(self, obj.get("main_context"))
+        self.integer_type_widths = obj.get("integer_type_widths")
+        for decl in obj.get("referenced_decls"):
             self.referenced_decls.append(
                     DeclFactory.create_variant(
-                        JsonWrapper(decl),
+                        decl,
                         parent=self)
                     )
-        for type_ in obj["referenced_types"]:
+        for type_ in obj.get("referenced_types"):
             self.referenced_types.append(
-                    TypeFactory.create_variant(JsonWrapper(type_),
+                    TypeFactory.create_variant(type_,
                         parent=self)
                     )
-        self.pointer = register_ptr(obj["pointer"], self)
+        self.pointer = register_ptr(obj.get("pointer"), self)
         return obj
 
 
+@default_code_model("decl", "TypedefDecl")
 class TypedefDecl(TypeDecl, IdContainer):
 
+    __slots__ = ("underlying_type", "is_module_private", "is_struct", "struct")
+
     def __init__(self):
         super().__init__()
         self.underlying_type = None
@@ -1235,18 +1451,18 @@ class TypedefDecl(TypeDecl, IdContainer):
         return
 
     def load_content(self, obj: dict) -> dict:
-        TypeDecl.load_content(self, obj["type_decl"])
+        TypeDecl.load_content(self, obj.get("type_decl"))
         self.underlying_type = QualType.load_json(
-                obj["underlying_type"],
+                obj.get("underlying_type"),
                 parent=self)
-        self.is_module_private = obj["is_module_private"]
+        self.is_module_private = obj.get("is_module_private")
         return obj
 
     def link_typedef(self) -> None:
-        if (
-                "desugared_type" not in
-                vars(self.underlying_type.type_object)
-            ):
+        if not hasattr(
+                self.underlying_type.type_object,
+                "desugared_type"
+                ):
             return
         if self.underlying_type.type_object.desugared_type is None:
             return
@@ -1262,6 +1478,7 @@ class TypedefDecl(TypeDecl, IdContainer):
             ):
             self.is_struct = True
             self.struct = self.underlying_type.type_object.desugared_type.decl
+            self.struct.materialize()
             self._identifier_map = copy.deepcopy(
                     self.underlying_type.type_object.desugared_type
                     .decl._identifier_map
@@ -1279,8 +1496,11 @@ class TypedefDecl(TypeDecl, IdContainer):
         return
 
 
+@default_code_model("decl", "EnumDecl")
 class EnumDecl(TagDecl):
 
+    __slots__ = ("scope", "is_module_private", "int_type")
+
     def _init__(self):
         super().__init__()
         self.scope = ""
@@ -1289,9 +1509,9 @@ class EnumDecl(TagDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        TagDecl.load_content(self, obj["tag_decl"])
-        self.scope = obj["scope"]
-        self.is_module_private = obj["is_module_private"]
+        TagDecl.load_content(self, obj.get("tag_decl"))
+        self.scope = obj.get("scope")
+        self.is_module_private = obj.get("is_module_private")
         self.int_type = QualType.load_json(obj[
             "int_type"
             ])
@@ -1318,8 +1538,16 @@ class EnumDecl(TagDecl):
         return
 
 
+@default_code_model("decl", "RecordDecl")
 class RecordDecl(TagDecl):
 
+    __slots__ = (
+            "definition",
+            "is_module_private",
+            "is_complete_definition",
+            "is_dependent_type"
+            )
+
     def __init__(self):
         super().__init__()
         self.definition = -1
@@ -1329,16 +1557,19 @@ class RecordDecl(TagDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        TagDecl.load_content(self, obj["tag_decl"])
-        self.definition = DeclPointer(obj["definition_pointer"], self)
-        self.is_module_private = obj["is_module_private"]
-        self.is_complete_definition = obj["is_complete_definition"]
-        self.is_dependent_type = obj["is_dependent_type"]
+        TagDecl.load_content(self, obj.get("tag_decl"))
+        self.definition = DeclPointer(obj.get("definition_pointer"), self)
+        self.is_module_private = obj.get("is_module_private")
+        self.is_complete_definition = obj.get("is_complete_definition")
+        self.is_dependent_type = obj.get("is_dependent_type")
         return obj
 
 
+@default_code_model("decl", "EnumConstantDecl")
 class EnumConstantDecl(ValueDecl):
 
+    __slots__ = ("init_expr", "value")
+
     def __init__(self):
         super().__init__()
         self.init_expr = None
@@ -1346,13 +1577,13 @@ class EnumConstantDecl(ValueDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        ValueDecl.load_content(self, obj["value_decl"])
+        ValueDecl.load_content(self, obj.get("value_decl"))
         self.init_expr = StmtFactory.create_variant(
-                obj["init_expr"],
+                obj.get("init_expr"),
                 save=False,
                 parent=self
                 )
-        self.value = obj["value"]
+        self.value = obj.get("value")
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -1366,7 +1597,10 @@ class EnumConstantDecl(ValueDecl):
         return
 
 
+@default_code_model("decl", "IndirectFieldDecl")
 class IndirectFieldDecl(ValueDecl):
+
+    __slots__ = ("decl_refs", "direct")
     
     def __init__(self):
         super().__init__()
@@ -1375,9 +1609,9 @@ class IndirectFieldDecl(ValueDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        ValueDecl.load_content(self, obj["value_decl"])
+        ValueDecl.load_content(self, obj.get("value_decl"))
         self.decl_refs = [DeclRef.load_json(x, parent=self) for
-                x in obj["decl_refs"]]
+                x in obj.get("decl_refs")]
         self.direct = DeclPointer(
                 self.decl_refs[-1].decl._pointer,
                 self
@@ -1385,8 +1619,30 @@ class IndirectFieldDecl(ValueDecl):
         return obj
 
 
+@default_code_model("decl", "FunctionDecl")
 class FunctionDecl(ValueDecl, IdContainer):
 
+    __slots__ = (
+            "mangled_name",
+            "is_cpp",
+            "is_inline",
+            "is_module_private",
+            "is_pure",
+            "is_delete_as_written",
+            "is_no_return",
+            "is_variadic",
+            "is_static",
+            "parameters",
+            "decl_ptr_with_body",
+            "body",
+            "template_specialization",
+            "param_types_tuple",
+            "is_template",
+            "return_type",
+            "is_ccp",
+            "is_deleted_as_written"
+            )
+
     def __init__(self):
         super().__init__()
         self.mangled_name = None
@@ -1407,23 +1663,23 @@ class FunctionDecl(ValueDecl, IdContainer):
         return
 
     def load_content(self, obj: dict) -> dict:
-        ValueDecl.load_content(self, obj["value_decl"])
-        self.mangled_name = obj["mangled_name"]
-        self.return_type = QualType.load_json(obj["return_type"])
-        self.is_ccp = obj["is_cpp"]
-        self.is_inline = obj["is_inline"]
-        self.is_module_private = obj["is_module_private"]
-        self.is_pure = obj["is_pure"]
-        self.is_deleted_as_written = obj["is_deleted_as_written"]
-        self.is_no_return = obj["is_no_return"]
-        self.is_variadic = obj["is_variadic"]
-        self.is_static = obj["is_static"]
+        ValueDecl.load_content(self, obj.get("value_decl"))
+        self.mangled_name = obj.get("mangled_name")
+        self.return_type = QualType.load_json(obj.get("return_type"))
+        self.is_ccp = obj.get("is_cpp")
+        self.is_inline = obj.get("is_inline")
+        self.is_module_private = obj.get("is_module_private")
+        self.is_pure = obj.get("is_pure")
+        self.is_deleted_as_written = obj.get("is_deleted_as_written")
+        self.is_no_return = obj.get("is_no_return")
+        self.is_variadic = obj.get("is_variadic")
+        self.is_static = obj.get("is_static")
         self.parameters = [
                 DeclFactory.create_variant(
-                    JsonWrapper(x),
+                    x,
                     save=False,
                     parent=self) for
-                x in obj["parameters"]
+                x in obj.get("parameters")
                 ]
         self.param_types_tuple = tuple(
                 [x.type for x in self.parameters]
@@ -1433,7 +1689,7 @@ class FunctionDecl(ValueDecl, IdContainer):
 
         self.template_specialization = (
                 TemplateSpecialization.load_json(
-                    obj["template_specialization"],
+                    obj.get("template_specialization"),
                     parent=self
                     )
                 )
@@ -1488,8 +1744,16 @@ class FunctionDecl(ValueDecl, IdContainer):
         return arg_list
 
 
+@default_code_model("decl", "FieldDecl")
 class FieldDecl(ValueDecl):
 
+    __slots__ = (
+            "is_mutable",
+            "is_module_private",
+            "init_expr",
+            "bit_width_expr"
+            )
+
     def __init__(self):
         super().__init__()
         self.is_mutable = False
@@ -1499,17 +1763,17 @@ class FieldDecl(ValueDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        ValueDecl.load_content(self, obj["value_decl"])
-        self.is_mutable = obj["is_mutable"]
-        self.is_module_private = obj["is_module_private"]
+        ValueDecl.load_content(self, obj.get("value_decl"))
+        self.is_mutable = obj.get("is_mutable")
+        self.is_module_private = obj.get("is_module_private")
         self.bit_width_expr = StmtFactory.create_variant(
-                obj["bit_width_expr"],
+                obj.get("bit_width_expr"),
                 save=False,
                 parent=self
                 )
 
         self.init_expr = StmtFactory.create_variant(
-                obj["init_expr"],
+                obj.get("init_expr"),
                 save=False,
                 parent=self
                 )
@@ -1531,8 +1795,23 @@ class FieldDecl(ValueDecl):
         return
 
 
+@default_code_model("decl", "VarDecl")
 class VarDecl(ValueDecl):
 
+    __slots__ = (
+            "is_global",
+            "is_extern",
+            "is_static",
+            "is_static_local",
+            "is_static_data_member",
+            "is_const_expr",
+            "is_init_ice",
+            "init_expr",
+            "is_init_expr_cxx11_constant",
+            "parm_index_in_function",
+            "has_default"
+            )
+
     def __init__(self):
         super().__init__()
         self.is_global = False
@@ -1549,26 +1828,26 @@ class VarDecl(ValueDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        ValueDecl.load_content(self, obj["value_decl"])
-        self.is_global = obj["is_global"]
-        self.is_extern = obj["is_extern"]
-        self.is_static = obj["is_static"]
-        self.is_static_local = obj["is_static_local"]
-        self.is_static_data_member = obj["is_static_data_member"]
-        self.is_const_expr = obj["is_const_expr"]
-        self.is_init_ice = obj["is_init_ice"]
-        self.has_default = obj["has_default"]
+        ValueDecl.load_content(self, obj.get("value_decl"))
+        self.is_global = obj.get("is_global")
+        self.is_extern = obj.get("is_extern")
+        self.is_static = obj.get("is_static")
+        self.is_static_local = obj.get("is_static_local")
+        self.is_static_data_member = obj.get("is_static_data_member")
+        self.is_const_expr = obj.get("is_const_expr")
+        self.is_init_ice = obj.get("is_init_ice")
+        self.has_default = obj.get("has_default")
         self.init_expr = StmtFactory.create_variant(
-                obj["init_expr"],
+                obj.get("init_expr"),
                 save=False,
                 parent=self
                 )
 
         self.is_init_expr_cxx11_constant = (
-                obj["is_init_expr_cxx11_constant"]
+                obj.get("is_init_expr_cxx11_constant")
                 )
         self.parm_index_in_function = (
-                obj["parm_index_in_function"]
+                obj.get("parm_index_in_function")
                 )
         return obj
 
@@ -1585,19 +1864,29 @@ class VarDecl(ValueDecl):
 
 class ImportDecl(Decl):
 
+    __slots__ = ("module_name",)
+
     def __init__(self):
         super().__init__()
         self.module_name = ""
         return
 
     def load_content(self, obj: dict) -> dict:
-        Decl.load_content(self, obj["decl"])
-        self.module_name = obj["module_name"]
+        Decl.load_content(self, obj.get("decl"))
+        self.module_name = obj.get("module_name")
         return obj
 
 
+@default_code_model("decl", "UsingDirectiveDecl")
 class UsingDirectiveDecl(NamedDecl):
 
+    __slots__ = (
+            "using_location",
+            "namespace_key_location",
+            "nested_name_specifier_locs",
+            "nominated_namespace"
+            )
+
     def __init__(self):
         super().__init__()
         self.using_location = None
@@ -1607,20 +1896,20 @@ class UsingDirectiveDecl(NamedDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        NamedDecl.load_content(self, obj["named_decl"])
+        NamedDecl.load_content(self, obj.get("named_decl"))
         self.using_location = SourceLocation.load_json(
-                obj["using_location"]
+                obj.get("using_location")
                 )
         self.namespace_key_location = SourceLocation.load_json(
-                obj["namespace_key_location"]
+                obj.get("namespace_key_location")
                 )
         self.nested_name_specifier_locs = [
                 NestedNameSpecifierLoc.load_json(x, parent=self) 
-                for x in obj["nested_name_specifier_locs"]
+                for x in obj.get("nested_name_specifier_locs")
                 ]
         self.nominated_namespace = (
                 DeclRef.load_json(
-                    obj["nominated_namespace"],
+                    obj.get("nominated_namespace"),
                     parent=self
                 )
                 )
@@ -1640,8 +1929,16 @@ class UsingDirectiveDecl(NamedDecl):
         return
 
 
+@default_code_model("decl", "NamespaceAliasDecl")
 class NamespaceAliasDecl(NamedDecl):
 
+    __slots__ = (
+            "namespace_loc",
+            "target_name_loc",
+            "nested_name_specifier_locs",
+            "namespace"
+            )
+
     def __init__(self):
         super().__init__()
         self.namespace_loc = None
@@ -1651,18 +1948,18 @@ class NamespaceAliasDecl(NamedDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        NamedDecl.load_content(self, obj["named_decl"])
+        NamedDecl.load_content(self, obj.get("named_decl"))
         self.namespace_loc = (
-                SourceLocation.load_json(obj["namespace_loc"])
+                SourceLocation.load_json(obj.get("namespace_loc"))
                 )
         self.target_name_loc = (
-                SourceLocation.load_json(obj["target_name_loc"])
+                SourceLocation.load_json(obj.get("target_name_loc"))
                 )
         self.nested_name_specifier_locs = [
                 NestedNameSpecifierLoc.load_json(x, parent=self) for x in
-                obj["nested_name_specifier_locs"]
+                obj.get("nested_name_specifier_locs")
                 ]
-        self.namespace = DeclRef.load_json(obj["namespace"], parent=self)
+        self.namespace = DeclRef.load_json(obj.get("namespace"), parent=self)
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -1672,6 +1969,8 @@ class NamespaceAliasDecl(NamedDecl):
 
 class ClassBase(Variant):
 
+    __slots__ = ("type", "access_specifier", "is_virtual", "is_transitive")
+
     def __init__(self):
         super().__init__()
         self.type = -1
@@ -1681,14 +1980,32 @@ class ClassBase(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.type = TypePointer(obj["type"], self)
-        self.access_specifier = obj["access_specifier"]
-        self.is_virtual = obj["is_virtual"]
-        self.is_transitive = obj["is_transitive"]
+        self.type = TypePointer(obj.get("type"), self)
+        self.access_specifier = obj.get("access_specifier")
+        self.is_virtual = obj.get("is_virtual")
+        self.is_transitive = obj.get("is_transitive")
         return obj
 
 
+@default_code_model("decl", "CXXRecordDecl")
 class CXXRecordDecl(RecordDecl):
+
+    __slots__ = (
+            "is_complete",
+            "is_polymorphic",
+            "is_abstract",
+            "bases",
+            "is_pod",
+            "destructor",
+            "lambda_call_operator",
+            "lambda_captures",
+            "is_struct",
+            "is_interface",
+            "is_class",
+            "is_union",
+            "is_enum",
+            "is_template"
+            )
     
     def __init__(self):
         super().__init__()
@@ -1709,33 +2026,33 @@ class CXXRecordDecl(RecordDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        RecordDecl.load_content(self, obj["record"])
-        self.is_complete = obj["is_complete"]
-        self.is_polymorphic = obj["is_polymorphic"]
-        self.is_abstract = obj["is_abstract"]
+        RecordDecl.load_content(self, obj.get("record"))
+        self.is_complete = obj.get("is_complete")
+        self.is_polymorphic = obj.get("is_polymorphic")
+        self.is_abstract = obj.get("is_abstract")
         self.bases = [
-                ClassBase.load_json(x, parent=self) for x in obj["bases"]
+                ClassBase.load_json(x, parent=self) for x in obj.get("bases")
                 ]
-        self.is_pod = obj["is_pod"]
+        self.is_pod = obj.get("is_pod")
         dtor_names = copy.copy(self.qual_name)
         dtor_names[0] = "~" + dtor_names[0]
         self.destructor = "::".join(reversed(dtor_names))
         self.destructor += "()"
         self.lambda_call_operator = (
                 DeclRef.load_json(
-                    obj["lambda_call_operator"],
+                    obj.get("lambda_call_operator"),
                     parent=self
                     )
                 )
         self.lambda_captures = [
                 LambdaCapture.load_json(x, parent=self) for
-                x in obj["lambda_captures"]
+                x in obj.get("lambda_captures")
                 ]
-        self.is_struct = obj["is_struct"]
-        self.is_interface = obj["is_interface"]
-        self.is_class = obj["is_class"]
-        self.is_union = obj["is_union"]
-        self.is_enum = obj["is_enum"]
+        self.is_struct = obj.get("is_struct")
+        self.is_interface = obj.get("is_interface")
+        self.is_class = obj.get("is_class")
+        self.is_union = obj.get("is_union")
+        self.is_enum = obj.get("is_enum")
         return obj
 
     @property
@@ -1773,6 +2090,8 @@ class CXXRecordDecl(RecordDecl):
 
 class TemplateArgument(Variant):
 
+    __slots__ = ("type", "pointer", "integer", "parameter_pack")
+
     def __init__(self):
         super().__init__()
         self.kind = ""
@@ -1783,19 +2102,21 @@ class TemplateArgument(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.kind = obj["kind"]
-        self.type = QualType.load_json(obj["type"])
-        self.pointer = DeclPointer(obj["pointer"], self)
-        self.integer = obj["integer"]
+        self.kind = obj.get("kind")
+        self.type = QualType.load_json(obj.get("type"))
+        self.pointer = DeclPointer(obj.get("pointer"), self)
+        self.integer = obj.get("integer")
         self.parameter_pack = [
                 TemplateArgument.load_json(x, parent=self) for
-                x in obj["parameter_pack"]]
+                x in obj.get("parameter_pack")]
         self.clang_kind = "TemplateArgument"
         self._json = obj
         return obj
 
 
-class TemplateSpecialization(Variant, IdContainer):
+class TemplateSpecializationMixin(Variant, IdContainer, mixin=True):
+
+    __slots__ = ("template", "specialization_args")
 
     def __init__(self):
         super().__init__()
@@ -1804,15 +2125,26 @@ class TemplateSpecialization(Variant, IdContainer):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.template = DeclPointer(obj["template_decl"], self)
+        self.template = DeclPointer(obj.get("template_decl"), self)
         self.specialization_args = [
                 TemplateArgument.load_json(x, parent=self) for
-                x in obj["specialization_args"]
+                x in obj.get("specialization_args")
                 ]
         return obj
 
 
-class ClassTemplateSpecializationDecl(CXXRecordDecl, TemplateSpecialization):
+class TemplateSpecialization(TemplateSpecializationMixin):
+
+    __slots__ = ()
+
+
+@default_code_model("decl", "ClassTemplateSpecializationDecl")
+class ClassTemplateSpecializationDecl(
+        CXXRecordDecl,
+        TemplateSpecializationMixin
+        ):
+
+    __slots__ = ("mangled_name",)
 
     def __init__(self):
         super().__init__()
@@ -1821,9 +2153,12 @@ class ClassTemplateSpecializationDecl(CXXRecordDecl, TemplateSpecialization):
         return
 
     def load_content(self, obj: dict) -> dict:
-        CXXRecordDecl.load_content(self, obj["cxx_record"])
-        TemplateSpecialization.load_content(self, obj["specialization"])
-        self.mangled_name = obj["mangled_name"]
+        CXXRecordDecl.load_content(self, obj.get("cxx_record"))
+        TemplateSpecializationMixin.load_content(
+                self,
+                obj.get("specialization")
+                )
+        self.mangled_name = obj.get("mangled_name")
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -1896,8 +2231,16 @@ class ClassTemplateSpecializationDecl(CXXRecordDecl, TemplateSpecialization):
         return ", ".join(arg_repr)
 
 
+@default_code_model("decl", "CXXMethodDecl")
 class CXXMethodDecl(FunctionDecl):
 
+    __slots__ = (
+            "is_virtual",
+            "is_constexpr",
+            "cxx_ctor_initializers",
+            "overriden_methods"
+            )
+
     def __init__(self):
         super().__init__()
         self.is_virtual = False
@@ -1908,17 +2251,17 @@ class CXXMethodDecl(FunctionDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        FunctionDecl.load_content(self, obj["function"])
-        self.is_virtual = obj["is_virtual"]
-        self.is_static = obj["is_static"]
-        self.is_constexpr = obj["is_constexpr"]
+        FunctionDecl.load_content(self, obj.get("function"))
+        self.is_virtual = obj.get("is_virtual")
+        self.is_static = obj.get("is_static")
+        self.is_constexpr = obj.get("is_constexpr")
         self.cxx_ctor_initializers = [
                 CXXCtorInitializer.load_json(x, parent=self) for
-                x in obj["cxx_ctor_initializers"]
+                x in obj.get("cxx_ctor_initializers")
                 ]
         self.overriden_methods = [
                 DeclRef.load_json(x, parent=self) for
-                x in obj["overriden_methods"]
+                x in obj.get("overriden_methods")
                 ]
         return obj
 
@@ -1933,8 +2276,16 @@ class CXXMethodDecl(FunctionDecl):
         return
 
 
+@default_code_model("decl", "CXXConstructorDecl")
 class CXXConstructorDecl(CXXMethodDecl):
 
+    __slots__ = (
+            "is_default",
+            "is_copy_ctor",
+            "is_move_ctor",
+            "is_converting_ctor"
+            )
+
     def __init__(self):
         super().__init__()
         self.is_default = False
@@ -1944,11 +2295,11 @@ class CXXConstructorDecl(CXXMethodDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        CXXMethodDecl.load_content(self, obj["ctor"])
-        self.is_default = obj["is_default"]
-        self.is_copy_ctor = obj["is_copy_ctor"]
-        self.is_move_ctor = obj["is_move_ctor"]
-        self.is_converting_ctor = obj["is_converting_ctor"]
+        CXXMethodDecl.load_content(self, obj.get("ctor"))
+        self.is_default = obj.get("is_default")
+        self.is_copy_ctor = obj.get("is_copy_ctor")
+        self.is_move_ctor = obj.get("is_move_ctor")
+        self.is_converting_ctor = obj.get("is_converting_ctor")
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -1981,8 +2332,16 @@ class CXXConstructorDecl(CXXMethodDecl):
         return
 
 
+@default_code_model("decl", "ClassTemplateDecl")
 class ClassTemplateDecl(CXXRecordDecl):
 
+    __slots__ = (
+            "template_decl",
+            "parameters",
+            "specializations",
+            "partial_specializations"
+            )
+
     def __init__(self):
         super().__init__()
         self.template_decl = None
@@ -1993,18 +2352,18 @@ class ClassTemplateDecl(CXXRecordDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.template_decl = NamedDecl.load_json(obj["named_decl"])
-        CXXRecordDecl.load_content(self, obj["cxx_record"])
-        for xx in obj["parameters"]:
-            if xx["param_type"] == "TemplateTypeParam":
+        self.template_decl = NamedDecl.load_json(obj.get("named_decl"))
+        CXXRecordDecl.load_content(self, obj.get("cxx_record"))
+        for xx in obj.get("parameters"):
+            if xx.get("param_type") == "TemplateTypeParam":
                 self.parameters.append(
                         TemplateTypeParmDecl.load_json(xx, parent=self)
                         )
-            elif xx["param_type"] == "TemplateNonTypeParam":
+            elif xx.get("param_type") == "TemplateNonTypeParam":
                 self.parameters.append(
                         TemplateNonTypeParmDecl.load_json(xx, parent=self)
                         )
-            elif xx["param_type"] == "TemplateTemplateParam":
+            elif xx.get("param_type") == "TemplateTemplateParam":
                 self.parameters.append(
                         TemplateTemplateParmDecl.load_json(xx, parent=self)
                         )
@@ -2012,7 +2371,7 @@ class ClassTemplateDecl(CXXRecordDecl):
             self._named_decls.append(self.parameters[-1])
         self.specializations = [
                 ClassTemplateSpecializationDecl.load_json(x, parent=self._parent) for
-                x in obj["specializations"]
+                x in obj.get("specializations")
                 ]
         for spec in self.specializations:
             spec._save = False
@@ -2021,7 +2380,7 @@ class ClassTemplateDecl(CXXRecordDecl):
                     x,
                     parent=self._parent
                     ) for
-                x in obj["partial_specializations"]
+                x in obj.get("partial_specializations")
                 ]
         for pspec in self.partial_specializations:
             pspec._save = False
@@ -2040,8 +2399,11 @@ class ClassTemplateDecl(CXXRecordDecl):
         return
 
 
+@default_code_model("decl", "FunctionTemplateDecl")
 class FunctionTemplateDecl(FunctionDecl):
 
+    __slots__ = ("template_decl", "template_parameters", "specializations")
+
     def __init__(self):
         super().__init__()
         self.template_decl = None
@@ -2051,18 +2413,18 @@ class FunctionTemplateDecl(FunctionDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.template_decl = NamedDecl.load_json(obj["named_decl"])
-        FunctionDecl.load_content(self, obj["function"])
-        for xx in obj["parameters"]:
-            if xx["param_type"] == "TemplateTypeParam":
+        self.template_decl = NamedDecl.load_json(obj.get("named_decl"))
+        FunctionDecl.load_content(self, obj.get("function"))
+        for xx in obj.get("parameters"):
+            if xx.get("param_type") == "TemplateTypeParam":
                 self.template_parameters.append(
                         TemplateTypeParmDecl.load_json(xx, parent=self)
                         )
-            elif xx["param_type"] == "TemplateNonTypeParam":
+            elif xx.get("param_type") == "TemplateNonTypeParam":
                 self.template_parameters.append(
                         TemplateNonTypeParmDecl.load_json(xx, parent=self)
                         )
-            elif xx["param_type"] == "TemplateTemplateParam":
+            elif xx.get("param_type") == "TemplateTemplateParam":
                 self.template_parameters.append(
                         TemplateTemplateParmDecl.load_json(xx, parent=self)
                         )
@@ -2070,10 +2432,10 @@ class FunctionTemplateDecl(FunctionDecl):
             self._named_decls.append(self.template_parameters[-1])
         self.specializations = [
                 DeclFactory.create_variant(
-                    JsonWrapper(x),
+                    x,
                     save=False,
                     parent=self) for
-                x in obj["specializations"]
+                x in obj.get("specializations")
                 ]
         for spec in [x for x in self.specializations if x is not None]:
             self._named_decls.append(spec)
@@ -2097,8 +2459,11 @@ class FunctionTemplateDecl(FunctionDecl):
         return
 
 
+@default_code_model("decl", "FriendDecl")
 class FriendDecl(Decl):
 
+    __slots__ = ("type", "friend")
+
     def __init__(self):
         super().__init__()
         self.kind = None
@@ -2107,19 +2472,22 @@ class FriendDecl(Decl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Decl.load_content(self, obj["decl"])
-        self.kind = obj["kind"]
-        self.type = obj["type"]
+        Decl.load_content(self, obj.get("decl"))
+        self.kind = obj.get("kind")
+        self.type = obj.get("type")
         self.friend = DeclFactory.create_variant(
-                obj["friend"],
+                obj.get("friend"),
                 save=False,
                 parent=self
                 )
         return
 
 
+@default_code_model("decl", "TypeAliasDecl")
 class TypeAliasDecl(TypeDecl):
 
+    __slots__ = ("underlying_type", "described_template")
+
     def __init__(self):
         super().__init__()
         self.underlying_type = None
@@ -2127,18 +2495,21 @@ class TypeAliasDecl(TypeDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        TypeDecl.load_content(self, obj["type_decl"])
+        TypeDecl.load_content(self, obj.get("type_decl"))
         self.underlying_type = QualType.load_json(
-                obj["underlying_type"],
+                obj.get("underlying_type"),
                 parent=self)
         self.described_template = (
-                DeclPointer(obj["described_template"], self)
+                DeclPointer(obj.get("described_template"), self)
                 )
         return obj
 
 
+@default_code_model("decl", "TypeAliasTemplateDecl")
 class TypeAliasTemplateDecl(TypeAliasDecl, IdContainer):
 
+    __slots__ = ("canonical_decl", "template_parameters", "member_template")
+
     def __init__(self):
         super().__init__()
         self.canonical_decl = -1
@@ -2147,35 +2518,38 @@ class TypeAliasTemplateDecl(TypeAliasDecl, IdContainer):
         return
 
     def load_content(self, obj: dict) -> dict:
-        TypeAliasDecl.load_content(self, obj["type_alias_decl"])
-        self.canonical_decl = register_ptr(obj["canonical_decl"], self)
-        for xx in obj["parameters"]:
-            if xx["param_type"] == "TemplateTypeParam":
+        TypeAliasDecl.load_content(self, obj.get("type_alias_decl"))
+        self.canonical_decl = register_ptr(obj.get("canonical_decl"), self)
+        for xx in obj.get("parameters"):
+            if xx.get("param_type") == "TemplateTypeParam":
                 self.template_parameters.append(
                         TemplateTypeParmDecl.load_json(
                             xx,
                             parent=self
                             )
                         )
-            elif xx["param_type"] == "TemplateNonTypeParam":
+            elif xx.get("param_type") == "TemplateNonTypeParam":
                 self.template_parameters.append(
                         TemplateNonTypeParmDecl.load_json(xx, parent=self)
                         )
-            elif xx["param_type"] == "TemplateTemplateParam":
+            elif xx.get("param_type") == "TemplateTemplateParam":
                 self.template_parameters.append(
                         TemplateTemplateParmDecl.load_json(xx, parent=self)
                         )
             self.template_parameters[-1]._save = False
             self._named_decls.append(self.template_parameters[-1])
         self.member_template = DeclPointer(
-                obj["member_template_decl"],
+                obj.get("member_template_decl"),
                 self
                 )
         return obj
     
 
+@default_code_model("decl", "ClassTemplatePartialSpecializationDecl")
 class ClassTemplatePartialSpecializationDecl(ClassTemplateSpecializationDecl):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
@@ -2183,12 +2557,14 @@ class ClassTemplatePartialSpecializationDecl(ClassTemplateSpecializationDecl):
     def load_content(self, obj: dict) -> dict:
         ClassTemplateSpecializationDecl.load_content(
                 self,
-                obj["class_template_specialization"]
+                obj.get("class_template_specialization")
                 )
         return obj
 
 
-class ParmDecl(Name):
+class ParmDecl(NameMixin, mixin=True):
+
+    __slots__ = ("index", "is_anonymous")
 
     def __init__(self):
         super().__init__()
@@ -2216,8 +2592,18 @@ class ParmDecl(Name):
         return
 
 
+@default_code_model("decl", "TemplateTypeParmDecl")
 class TemplateTypeParmDecl(TypeDecl, ParmDecl):
 
+    __slots__ = (
+            "param_type",
+            "template",
+            "with_typename",
+            "depth",
+            "is_parameter_pack",
+            "default"
+            )
+
     def __init__(self):
         super().__init__()
         self.param_type = ""
@@ -2231,15 +2617,15 @@ class TemplateTypeParmDecl(TypeDecl, ParmDecl):
     def load_content(self, obj: dict) -> dict:
         if SkippableVariant.load_content(self, obj):
             return
-        TypeDecl.load_content(self, obj["type_decl"])
-        self.template = DeclPointer(obj["template_decl"], self)
-        self.param_type = obj["param_type"]
-        self.with_typename = obj["with_typename"]
-        self.index = obj["index"]
-        self.depth = obj["depth"]
-        self.is_parameter_pack = obj["is_parameter_pack"]
+        TypeDecl.load_content(self, obj.get("type_decl"))
+        self.template = DeclPointer(obj.get("template_decl"), self)
+        self.param_type = obj.get("param_type")
+        self.with_typename = obj.get("with_typename")
+        self.index = obj.get("index")
+        self.depth = obj.get("depth")
+        self.is_parameter_pack = obj.get("is_parameter_pack")
         self.default = QualType.load_json(
-                obj["default"],
+                obj.get("default"),
                 parent=self
                 )
         return obj
@@ -2259,8 +2645,17 @@ class TemplateTypeParmDecl(TypeDecl, ParmDecl):
         return
 
 
+@default_code_model("decl", "NonTypeTemplateParmDecl")
 class TemplateNonTypeParmDecl(ValueDecl, ParmDecl):
 
+    __slots__ = (
+            "param_type",
+            "template",
+            "depth",
+            "is_parameter_pack",
+            "default"
+            )
+
     def __init__(self):
         super().__init__()
         self.param_type = ""
@@ -2274,14 +2669,14 @@ class TemplateNonTypeParmDecl(ValueDecl, ParmDecl):
     def load_content(self, obj: dict) -> dict:
         if SkippableVariant.load_content(self, obj):
             return
-        ValueDecl.load_content(self, obj["value_decl"])
-        self.param_type = obj["param_type"]
-        self.template = DeclPointer(obj["template_decl"], self)
-        self.index = obj["index"]
-        self.depth = obj["depth"]
-        self.is_parameter_pack = obj["is_parameter_pack"]
-        self.type = QualType.load_json(obj["type"], parent=self)
-        self.default = obj["default"]
+        ValueDecl.load_content(self, obj.get("value_decl"))
+        self.param_type = obj.get("param_type")
+        self.template = DeclPointer(obj.get("template_decl"), self)
+        self.index = obj.get("index")
+        self.depth = obj.get("depth")
+        self.is_parameter_pack = obj.get("is_parameter_pack")
+        self.type = QualType.load_json(obj.get("type"), parent=self)
+        self.default = obj.get("default")
         return obj
 
     def parm_repr(self) -> str:
@@ -2299,8 +2694,17 @@ class TemplateNonTypeParmDecl(ValueDecl, ParmDecl):
         return
 
 
+@default_code_model("decl", "TemplateTemplateParmDecl")
 class TemplateTemplateParmDecl(NamedDecl, ParmDecl):
 
+    __slots__ = (
+            "param_type",
+            "template",
+            "depth",
+            "is_parameter_pack",
+            "default"
+            )
+
     def __init__(self):
         super().__init__()
         self.param_type = ""
@@ -2313,13 +2717,13 @@ class TemplateTemplateParmDecl(NamedDecl, ParmDecl):
     def load_content(self, obj: dict) -> dict:
         if SkippableVariant.load_content(self, obj):
             return
-        NamedDecl.load_content(self, obj["named_decl"])
-        self.param_type = obj["param_type"]
-        self.template = DeclPointer(obj["template_decl"], self)
-        self.index = obj["index"]
-        self.depth = obj["depth"]
-        self.is_parameter_pack = obj["is_parameter_pack"]
-        self.default = obj["default"]
+        NamedDecl.load_content(self, obj.get("named_decl"))
+        self.param_type = obj.get("param_type")
+        self.template = DeclPointer(obj.get("template_decl"), self)
+        self.index = obj.get("index")
+        self.depth = obj.get("depth")
+        self.is_parameter_pack = obj.get("is_parameter_pack")
+        self.default = obj.get("default")
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -2337,8 +2741,11 @@ class TemplateTemplateParmDecl(NamedDecl, ParmDecl):
         return repres
 
 
+@default_code_model("decl", "ParmVarDecl")
 class ParmVarDecl(ValueDecl, ParmDecl):
 
+    __slots__ = ("has_default", "default_value")
+
     def __init__(self):
         super().__init__()
         self.has_default = False
@@ -2346,10 +2753,10 @@ class ParmVarDecl(ValueDecl, ParmDecl):
         return
 
     def load_content(self, obj: dict) -> dict:
-        ValueDecl.load_content(self, obj["value_decl"])
-        self.has_default = obj["has_default"]
-        self.default_value = obj["default_value"]
-        self.index = obj["index"]
+        ValueDecl.load_content(self, obj.get("value_decl"))
+        self.has_default = obj.get("has_default")
+        self.default_value = obj.get("default_value")
+        self.index = obj.get("index")
         return obj
 
     def set_ccm_identifier(self) -> None:
@@ -2368,79 +2775,20 @@ class DeclFactory(object):
             return None
 
         out = None
-        variant = obj["kind"]
-        content = obj["content"]
+        variant = obj.get("kind")
+        content = obj.get("content")
 
-        if content is None and obj["skipped"]:
+        if content is None and obj.get("skipped"):
             out = SkippableVariant.load_json(obj)
-        elif content["skipped"]:
+        elif content.get("skipped"):
             out = SkippableVariant.load_json(content)
-        elif variant == "CapturedDecl":
-            out = CapturedDecl.load_json(content)
-        elif variant == "LinkageSpecDecl":
-            out = LinkageSpecDecl.load_json(content)
-        elif variant == "NamespaceDecl":
-            out = NamespaceDecl.load_json(content)
-        elif variant == "TypeDecl":
-            out = TypeDecl.load_json(content)
-        elif variant == "TagDecl":
-            out = TagDecl.load_json(content)
-        elif variant == "ValueDecl":
-            out = ValueDecl.load_json(content)
-        elif variant == "TranslationUnitDecl":
-            out = TranslationUnitDecl.load_json(content)
-        elif variant == "TypedefDecl":
-            out = TypedefDecl.load_json(content)
-        elif variant == "EnumDecl":
-            out = EnumDecl.load_json(content)
-        elif variant == "RecordDecl":
-            out = RecordDecl.load_json(content)
-        elif variant == "EnumConstantDecl":
-            out = EnumConstantDecl.load_json(content)
-        elif variant == "IndirectFieldDecl":
-            out = IndirectFieldDecl.load_json(content)
-        elif variant == "FunctionDecl":
-            out = FunctionDecl.load_json(content)
-        elif variant == "FieldDecl":
-            out = FieldDecl.load_json(content)
-        elif variant == "VarDecl":
-            out = VarDecl.load_json(content)
-        elif variant == "UsingDirectiveDecl":
-            out = UsingDirectiveDecl.load_json(content)
-        elif variant == "NamespaceAliasDecl":
-            out = NamespaceAliasDecl.load_json(content)
-        elif variant == "CXXRecordDecl":
-            out = CXXRecordDecl.load_json(content)
-        elif variant == "ClassTemplateSpecializationDecl":
-            out = ClassTemplateSpecializationDecl.load_json(content)
-        elif variant == "CXXConstructorDecl":
-            out = CXXConstructorDecl.load_json(content)
-        elif variant == "ClassTemplateDecl":
-            out = ClassTemplateDecl.load_json(content)
-        elif variant == "FunctionTemplateDecl":
-            out = FunctionTemplateDecl.load_json(content)
-        elif variant == "FriendDecl":
-            out = FriendDecl.load_json(content)
-        elif variant == "TypeAliasDecl":
-            out = TypeAliasDecl.load_json(content)
-        elif variant == "TypeAliasTemplateDecl":
-            out = TypeAliasTemplateDecl.load_json(content)
-        elif variant == "ClassTemplatePartialSpecializationDecl":
-            out = ClassTemplatePartialSpecializationDecl.load_json(content)
-        elif variant == "TemplateTypeParmDecl":
-            out = TemplateTypeParmDecl.load_json(content)
-        elif variant == "NonTypeTemplateParmDecl":
-            out = TemplateNonTypeParmDecl.load_json(content)
-        elif variant == "TemplateTemplateParmDecl":
-            out = TemplateTemplateParmDecl.load_json(content)
-        elif variant == "ParmVarDecl":
-            out = ParmVarDecl.load_json(content)
-        elif variant == "CXXMethodDecl":
-            out = CXXMethodDecl.load_json(content)
         else:
-            return None
-            
-        out.clang_kind = obj["clang_kind"]
+            model = decl_models.get(variant)
+            if model is None:
+                return None
+            out = model.load_json(content)
+
+        out.clang_kind = obj.get("clang_kind")
         out.kind = variant
         out._save = save
         out._json = obj
@@ -2462,21 +2810,20 @@ class StmtFactory(object):
             return None
 
         out = None
-        variant = obj["kind"]
-        content = obj["content"]
+        variant = obj.get("kind")
+        content = obj.get("content")
 
-        if content is None and obj["skipped"]:
+        if content is None and obj.get("skipped"):
             out = SkippableVariant.load_json(obj)
-        elif content["skipped"]:
+        elif content.get("skipped"):
             out = SkippableVariant.load_json(content)
-        elif variant == "Stmt":
-            out = Stmt.load_json(content, parent=self)
-        elif variant == "DeclStmt":
-            out = DeclStmt.load_json(content, parent=self)
         else:
-            return ExprFactory.create_variant(obj, save, parent=parent)
+            model = stmt_models.get(variant)
+            if model is None:
+                return ExprFactory.create_variant(obj, save, parent=parent)
+            out = model.load_json(content, parent=parent)
 
-        out.clang_kind = obj["clang_kind"]
+        out.clang_kind = obj.get("clang_kind")
         out.kind = variant
         out._save = save
         out._json = obj
@@ -2490,6 +2837,8 @@ class StmtFactory(object):
 
 class Expr(Stmt):
 
+    __slots__ = ("qual_type", "value_kind", "object_kind")
+
     def __init__(self):
         super().__init__()
         self.qual_type = None
@@ -2499,15 +2848,18 @@ class Expr(Stmt):
 
     def load_content(self, obj: dict) -> dict:
         content = Stmt.load_content(self, obj)
-        content = content["expr"]
-        self.qual_type = QualType.load_json(content["qual_type"], parent=self)
-        self.value_kind = content["value_kind"]
-        self.object_kind = content["object_kind"]
+        content = content.get("expr")
+        self.qual_type = QualType.load_json(content.get("qual_type"), parent=self)
+        self.value_kind = content.get("value_kind")
+        self.object_kind = content.get("object_kind")
         return content
 
 
+@default_code_model("expr", "CXXBaseSpecifier")
 class CXXBaseSpecifier(Variant):
 
+    __slots__ = ("name", "template", "virtual")
+
     def __init__(self):
         super().__init__()
         self.name = ""
@@ -2516,14 +2868,17 @@ class CXXBaseSpecifier(Variant):
         return
 
     def load_content(self, obj: dict) -> dict:
-        self.name = obj["name"]
-        self.template = obj["template"]
-        self.virtual = obj["virtual"]
+        self.name = obj.get("name")
+        self.template = obj.get("template")
+        self.virtual = obj.get("virtual")
         return obj
 
 
+@default_code_model("expr", "DeclRefExpr")
 class DeclRefExpr(Expr):
 
+    __slots__ = ("decl_ref", "found_decl_ref")
+
     def __init__(self):
         super().__init__()
         self.decl_ref = None
@@ -2531,14 +2886,17 @@ class DeclRefExpr(Expr):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
-        self.decl_ref = DeclRef.load_json(obj["decl_ref"], parent=self)
-        self.found_decl_ref = DeclRef.load_json(obj["decl_ref"], parent=self)
+        Expr.load_content(self, obj.get("expr"))
+        self.decl_ref = DeclRef.load_json(obj.get("decl_ref"), parent=self)
+        self.found_decl_ref = DeclRef.load_json(obj.get("decl_ref"), parent=self)
         return obj
 
 
+@default_code_model("expr", "OverloadExpr")
 class OverloadExpr(Expr):
 
+    __slots__ = ("decls", "name")
+
     def __init__(self):
         super().__init__()
         self.decls = []
@@ -2546,29 +2904,35 @@ class OverloadExpr(Expr):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
+        Expr.load_content(self, obj.get("expr"))
         self.decls = [
-                DeclRef.load_json(x, parent=self) for x in obj["decls"]
+                DeclRef.load_json(x, parent=self) for x in obj.get("decls")
                 ]
-        self.name = obj["name"]
+        self.name = obj.get("name")
         return obj
 
 
+@default_code_model("expr", "CharacterLiteral")
 class CharacterLiteral(Expr):
 
+    __slots__ = ("value",)
+
     def __init__(self):
         super().__init__()
         self.value = None
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
-        self.value = obj["value"]
+        Expr.load_content(self, obj.get("expr"))
+        self.value = obj.get("value")
         return obj
 
 
+@default_code_model("expr", "IntegerLiteral")
 class IntegerLiteral(Expr):
 
+    __slots__ = ("is_signed", "bitwidth", "value")
+
     def __init__(self):
         super().__init__()
         self.is_signed = False
@@ -2577,54 +2941,66 @@ class IntegerLiteral(Expr):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
-        self.is_signed = obj["value"]["is_signed"]
-        self.bitwidth = obj["value"]["bitwidth"]
-        self.value = obj["value"]["value"]
+        Expr.load_content(self, obj.get("expr"))
+        self.is_signed = obj.get("value").get("is_signed")
+        self.bitwidth = obj.get("value").get("bitwidth")
+        self.value = obj.get("value").get("value")
         return obj
 
 
+@default_code_model("expr", "FixedPointLiteral")
 class FixedPointLiteral(Expr):
 
+    __slots__ = ("value",)
+
     def __init__(self):
         super().__init__()
         self.value = None
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
-        self.value = obj["value"]
+        Expr.load_content(self, obj.get("expr"))
+        self.value = obj.get("value")
         return obj
 
 
+@default_code_model("expr", "FloatingPointLiteral")
 class FloatingPointLiteral(Expr):
 
+    __slots__ = ("value",)
+
     def __init__(self):
         super().__init__()
         self.value = None
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
-        self.value = obj["value"]
+        Expr.load_content(self, obj.get("expr"))
+        self.value = obj.get("value")
         return obj
 
 
+@default_code_model("expr", "StringLiteral")
 class StringLiteral(Expr):
 
+    __slots__ = ("value",)
+
     def __init__(self):
         super().__init__()
         self.value = None
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
-        self.value = obj["value"]
+        Expr.load_content(self, obj.get("expr"))
+        self.value = obj.get("value")
         return obj
 
 
+@default_code_model("expr", "MemberExpr")
 class MemberExpr(Expr):
 
+    __slots__ = ("is_arrow", "performs_virtual_dispatch", "id", "decl_ref")
+
     def __init__(self):
         super().__init__()
         self.is_arrow = False
@@ -2634,36 +3010,39 @@ class MemberExpr(Expr):
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
-        self.is_arrow = obj["is_arrow"]
-        self.performs_virtual_dispatch = obj["performs_virtual_dispatch"]
-        self.id = Name.load_json(obj["id"])
-        self.decl_ref = DeclRef.load_json(obj["decl_ref"], parent=self)
+        Expr.load_content(self, obj.get("expr"))
+        self.is_arrow = obj.get("is_arrow")
+        self.performs_virtual_dispatch = obj.get("performs_virtual_dispatch")
+        self.id = Name.load_json(obj.get("id"))
+        self.decl_ref = DeclRef.load_json(obj.get("decl_ref"), parent=self)
         return obj
 
 
+@default_code_model("expr", "CXXDefaultArgExpr")
 class CXXDefaultArgExpr(Expr):
 
+    __slots__ = ("init_expr",)
+
     def __init__(self):
         super().__init__()
         self.init_expr = None
         return
 
     def load_content(self, obj: dict) -> dict:
-        Expr.load_content(self, obj["expr"])
+        Expr.load_content(self, obj.get("expr"))
         self.init_expr = StmtFactory.create_variant(
-                obj["init_expr"],
+                obj.get("init_expr"),
                 save=False,
                 parent=self
                 )
-        if self.init_expr is not None:
-            self.init_expr.parent(self)
-
         return obj
 
 
+@default_code_model("expr", "CXXDefaultInitExpr")
 class CXXDefaultInitExpr(CXXDefaultArgExpr):
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         return
@@ -2679,41 +3058,23 @@ class ExprFactory(object):
             return None
 
         out = None
-        variant = obj["kind"]
-        content = obj["content"]
+        variant = obj.get("kind")
+        content = obj.get("content")
 
-        if content is None and obj["skipped"]:
+        if content is None and obj.get("skipped"):
             out = SkippableVariant.load_json(obj)
-        elif content["skipped"]:
+        elif content.get("skipped"):
             out = SkippableVariant.load_json(content)
-        elif variant == "CXXBaseSpecifier":
-            out = CXXBaseSpecifier.load_json(content)
-        elif variant == "DeclRefExpr":
-            out = DeclRefExpr.load_json(content)
-        elif variant == "OverloadExpr":
-            out = OverloadExpr.load_json(content)
-        elif variant == "CharacterLiteral":
-            out = CharacterLiteral.load_json(content)
-        elif variant == "IntegerLiteral":
-            out = IntegerLiteral.load_json(content)
-        elif variant == "FloatingPointLiteral":
-            out = FloatingPointLiteral.load_json(content)
-        elif variant == "FixedPointLiteral":
-            out = FixedPointLiteral.load_json(content)
-        elif variant == "StringLiteral":
-            out = StringLiteral.load_json(content)
-        elif variant == "MemberExpr":
-            out = MemberExpr.load_json(content)
-        elif variant == "CXXDefaultArgExpr":
-            out = CXXDefaultArgExpr.load_json(content)
-        elif variant == "CXXDefaultInitExpr":
-            out = CXXDefaultInitExpr.load_json(content)
         else:
-            return None
+            model = expr_models.get(variant)
+            if model is None:
+                return None
+            out = model.load_json(content)
 
-        out.clang_kind = obj["clang_kind"]
+        out.clang_kind = obj.get("clang_kind")
         out.kind = variant
         out._save = save
         out._json = obj
+        out._parent = parent
 
         return out
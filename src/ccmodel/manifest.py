@@ -0,0 +1,276 @@
+import hashlib
+import os
+import orjson as json
+from typing import Dict, List, Optional
+
+import ccmodel.__config__.ccmodel_config as ccmodel_config
+from ccmodel.storage.ccs_format import (
+    CcsFile,
+    CcsFormatError,
+    CcsHeader,
+    header_label
+)
+from ccmodel.utils.files import write_file_atomic
+from ccmodel.utils.locks import FileLock, lock_path
+
+
+_file_hashes = {}
+
+def file_hash(path: str) -> str:
+    stat = os.stat(path)
+    key = (path, stat.st_mtime, stat.st_size)
+    if key not in _file_hashes:
+        sha = hashlib.sha1()
+        with open(path, "rb") as hash_file:
+            for block in iter(lambda: hash_file.read(1 << 20), b""):
+                sha.update(block)
+        _file_hashes[key] = sha.hexdigest()
+    return _file_hashes[key]
+
+def args_hash(clang_args: List[str]) -> str:
+    return hashlib.sha1(json.dumps(clang_args)).hexdigest()
+
+def header_mismatch(
+        header: CcsHeader,
+        fmt: str,
+        clang_args: List[str]) -> Optional[str]:
+    if header.tool_version != ccmodel_config.ccmodel_version:
+        return f"built by ccmodel {header.tool_version}"
+    if header.format != header_label(fmt):
+        return f"written as {header.format}"
+    if header.args_hash != args_hash(clang_args):
+        return "clang arguments changed"
+    return None
+
+def file_fingerprint(path: str, recorded: Optional[dict] = None) -> dict:
+    # A file whose modification time and size match its last record keeps
+    # that record's hash, so only files that changed are read.
+    stat = os.stat(path)
+    if (
+            recorded is not None and
+            recorded.get("m_time") == stat.st_mtime and
+            recorded.get("size") == stat.st_size
+            ):
+        return recorded
+    return {
+            "m_time": stat.st_mtime,
+            "size": stat.st_size,
+            "hash": file_hash(path)
+            }
+
+def file_changed(path: str, recorded: dict) -> bool:
+    # Records written before sizes were kept only compare times. A file that
+    # was touched but hashes the same gets its record refreshed in place.
+    try:
+        stat = os.stat(path)
+        size = recorded.get("size", stat.st_size)
+        if stat.st_mtime == recorded["m_time"] and stat.st_size == size:
+            return False
+        if stat.st_size != size or file_hash(path) != recorded["hash"]:
+            return True
+    except OSError:
+        return True
+    recorded["m_time"] = stat.st_mtime
+    recorded["size"] = stat.st_size
+    return False
+
+def changed_dependency(
+        dependencies: Dict[str, dict],
+        checked: Optional[Dict[str, Optional[dict]]] = None) -> Optional[str]:
+    # checked maps each dependency seen so far to its current record, or to
+    # None once it has changed, so other entries pick up a refreshed record
+    # without another stat.
+    checked = checked if checked is not None else {}
+    for dep, recorded in dependencies.items():
+        if dep not in checked:
+            current = dict(recorded)
+            checked[dep] = None if file_changed(dep, current) else current
+        if checked[dep] is None:
+            return dep
+        recorded.update(checked[dep])
+    return None
+
+
+class CcmManifest(object):
+
+    manifest_name = "ccm_manifest.json"
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.path = os.path.join(out_dir, self.manifest_name)
+        self.entries = {}
+        self._updated = set()
+        self._removed = set()
+        self.load()
+        return
+
+    def __contains__(self, source: str) -> bool:
+        return source in self.entries
+
+    def __getitem__(self, source: str) -> Optional[dict]:
+        try:
+            return self.entries[source]
+        except KeyError:
+            return None
+
+    def _read(self) -> Dict[str, dict]:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "rb") as manifest_file:
+            data = json.loads(manifest_file.read())
+        # Entries written by another ccmodel version are dropped wholesale,
+        # which marks every translation unit for a rebuild.
+        if data.get("tool_version") != ccmodel_config.ccmodel_version:
+            return {}
+        return data["entries"]
+
+    def _merged(self) -> Dict[str, dict]:
+        # Other ccm processes sharing the out dir save their own entries, so
+        # the file on disk is the base and only this process's changes are
+        # applied on top.
+        entries = self._read()
+        for source in self._updated:
+            entries[source] = self.entries[source]
+        for source in self._removed:
+            entries.pop(source, None)
+        return entries
+
+    def load(self) -> None:
+        self.entries = self._merged()
+        return
+
+    def save(self) -> None:
+        if not len(self._updated) and not len(self._removed):
+            return
+        with FileLock(lock_path(self.path)):
+            self.entries = self._merged()
+            write_file_atomic(
+                    self.path,
+                    json.dumps(
+                        {
+                            "tool_version": ccmodel_config.ccmodel_version,
+                            "entries": self.entries
+                            }
+                        )
+                    )
+        self._updated = set()
+        self._removed = set()
+        return
+
+    def update(self, source: str, entry: dict) -> None:
+        entry["tool_version"] = ccmodel_config.ccmodel_version
+        self.entries[source] = entry
+        self._updated.add(source)
+        self._removed.discard(source)
+        return
+
+    def remove(self, source: str) -> None:
+        if source in self.entries:
+            del self.entries[source]
+            self._removed.add(source)
+            self._updated.discard(source)
+        return
+
+    def ccs_path(self, source: str) -> Optional[str]:
+        entry = self[source]
+        if entry is None:
+            return None
+        if "db" in entry:
+            return entry["db"]
+        return os.path.join(self.out_dir, entry["ccs"])
+
+    def stale_reason(
+            self,
+            source: str,
+            checked: Optional[Dict[str, Optional[dict]]] = None,
+            clang_args: Optional[List[str]] = None,
+            fmt: Optional[str] = None) -> Optional[str]:
+        entry = self[source]
+        if entry is None:
+            return "no manifest entry"
+        if entry["tool_version"] != ccmodel_config.ccmodel_version:
+            return f"built by ccmodel {entry['tool_version']}"
+        if fmt is not None and entry.get("format", "json") != fmt:
+            return f"written as {entry.get('format', 'json')}"
+        if (
+                clang_args is not None and
+                entry.get("clang_args") != clang_args
+                ):
+            return "clang arguments changed"
+        try:
+            if os.path.getmtime(source) != entry["m_time"]:
+                return "source changed"
+        except OSError:
+            return "source missing"
+        if not os.path.exists(self.ccs_path(source)):
+            return ".ccs missing"
+        if (
+                "db" not in entry and
+                fmt is not None and
+                clang_args is not None
+                ):
+            reason = self.header_reason(self.ccs_path(source), fmt, clang_args)
+            if reason is not None:
+                return reason
+        recorded = {x: dict(y) for x, y in entry["dependencies"].items()}
+        changed = changed_dependency(entry["dependencies"], checked)
+        if changed is not None:
+            return f"{os.path.relpath(changed)} changed"
+        # Dependencies that were touched but not edited have new records,
+        # saved so the next run does not hash them again.
+        if entry["dependencies"] != recorded:
+            self._updated.add(source)
+        return None
+
+    @staticmethod
+    def header_reason(
+            ccs_path: str,
+            fmt: str,
+            clang_args: List[str]) -> Optional[str]:
+        # Only binary .ccs files carry a header; the rest are trusted to the
+        # manifest.
+        try:
+            ccs = CcsFile(ccs_path)
+            ccs.validate()
+        except (OSError, CcsFormatError) as err:
+            return f"unreadable .ccs ({err})"
+        if ccs.header is None:
+            return None
+        return header_mismatch(ccs.header, fmt, clang_args)
+
+    def adopt(
+            self,
+            source: str,
+            ccs_path: str,
+            checked: Optional[Dict[str, Optional[dict]]],
+            clang_args: List[str],
+            fmt: str) -> bool:
+        # A binary .ccs without a manifest entry, say after the manifest was
+        # lost or the out dir was copied, is taken as it is when its header
+        # matches this build and its recorded dependencies are unchanged.
+        try:
+            ccs = CcsFile(ccs_path)
+            ccs.validate()
+            if (
+                    ccs.header is None or
+                    header_mismatch(ccs.header, fmt, clang_args) is not None or
+                    ccs.header.source_hash != file_hash(source)
+                    ):
+                return False
+            metadata = ccs.metadata()
+        except (OSError, CcsFormatError):
+            return False
+        if changed_dependency(metadata["dependencies"], checked) is not None:
+            return False
+        self.update(
+                source,
+                {
+                    "ccs": os.path.relpath(ccs_path, self.out_dir),
+                    "m_time": os.path.getmtime(source),
+                    "includes": metadata["includes"],
+                    "dependencies": metadata["dependencies"],
+                    "clang_args": clang_args,
+                    "format": fmt
+                    }
+                )
+        return True
@@ -11,13 +11,26 @@ from ccmodel.code_models.basic import (
     Include,
 )
 import ccmodel.code_models.pointers as pointers
+from ccmodel.code_models.variants import TypeFactory
+from ccmodel.storage.index import (
+    CcsIndex,
+    CcsIndexError,
+    index_path,
+    pointer_fields
+)
 from ccmodel.utils import files as fs
 
+import mmap
 import os
 import sys
 import time
-from typing import List, Optional
-from ccmodel.code_models.header import Header
+from typing import Dict, List, Optional, Tuple
+from ccmodel.code_models.header import (
+    Header,
+    DbHeader
+)
+from ccmodel.storage.shards import open_database
+from ccmodel.storage.strings import replace_none_sentinels, resolve_strings
 import ccmodel.__config__.ccmodel_config as ccmodel_config
 import ccmodel.code_models.pointers as pointers
 import orjson as json
@@ -29,12 +42,21 @@ def clear_pointers() -> None:
     pointers.qual_types = []
     pointers.short_types = {}
     pointers.typedefs = []
+    pointers.string_table = []
+    pointers.scope = None
+    pointers.load_stack = None
     return
 
 class CcsReader(object):
 
-    def __init__(self, db_path: str):
+    def __init__(
+            self,
+            db_path: str,
+            lazy: bool = False,
+            iterative: bool = False):
         self._database = os.path.abspath(db_path)
+        self.lazy = lazy
+        self.iterative = iterative
         self._ccs_catalogue = {}
         self.build_catalogue()
         self._headers_loaded = {}
@@ -56,11 +78,15 @@ class CcsReader(object):
                             ] = ccs_abspath
         return
 
-    def find_ccs(self, ccs_file: str, must_find: bool = True) -> Optional[str]:
+    def match_ccs(self, ccs_file: str) -> List[str]:
         out = []
         for ccs_file_key, path in self._ccs_catalogue.items():
             if ccs_file_key.endswith(ccs_file):
                 out.append(path)
+        return out
+
+    def find_ccs(self, ccs_file: str, must_find: bool = True) -> Optional[str]:
+        out = self.match_ccs(ccs_file)
         if len(out) > 1:
             ccmodel_config.logger.bind(stage_log=True, color="red").error(
                     f"Requested state file: {ccs_file} is non-unique." +
@@ -82,6 +108,9 @@ class CcsReader(object):
             out = out[0]
         return out
 
+    def open_header(self, header_path: str) -> Header:
+        return Header(header_path, self.lazy, self.iterative)
+
     def load_header(
             self,
             ccs_file: str,
@@ -92,7 +121,7 @@ class CcsReader(object):
                 header_path in self._headers_loaded.keys()
                 ):
             return None
-        loaded_header = Header(header_path)
+        loaded_header = self.open_header(header_path)
         self._headers_loaded[header_path] = loaded_header
         return loaded_header
 
@@ -113,3 +142,135 @@ class CcsReader(object):
         main_header.build_translation_unit_id_map()
         clear_pointers()
         return main_header
+
+
+class CcsDbReader(CcsReader):
+
+    def __init__(
+            self,
+            db_path: str,
+            lazy: bool = False,
+            iterative: bool = False):
+        # A directory is a sharded database; its symbol table answers
+        # catalogue and declaration lookups before any shard is opened.
+        self._db = open_database(db_path)
+        super().__init__(db_path, lazy, iterative)
+        return
+
+    def build_catalogue(self) -> None:
+        # Lookups go straight to the database, so there is nothing to walk.
+        return
+
+    def match_ccs(self, ccs_file: str) -> List[str]:
+        return self._db.find_ccs(ccs_file)
+
+    def open_header(self, header_path: str) -> Header:
+        return DbHeader(
+                self._db,
+                header_path,
+                self.lazy,
+                self.iterative
+                )
+
+    def find_declarations(
+            self,
+            qual_id: str,
+            kind: Optional[str] = None) -> List[Tuple[str, dict]]:
+        return self._db.find_declarations(qual_id, kind)
+
+    def close(self) -> None:
+        self._db.close()
+        return
+
+
+class IndexedCcsReader(object):
+
+    def __init__(self, ccs_path: str):
+        self.ccs_path = ccs_path
+        self.index = CcsIndex(index_path(ccs_path))
+        if os.path.getsize(ccs_path) != self.index.ccs_size:
+            raise CcsIndexError(f"{self.index.path} is out of date")
+        with open(ccs_path, "rb") as ccs_file:
+            self._map = mmap.mmap(
+                    ccs_file.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ
+                    )
+        return
+
+    def close(self) -> None:
+        self._map.close()
+        self.index.close()
+        return
+
+    def _decode(self, offset: int, length: int) -> dict:
+        # Ranges carry no metadata to tell whether the file was written with
+        # the "None" sentinels in place, and replacing them twice is a no-op.
+        return replace_none_sentinels(
+                resolve_strings(
+                    json.loads(self._map[offset:offset + length]),
+                    self.index.strings()
+                    )
+                )
+
+    def find(self, qual_id: str) -> List[dict]:
+        return [self._decode(*x) for x in self.index.by_name(qual_id)]
+
+    def find_pointer(self, ptr: int) -> Optional[dict]:
+        entry = self.index.by_pointer(ptr)
+        if entry is None:
+            return None
+        return self._decode(*entry)
+
+    def referenced(
+            self,
+            ranges: List[Tuple[int, int]],
+            nodes: List[dict],
+            follow: int = 1) -> Dict[int, dict]:
+        # Pointer targets of the given subtrees, followed `follow` hops. A
+        # target inside a range that is already decoded is not read again.
+        loaded = {}
+        ranges = list(ranges)
+        frontier = list(nodes)
+        for _ in range(follow):
+            targets = set()
+            stack = list(frontier)
+            while stack:
+                node = stack.pop()
+                if type(node) is dict:
+                    targets.update(node[x] for x in pointer_fields(node))
+                    stack.extend(
+                            x for x in node.values() if
+                            type(x) in (dict, list)
+                            )
+                elif type(node) is list:
+                    stack.extend(node)
+            frontier = []
+            for ptr in sorted(targets):
+                entry = self.index.by_pointer(ptr)
+                if entry is None or any(
+                        start <= entry[0] and
+                        entry[0] + entry[1] <= start + length for
+                        start, length in ranges
+                        ):
+                    continue
+                ranges.append(entry)
+                loaded[ptr] = self._decode(*entry)
+                frontier.append(loaded[ptr])
+        return loaded
+
+    def load(self, qual_id: str, follow: int = 1) -> List["Variant"]:
+        ranges = self.index.by_name(qual_id)
+        nodes = [self._decode(*x) for x in ranges]
+        clear_pointers()
+        for node in self.referenced(ranges, nodes, follow).values():
+            if node["kind"].endswith("Type"):
+                TypeFactory.create_variant(node)
+            else:
+                DeclFactory.create_variant(node)
+        out = [DeclFactory.create_variant(x) for x in nodes]
+        for variant in list(pointers.pointer_map.values()):
+            variant.replace_pointers()
+        for qt in pointers.qual_types:
+            qt.replace_pointers()
+        return out
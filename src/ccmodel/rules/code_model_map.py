@@ -1,24 +1,49 @@
-from clang import cindex, enumerations
 import typing
-import functools
 
-default_code_models = {}
-object_code_models = {}
+# Each variant factory resolves the class for a node with a single lookup of
+# its "kind" in the registry for its category. The code model classes
+# register themselves as defaults; use_code_model swaps in another class for
+# a kind, e.g. a lighter model that keeps only the fields a tool needs.
+code_model_categories = ("attr", "type", "decl", "stmt", "expr")
+default_code_models = {x: {} for x in code_model_categories}
+code_models = {x: {} for x in code_model_categories}
+
+
+def code_model_registry(category: str) -> typing.Dict[str, typing.Type]:
+    if category not in code_models:
+        raise ValueError(
+                f'Unknown code model category "{category}", expected one ' +
+                f"of {', '.join(code_model_categories)}"
+                )
+    return code_models[category]
 
 
 def use_code_model(
-    node_kind: typing.Union[str, int], parse_object_type: typing.Type
-) -> None:
-    if type(node_kind) is not str and node_kind != "comment" and node_kind != "header":
-        default_code_models[node_kind] = parse_object_type
+        category: str,
+        node_kind: str,
+        parse_object_type: typing.Type) -> None:
+    code_model_registry(category)[node_kind] = parse_object_type
+    return
+
+
+def reset_code_model(category: str, node_kind: str) -> None:
+    registry = code_model_registry(category)
+    if node_kind in default_code_models[category]:
+        registry[node_kind] = default_code_models[category][node_kind]
     else:
-        object_code_models[object_name] = parse_object_type
+        registry.pop(node_kind, None)
     return
 
 
-def default_code_model(node_kind: typing.Union[str, cindex.CursorKind]):
+def default_code_model(category: str, *node_kinds: str):
+    registry = code_model_registry(category)
+
     def _decorator_internal(cls_in):
-        default_code_models[node_kind] = cls_in
+        for node_kind in node_kinds:
+            default_code_models[category][node_kind] = cls_in
+            # A model registered by the user before the defaults were
+            # imported wins.
+            registry.setdefault(node_kind, cls_in)
         return cls_in
 
     return _decorator_internal
@@ -0,0 +1,412 @@
+import hashlib
+import io
+import os
+import struct
+import orjson as json
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple
+
+from ccmodel.storage import codecs
+from ccmodel.storage.index import IndexedEncoder
+
+# Binary .ccs layout:
+#
+#   preamble       magic, format version, section count
+#   header         fixed-size build record: tool and backend versions, output
+#                  format, source and clang argument fingerprints, node
+#                  counts and byte sizes (version 3 and later)
+#   section table  one fixed-size entry per section: name, offset, length
+#                  and encoding
+#   sections       each section encoded on its own
+#
+# Metadata and includes are the first sections in the file, so a reader that
+# only needs them touches the preamble, the table and a few KB of payload.
+# The string table follows them; version 1 files have none. The header sits
+# at a fixed offset, so staleness and compatibility checks read a few
+# hundred bytes and never decode a section.
+# A section's encoding is either plain json or the codec it was compressed
+# with.
+#
+# A compressed JSON .ccs is the compressed document behind a magic and a
+# one byte codec id.
+ccs_magic = b"CCSB"
+compressed_magic = b"CCSZ"
+format_version = 3
+supported_versions = (1, 2, 3)
+formats = ("json", "binary")
+section_names = (
+        "metadata",
+        "includes",
+        "strings",
+        "declarations",
+        "referenced_types",
+        "referenced_decls"
+        )
+indexed_sections = section_names[3:]
+# Build fields of the output dict, kept in the metadata section in every
+# format and mirrored by the binary header.
+build_keys = (
+        "tool_version",
+        "backend",
+        "format",
+        "source_hash",
+        "args_hash",
+        "pointer_count",
+        "decl_count",
+        "none_as_null"
+        )
+
+_preamble = struct.Struct("<4sHH")
+_header = struct.Struct("<32s32s32s20s20sdIIIIQQ")
+_section_entry = struct.Struct("<16sQQ8s")
+_label_size = 32
+_hash_size = 20
+
+
+class CcsFormatError(Exception):
+    pass
+
+
+def header_label(label: str) -> str:
+    # Format labels grow with path filters and database paths. One that
+    # does not fit the header is stored as a digest of the same size, which
+    # a reader compares against the digest of its own label.
+    if len(label.encode()) <= _label_size:
+        return label
+    digest = hashlib.sha1(label.encode()).hexdigest()
+    return ("sha1:" + digest)[:_label_size]
+
+
+class CcsHeader(NamedTuple):
+    tool_version: str
+    backend: str
+    format: str
+    source_hash: str
+    args_hash: str
+    m_time: float
+    n_pointers: int
+    n_decls: int
+    n_types: int
+    n_strings: int
+    decoded_size: int
+    file_size: int
+
+    def pack(self) -> bytes:
+        # struct pads and truncates strings silently, so every fixed-size
+        # field is checked first.
+        labels = [
+                self.tool_version.encode(),
+                self.backend.encode(),
+                header_label(self.format).encode()
+                ]
+        hashes = [
+                bytes.fromhex(self.source_hash),
+                bytes.fromhex(self.args_hash)
+                ]
+        for name, value, size in (
+                ("tool version", labels[0], _label_size),
+                ("backend", labels[1], _label_size),
+                ("source hash", hashes[0], _hash_size),
+                ("args hash", hashes[1], _hash_size)
+                ):
+            if len(value) > size:
+                raise CcsFormatError(
+                        f"{name} does not fit the .ccs header: {value!r}"
+                        )
+        return _header.pack(
+                *labels,
+                *hashes,
+                self.m_time,
+                self.n_pointers,
+                self.n_decls,
+                self.n_types,
+                self.n_strings,
+                self.decoded_size,
+                self.file_size
+                )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "CcsHeader":
+        fields = list(_header.unpack(data))
+        for idx in range(3):
+            fields[idx] = fields[idx].rstrip(b"\0").decode()
+        for idx in range(3, 5):
+            fields[idx] = fields[idx].hex()
+        return cls(*fields)
+
+
+def split_sections(out: dict) -> Dict[str, object]:
+    translation_unit = dict(out["translation_unit"])
+    content = dict(translation_unit["content"])
+    referenced_types = content.pop("referenced_types", [])
+    referenced_decls = content.pop("referenced_decls", [])
+    content.pop("includes", None)
+    translation_unit["content"] = content
+    metadata = {
+            "file": out["file"],
+            "m_time": out["m_time"],
+            "dependencies": out.get("dependencies", {})
+            }
+    metadata.update({key: out[key] for key in build_keys if key in out})
+    return {
+            "metadata": metadata,
+            "includes": out["includes"],
+            "strings": out.get("string_table", []),
+            "declarations": translation_unit,
+            "referenced_types": referenced_types,
+            "referenced_decls": referenced_decls
+            }
+
+def join_sections(sections: Dict[str, object]) -> dict:
+    translation_unit = dict(sections["declarations"])
+    content = dict(translation_unit["content"])
+    content["includes"] = sections["includes"]
+    content["referenced_types"] = sections["referenced_types"]
+    content["referenced_decls"] = sections["referenced_decls"]
+    translation_unit["content"] = content
+    out = {**sections["metadata"], "includes": sections["includes"]}
+    if sections.get("strings"):
+        out["string_table"] = sections["strings"]
+    out["translation_unit"] = translation_unit
+    return out
+
+def format_label(
+        fmt: str,
+        compress: str = "none",
+        indexed: bool = False) -> str:
+    label = fmt
+    if compress != "none":
+        label += f"+{compress}"
+    if indexed:
+        label += "+index"
+    return label
+
+def encode_section(raw: bytes, encoding: str) -> bytes:
+    if encoding == "json":
+        return raw
+    return codecs.compress(raw, encoding)
+
+def decode_section(stream: BinaryIO, length: int, encoding: str) -> object:
+    codec = "none" if encoding == "json" else encoding
+    try:
+        return json.loads(codecs.read_stream(stream, codec, length))
+    except (codecs.CodecError, json.JSONDecodeError) as err:
+        raise CcsFormatError(str(err))
+
+def encode_binary(
+        out: dict,
+        compress: str = "none",
+        encoder: Optional[IndexedEncoder] = None) -> bytes:
+    encoding = "json" if compress == "none" else compress
+    sections = split_sections(out)
+    offset = (
+            _preamble.size +
+            _header.size +
+            len(section_names) * _section_entry.size
+            )
+    table = []
+    payloads = []
+    decoded_size = 0
+    for name in section_names:
+        if encoder is not None and name in indexed_sections:
+            payload = encoder.encode(sections[name], offset)
+            decoded_size += len(payload)
+        else:
+            raw = json.dumps(sections[name])
+            decoded_size += len(raw)
+            payload = encode_section(raw, encoding)
+        table.append(
+                _section_entry.pack(
+                    name.encode(),
+                    offset,
+                    len(payload),
+                    encoding.encode()
+                    )
+                )
+        payloads.append(payload)
+        offset += len(payload)
+    header = CcsHeader(
+            out.get("tool_version", ""),
+            out.get("backend", ""),
+            out.get("format", ""),
+            out.get("source_hash", "00" * 20),
+            out.get("args_hash", "00" * 20),
+            out["m_time"],
+            out.get("pointer_count", 0),
+            out.get("decl_count", 0),
+            len(sections["referenced_types"]),
+            len(sections["strings"]),
+            decoded_size,
+            offset
+            )
+    return b"".join(
+            [
+                _preamble.pack(ccs_magic, format_version, len(payloads)),
+                header.pack(),
+                *table,
+                *payloads
+                ]
+            )
+
+def encode_json(out: dict, pretty: bool, compress: str) -> bytes:
+    if pretty:
+        data = json.dumps(out, option=json.OPT_INDENT_2)
+    else:
+        data = json.dumps(out)
+    if compress == "none":
+        return data
+    return (
+            compressed_magic +
+            bytes([codecs.codec_ids[compress]]) +
+            codecs.compress(data, compress)
+            )
+
+def encode_json_indexed(out: dict, encoder: IndexedEncoder) -> bytes:
+    head = json.dumps(
+            {key: val for key, val in out.items() if key != "translation_unit"}
+            )
+    prefix = head[:-1] + b',"translation_unit":'
+    return (
+            prefix +
+            encoder.encode(out["translation_unit"], len(prefix)) +
+            b"}"
+            )
+
+def encode_ccs(
+        out: dict,
+        fmt: str = "json",
+        pretty: bool = False,
+        compress: str = "none",
+        index_entries: Optional[list] = None) -> bytes:
+    # With index_entries, the byte range of every declaration and type is
+    # appended to it. Offsets into compressed data would be meaningless, so
+    # an index needs uncompressed output.
+    codecs.check_codec(compress)
+    encoder = None
+    if index_entries is not None:
+        if compress != "none":
+            raise CcsFormatError("An offset index needs uncompressed output")
+        encoder = IndexedEncoder(out.get("string_table"))
+    if fmt == "binary":
+        data = encode_binary(out, compress, encoder)
+    elif encoder is not None:
+        data = encode_json_indexed(out, encoder)
+    else:
+        data = encode_json(out, pretty, compress)
+    if encoder is not None:
+        index_entries.extend(encoder.entries)
+    return data
+
+
+class CcsFile(object):
+
+    def __init__(self, path: str, content: Optional[bytes] = None):
+        # With content given, path only names the file in messages and the
+        # .ccs is read from memory.
+        self.path = path
+        self.binary = False
+        self.codec = "none"
+        self.header = None
+        self._content = content
+        self._sections = {}
+        self._data = None
+        with self._open() as ccs_file:
+            magic = ccs_file.read(len(ccs_magic))
+            if magic == compressed_magic:
+                codec_id = ccs_file.read(1)
+                if not len(codec_id) or codec_id[0] >= len(codecs.codecs):
+                    raise CcsFormatError(f"{path}: unknown compression codec")
+                self.codec = codecs.codecs[codec_id[0]]
+        self.binary = magic == ccs_magic
+        if self.binary:
+            self._read_section_table()
+        return
+
+    def _open(self) -> BinaryIO:
+        if self._content is not None:
+            return io.BytesIO(self._content)
+        return open(self.path, "rb")
+
+    def _read_section_table(self) -> None:
+        with self._open() as ccs_file:
+            magic, version, n_sections = _preamble.unpack(
+                    ccs_file.read(_preamble.size)
+                    )
+            if version not in supported_versions:
+                raise CcsFormatError(
+                        f"{self.path}: unsupported .ccs format version " +
+                        f"{version}"
+                        )
+            if version >= 3:
+                self.header = CcsHeader.unpack(ccs_file.read(_header.size))
+            for _ in range(n_sections):
+                name, offset, length, encoding = _section_entry.unpack(
+                        ccs_file.read(_section_entry.size)
+                        )
+                self._sections[name.rstrip(b"\0").decode()] = (
+                        offset,
+                        length,
+                        encoding.rstrip(b"\0").decode()
+                        )
+        return
+
+    def size(self) -> int:
+        if self._content is not None:
+            return len(self._content)
+        return os.path.getsize(self.path)
+
+    def validate(self) -> None:
+        # A truncated or partly overwritten file is caught here rather than
+        # halfway through decoding its declarations.
+        if self.header is not None and self.header.file_size != self.size():
+            raise CcsFormatError(
+                    f"{self.path}: {self.size()} bytes, header records " +
+                    f"{self.header.file_size}"
+                    )
+        return
+
+    def _load_json(self) -> dict:
+        if self._data is None:
+            with self._open() as ccs_file:
+                if self.codec != "none":
+                    ccs_file.seek(len(compressed_magic) + 1)
+                try:
+                    self._data = json.loads(
+                            codecs.read_stream(ccs_file, self.codec)
+                            )
+                except (codecs.CodecError, json.JSONDecodeError) as err:
+                    raise CcsFormatError(f"{self.path}: {err}")
+        return self._data
+
+    def section(self, name: str) -> object:
+        if not self.binary:
+            return split_sections(self._load_json())[name]
+        offset, length, encoding = self._sections[name]
+        with self._open() as ccs_file:
+            ccs_file.seek(offset)
+            return decode_section(ccs_file, length, encoding)
+
+    def metadata(self) -> dict:
+        if not self.binary:
+            data = self._load_json()
+            return {
+                    "file": data["file"],
+                    "m_time": data["m_time"],
+                    "dependencies": data.get("dependencies", {}),
+                    "includes": data["includes"]
+                    }
+        return {
+                **self.section("metadata"),
+                "includes": self.section("includes")
+                }
+
+    def load(self) -> dict:
+        if not self.binary:
+            return self._load_json()
+        return join_sections(
+                {name: self.section(name) for name in self._sections}
+                )
+
+    def release(self) -> None:
+        self._data = None
+        self._content = None
+        return
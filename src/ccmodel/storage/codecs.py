@@ -0,0 +1,70 @@
+import bz2
+import lzma
+import zlib
+from typing import BinaryIO, Optional, Union
+
+codecs = ("none", "zlib", "lzma", "bz2")
+codec_ids = {name: idx for idx, name in enumerate(codecs)}
+chunk_size = 1 << 20
+# What the decompressors raise on corrupt input: bz2 reports bad data as an
+# OSError, and data past the end of its stream as an EOFError.
+decompress_errors = (zlib.error, lzma.LZMAError, OSError, EOFError)
+
+
+class CodecError(Exception):
+    pass
+
+
+def check_codec(codec: str) -> None:
+    if codec not in codec_ids:
+        raise CodecError(f"Unknown compression codec: {codec}")
+    return
+
+def compress(data: bytes, codec: str) -> bytes:
+    check_codec(codec)
+    if codec == "zlib":
+        return zlib.compress(data)
+    elif codec == "lzma":
+        return lzma.compress(data)
+    elif codec == "bz2":
+        return bz2.compress(data)
+    return data
+
+def decompressor(codec: str) -> Optional[object]:
+    check_codec(codec)
+    if codec == "zlib":
+        return zlib.decompressobj()
+    elif codec == "lzma":
+        return lzma.LZMADecompressor()
+    elif codec == "bz2":
+        return bz2.BZ2Decompressor()
+    return None
+
+def read_stream(
+        stream: BinaryIO,
+        codec: str,
+        length: Optional[int] = None) -> Union[bytes, bytearray]:
+    # Compressed input is fed through the decompressor a chunk at a time, so
+    # the compressed bytes are never held in memory all at once.
+    decomp = decompressor(codec)
+    if decomp is None:
+        return stream.read() if length is None else stream.read(length)
+    out = bytearray()
+    remaining = length
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        if remaining is not None:
+            remaining -= len(chunk)
+        try:
+            out += decomp.decompress(chunk)
+        except decompress_errors as err:
+            raise CodecError(f"Corrupt {codec} data: {err}")
+    # A stream cut short decompresses without complaint, just incompletely.
+    if not decomp.eof:
+        raise CodecError(f"Truncated {codec} data")
+    if hasattr(decomp, "flush"):
+        out += decomp.flush()
+    return out
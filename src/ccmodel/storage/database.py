@@ -0,0 +1,261 @@
+import os
+import sqlite3
+import orjson as json
+from typing import List, Optional, Tuple
+
+from ccmodel.storage import ccs_format
+from ccmodel.storage.index import IndexEntry, subtrees
+from ccmodel.storage.strings import resolve_strings
+
+# One row per translation unit in headers, keyed by the same relative .ccs
+# path the out dir would use, with the encoded .ccs as its payload. Include
+# and declaration rows point back at their header. A declaration's offset
+# and length locate its subtree inside the payload; both are NULL when the
+# payload is compressed, and such a declaration is found by its pointer in
+# the decoded payload instead. A header's string table is kept beside its payload
+# so a declaration read by offset can be resolved without decoding the rest.
+schema_version = 2
+schema = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS headers (
+    id INTEGER PRIMARY KEY,
+    ccs TEXT UNIQUE NOT NULL,
+    ccs_reversed TEXT NOT NULL,
+    file TEXT NOT NULL,
+    m_time REAL NOT NULL,
+    format TEXT NOT NULL,
+    strings BLOB NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS headers_ccs_reversed ON headers(ccs_reversed);
+CREATE INDEX IF NOT EXISTS headers_file ON headers(file);
+CREATE TABLE IF NOT EXISTS includes (
+    header_id INTEGER NOT NULL REFERENCES headers(id) ON DELETE CASCADE,
+    file TEXT NOT NULL,
+    search_path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS includes_header ON includes(header_id);
+CREATE INDEX IF NOT EXISTS includes_file ON includes(file);
+CREATE TABLE IF NOT EXISTS declarations (
+    header_id INTEGER NOT NULL REFERENCES headers(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    qual_id TEXT,
+    pointer INTEGER,
+    parent INTEGER,
+    file TEXT,
+    line INTEGER,
+    offset INTEGER,
+    length INTEGER
+);
+CREATE INDEX IF NOT EXISTS declarations_qual_id ON declarations(qual_id);
+CREATE INDEX IF NOT EXISTS declarations_pointer
+    ON declarations(header_id, pointer);
+"""
+busy_timeout = 60.0
+
+
+class CcmDatabaseError(Exception):
+    pass
+
+
+def reversed_key(ccs: str) -> str:
+    return ccs[::-1]
+
+def suffix_bounds(suffix: str) -> Tuple[str, str]:
+    # A suffix of the path is a prefix of the reversed path, which the index
+    # on ccs_reversed answers as a range.
+    low = reversed_key(suffix)
+    return low, low[:-1] + chr(ord(low[-1]) + 1)
+
+
+class CcmDatabase(object):
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout)
+        # WAL lets readers carry on while one worker commits, and the busy
+        # timeout queues concurrent writers instead of failing them.
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.executescript(schema)
+            self._conn.execute(
+                    "INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)",
+                    (str(schema_version),)
+                    )
+        version = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+                ).fetchone()[0]
+        if int(version) != schema_version:
+            raise CcmDatabaseError(
+                    f"{self.path}: schema version {version}, " +
+                    f"expected {schema_version}"
+                    )
+        return
+
+    def close(self) -> None:
+        self._conn.close()
+        return
+
+    def write_header(
+            self,
+            ccs: str,
+            out: dict,
+            fmt: str,
+            payload: bytes,
+            entries: Optional[List[IndexEntry]] = None) -> None:
+        entries = entries if entries is not None else []
+        with self._conn:
+            self._conn.execute("DELETE FROM headers WHERE ccs = ?", (ccs,))
+            header_id = self._conn.execute(
+                    "INSERT INTO headers " +
+                    "(ccs, ccs_reversed, file, m_time, format, strings, " +
+                    "payload) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        ccs,
+                        reversed_key(ccs),
+                        out["file"],
+                        out["m_time"],
+                        fmt,
+                        json.dumps(out.get("string_table", [])),
+                        payload
+                        )
+                    ).lastrowid
+            self._conn.executemany(
+                    "INSERT INTO includes VALUES (?, ?, ?)",
+                    [
+                        (header_id, inc["file"], inc["search_path"]) for
+                        inc in out["includes"]
+                        ]
+                    )
+            self._conn.executemany(
+                    "INSERT INTO declarations VALUES " +
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            header_id,
+                            x.kind,
+                            x.name,
+                            x.pointer,
+                            x.parent,
+                            x.file,
+                            x.line,
+                            x.offset,
+                            x.length
+                            ) for x in entries
+                        ]
+                    )
+        return
+
+    def remove_header(self, ccs: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM headers WHERE ccs = ?", (ccs,))
+        return
+
+    def catalogue(self) -> List[str]:
+        return [
+                row[0] for row in
+                self._conn.execute("SELECT ccs FROM headers ORDER BY ccs")
+                ]
+
+    def find_ccs(self, suffix: str) -> List[str]:
+        if not len(suffix):
+            return self.catalogue()
+        return [
+                row[0] for row in self._conn.execute(
+                    "SELECT ccs FROM headers " +
+                    "WHERE ccs_reversed >= ? AND ccs_reversed < ?",
+                    suffix_bounds(suffix)
+                    )
+                ]
+
+    def metadata(self, ccs: str) -> Optional[dict]:
+        row = self._conn.execute(
+                "SELECT id, file, m_time, format FROM headers WHERE ccs = ?",
+                (ccs,)
+                ).fetchone()
+        if row is None:
+            return None
+        includes = [
+                {"file": inc[0], "search_path": inc[1]} for
+                inc in self._conn.execute(
+                    "SELECT file, search_path FROM includes " +
+                    "WHERE header_id = ? ORDER BY rowid",
+                    (row[0],)
+                    )
+                ]
+        return {
+                "file": row[1],
+                "m_time": row[2],
+                "format": row[3],
+                "includes": includes
+                }
+
+    def payload(self, ccs: str) -> Optional[bytes]:
+        row = self._conn.execute(
+                "SELECT payload FROM headers WHERE ccs = ?",
+                (ccs,)
+                ).fetchone()
+        return None if row is None else row[0]
+
+    def declaration_at(
+            self,
+            ccs: str,
+            offset: int,
+            length: int) -> Optional[dict]:
+        row = self._conn.execute(
+                "SELECT substr(payload, ?, ?), strings FROM headers " +
+                "WHERE ccs = ?",
+                (offset + 1, length, ccs)
+                ).fetchone()
+        if row is None:
+            return None
+        return resolve_strings(json.loads(row[0]), json.loads(row[1]))
+
+    def find_declarations(
+            self,
+            qual_id: str,
+            kind: Optional[str] = None) -> List[Tuple[str, dict]]:
+        query = (
+                "SELECT headers.ccs, headers.strings, declarations.pointer, " +
+                "substr(headers.payload, declarations.offset + 1, " +
+                "declarations.length) " +
+                "FROM declarations JOIN headers " +
+                "ON headers.id = declarations.header_id " +
+                "WHERE declarations.qual_id = ?"
+                )
+        args = [qual_id]
+        if kind is not None:
+            query += " AND declarations.kind = ?"
+            args.append(kind)
+        out = []
+        strings = {}
+        for ccs, table, ptr, data in self._conn.execute(query, args):
+            if ccs not in strings:
+                strings[ccs] = json.loads(table)
+            if data is not None:
+                decl = json.loads(data)
+            else:
+                decl = self.declaration_by_pointer(ccs, ptr)
+                if decl is None:
+                    continue
+            out.append((ccs, resolve_strings(decl, strings[ccs])))
+        return out
+
+    def declaration_by_pointer(self, ccs: str, ptr: int) -> Optional[dict]:
+        # Compressed payloads have no offsets, so the whole header is
+        # decoded. Strings are left interned.
+        payload = self.payload(ccs)
+        if payload is None or ptr is None:
+            return None
+        data = ccs_format.CcsFile(ccs, payload).load()
+        for owner, node in subtrees(
+                data["translation_unit"],
+                data.get("string_table")
+                ):
+            if owner[0] == ptr:
+                return node
+        return None
@@ -0,0 +1,374 @@
+import mmap
+import os
+import re
+import struct
+import orjson as json
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Sidecar index layout (<name>.idx next to <name>.ccs):
+#
+#   header         magic, version, entry counts and the size of the .ccs the
+#                  offsets refer to
+#   pointer table  (pointer, offset, length), sorted by pointer
+#   name table     (name offset, name length, offset, length), sorted by name
+#   name blob      utf-8 qualified names
+#   string table   json list of the .ccs string table, so entries can be
+#                  decoded without reading the .ccs header
+#
+# Offsets are absolute byte positions of a declaration or type subtree in
+# the .ccs, so an entry can be decoded straight out of a memory map. Both
+# tables are binary searched in place; nothing is read up front.
+index_magic = b"CCSI"
+index_version = 2
+indexed_kinds = ("Decl", "Type")
+
+# Keys whose integer values point at other declarations or types.
+reference_keys = (
+        "pointer",
+        "type_pointer",
+        "decl_pointer",
+        "definition_pointer",
+        "desugared_type",
+        "qualified_type",
+        "parameter",
+        "template_decl",
+        "described_template",
+        "member_template_decl",
+        "type"
+        )
+
+_index_header = struct.Struct("<4sHHIIQQ")
+_pointer_entry = struct.Struct("<QQQ")
+_name_entry = struct.Struct("<QIQQ")
+
+# A declaration or type subtree as orjson writes it, when its kind is the
+# first key, as it is in the backend's output.
+_indexed_start = re.compile(rb'\{"kind":"(?:[^"\\]|\\.)*?(?:Decl|Type)"')
+
+
+class CcsIndexError(Exception):
+    pass
+
+
+class IndexEntry(NamedTuple):
+    pointer: Optional[int]
+    name: Optional[str]
+    offset: Optional[int]
+    length: Optional[int]
+    kind: str
+    parent: Optional[int]
+    file: Optional[str]
+    line: Optional[int]
+
+
+def index_path(ccs_path: str) -> str:
+    return os.path.splitext(ccs_path)[0] + ".idx"
+
+
+def pointer_fields(
+        node: dict,
+        keys: Tuple[str, ...] = reference_keys) -> Iterator[str]:
+    # The keys of node holding a pointer. A qualified type's "type" is its
+    # spelling, which the string table turns into an int as well.
+    qual_type = "type_pointer" in node
+    for key in keys:
+        if type(node.get(key)) is int and not (qual_type and key == "type"):
+            yield key
+    return
+
+
+class IndexedEncoder(object):
+
+    def __init__(self, strings: Optional[List[str]] = None):
+        self.entries = []
+        self.strings = strings if strings is not None else []
+        return
+
+    def encode(self, value: object, base: int = 0) -> bytes:
+        # Equivalent to orjson.dumps, but records the byte range of every
+        # declaration and type subtree. orjson writes the whole value, and
+        # the subtrees are then located in its output, which costs a walk
+        # over the containers and about one more encoding.
+        data = json.dumps(value)
+        found = _walk(value, self.strings)
+        starts = [x.start() for x in _indexed_start.finditer(data)]
+        if (
+                len(starts) == len(found) and
+                all(next(iter(x[1])) == "kind" for x in found)
+                ):
+            lengths = self._lengths(found)
+        else:
+            starts, lengths = self._search(data, found)
+        for idx, (owner, *_) in enumerate(found):
+            owner[2] = base + starts[idx]
+            owner[3] = lengths[idx]
+        # Entries are recorded in the order their subtrees close.
+        self.entries.extend(
+                sorted(
+                    (
+                        IndexEntry(*owner) for owner, *_ in found if
+                        owner[0] is not None or owner[1] is not None
+                        ),
+                    key=lambda x: x.offset + x.length
+                    )
+                )
+        return data
+
+    @staticmethod
+    def _lengths(found: List[list]) -> List[int]:
+        # Innermost first, each subtree is encoded with the subtrees nested in
+        # it swapped for a one byte stub, so no byte is encoded twice. The
+        # tree is put back as it was before returning.
+        lengths = [0] * len(found)
+        try:
+            for idx in range(len(found) - 1, -1, -1):
+                _, node, container, key, enclosing = found[idx]
+                lengths[idx] += len(json.dumps(node))
+                if enclosing is not None:
+                    lengths[enclosing] += lengths[idx] - 1
+                if container is not None:
+                    container[key] = 0
+        finally:
+            for _, node, container, key, _ in found:
+                if container is not None:
+                    container[key] = node
+        return lengths
+
+    @staticmethod
+    def _search(data: bytes, found: List[list]) -> Tuple[List[int], List[int]]:
+        # Without the kind up front, each subtree is searched for by its own
+        # encoding. A copy of it cannot start between the previous subtree
+        # and its own start: a brace and a quote never meet inside a string,
+        # so the copy would be another subtree in between.
+        starts = []
+        lengths = []
+        at = 0
+        for _, node, *_ in found:
+            piece = json.dumps(node)
+            at = data.index(piece, at + 1 if len(starts) else 0)
+            starts.append(at)
+            lengths.append(len(piece))
+        return starts, lengths
+
+    @staticmethod
+    def _capture(node: dict, owner: list, strings: List[str]) -> None:
+        # A subtree's own pointer, name, parent and location are the first
+        # ones reached in document order, before any nested declaration
+        # claims its own.
+        ptr = node.get("pointer")
+        if owner[0] is None and type(ptr) is int:
+            owner[0] = ptr
+        parent = node.get("parent_pointer")
+        if owner[5] is None and type(parent) is int:
+            owner[5] = parent
+        location = node.get("location")
+        if owner[6] is None and type(location) is dict:
+            owner[6] = location.get("file")
+            if type(owner[6]) is int:
+                owner[6] = strings[owner[6]]
+            begin = location.get("begin")
+            if type(begin) is dict:
+                owner[7] = begin.get("line")
+        id_ = node.get("id")
+        if (
+                owner[1] is None and
+                type(id_) is dict and
+                type(id_.get("qual_name")) is list
+                ):
+            owner[1] = "::".join(
+                    reversed(
+                        [
+                            strings[x] if type(x) is int else str(x) for
+                            x in id_["qual_name"]
+                            ]
+                        )
+                    )
+        return
+
+
+def _walk(tree: object, strings: List[str]) -> List[list]:
+    # The declaration and type subtrees of tree in document order, as
+    # [entry fields, node, container, key, enclosing] where node is
+    # container[key] and enclosing is the position of the nearest subtree
+    # around it. Only containers are visited, since nothing else can hold a
+    # subtree.
+    out = []
+    stack = [(tree, None, None, None, None)]
+    while stack:
+        item, owner, container, key, enclosing = stack.pop()
+        if type(item) is dict:
+            kind = item.get("kind")
+            if type(kind) is str:
+                owner = None
+                if kind.endswith(indexed_kinds):
+                    owner = [None, None, None, None, kind, None, None, None]
+                    out.append([owner, item, container, key, enclosing])
+                    enclosing = len(out) - 1
+            # Once a subtree has all of its fields, nothing below can change
+            # them.
+            if owner is not None and None in (
+                    owner[0],
+                    owner[1],
+                    owner[5],
+                    owner[6]
+                    ):
+                IndexedEncoder._capture(item, owner, strings)
+            for field, val in reversed(item.items()):
+                if type(val) is dict or type(val) is list:
+                    stack.append((val, owner, item, field, enclosing))
+        else:
+            for idx in range(len(item) - 1, -1, -1):
+                val = item[idx]
+                if type(val) is dict or type(val) is list:
+                    stack.append((val, owner, item, idx, enclosing))
+    return out
+
+
+def subtrees(
+        tree: object,
+        strings: Optional[List[str]] = None) -> List[Tuple[list, dict]]:
+    # The declaration and type subtrees the IndexedEncoder would record, as
+    # (entry fields, node) pairs, for trees that are not being encoded by it.
+    # Byte ranges are left None.
+    return [
+            (owner, node) for owner, node, *_ in
+            _walk(tree, strings if strings is not None else [])
+            ]
+
+
+def collect_entries(
+        tree: object,
+        strings: Optional[List[str]] = None) -> List[IndexEntry]:
+    return [
+            IndexEntry(*owner) for owner, _ in subtrees(tree, strings) if
+            owner[0] is not None or owner[1] is not None
+            ]
+
+
+def encode_index(
+        entries: List[IndexEntry],
+        ccs_size: int,
+        strings: Optional[List[str]] = None) -> bytes:
+    string_table = json.dumps(strings if strings is not None else [])
+    by_pointer = {}
+    names = []
+    for ptr, name, offset, length, *_ in entries:
+        if ptr is not None and ptr not in by_pointer:
+            by_pointer[ptr] = (offset, length)
+        if name is not None:
+            names.append((name.encode(), offset, length))
+    names.sort()
+    pointer_table = b"".join(
+            _pointer_entry.pack(ptr, *by_pointer[ptr]) for
+            ptr in sorted(by_pointer)
+            )
+    name_table = []
+    blob = bytearray()
+    for name, offset, length in names:
+        name_table.append(
+                _name_entry.pack(len(blob), len(name), offset, length)
+                )
+        blob += name
+    return b"".join(
+            [
+                _index_header.pack(
+                    index_magic,
+                    index_version,
+                    0,
+                    len(by_pointer),
+                    len(names),
+                    ccs_size,
+                    len(string_table)
+                    ),
+                pointer_table,
+                *name_table,
+                bytes(blob),
+                string_table
+                ]
+            )
+
+
+class CcsIndex(object):
+
+    def __init__(self, idx_path: str):
+        self.path = idx_path
+        with open(idx_path, "rb") as idx_file:
+            self._map = mmap.mmap(
+                    idx_file.fileno(),
+                    0,
+                    access=mmap.ACCESS_READ
+                    )
+        (
+                magic,
+                version,
+                _,
+                self.n_pointers,
+                self.n_names,
+                self.ccs_size,
+                strings_length
+                ) = _index_header.unpack_from(self._map, 0)
+        if magic != index_magic or version != index_version:
+            raise CcsIndexError(
+                    f"{idx_path}: not a version {index_version} index"
+                    )
+        self._pointers_at = _index_header.size
+        self._names_at = (
+                self._pointers_at + self.n_pointers * _pointer_entry.size
+                )
+        self._blob_at = self._names_at + self.n_names * _name_entry.size
+        self._strings_at = len(self._map) - strings_length
+        self._strings = None
+        return
+
+    def close(self) -> None:
+        self._map.close()
+        return
+
+    def strings(self) -> List[str]:
+        if self._strings is None:
+            self._strings = json.loads(self._map[self._strings_at:])
+        return self._strings
+
+    def by_pointer(self, ptr: int) -> Optional[Tuple[int, int]]:
+        lo = 0
+        hi = self.n_pointers
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry_ptr, offset, length = _pointer_entry.unpack_from(
+                    self._map,
+                    self._pointers_at + mid * _pointer_entry.size
+                    )
+            if entry_ptr == ptr:
+                return offset, length
+            if entry_ptr < ptr:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def _name_at(self, idx: int) -> Tuple[bytes, int, int]:
+        name_off, name_len, offset, length = _name_entry.unpack_from(
+                self._map,
+                self._names_at + idx * _name_entry.size
+                )
+        start = self._blob_at + name_off
+        return self._map[start:start + name_len], offset, length
+
+    def by_name(self, name: str) -> List[Tuple[int, int]]:
+        key = name.encode()
+        lo = 0
+        hi = self.n_names
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._name_at(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out = []
+        while lo < self.n_names:
+            entry_name, offset, length = self._name_at(lo)
+            if entry_name != key:
+                break
+            out.append((offset, length))
+            lo += 1
+        return out
@@ -0,0 +1,121 @@
+import fnmatch
+from typing import Dict, List, Optional, Tuple
+
+from ccmodel.storage.renumber import document_order, pointer_keys
+
+# Declarations are pruned by the file of their own location. A pruned
+# declaration takes its whole subtree with it. Pointers from the kept tree
+# into pruned subtrees are kept valid by adding a skipped stub for each
+# target to referenced_decls, which loads as a SkippableVariant and can be
+# linked to the full declaration in the header that owns it.
+stub_reason = "filtered by path"
+
+
+def path_kept(
+        file_: Optional[str],
+        keep: List[str],
+        drop: List[str]) -> bool:
+    # Declarations without a file, like implicit builtins, are always kept.
+    if type(file_) is not str:
+        return True
+    if len(keep) and not any(fnmatch.fnmatch(file_, x) for x in keep):
+        return False
+    return not any(fnmatch.fnmatch(file_, x) for x in drop)
+
+def is_decl(node: object) -> bool:
+    return (
+            type(node) is dict and
+            type(node.get("kind")) is str and
+            node["kind"].endswith("Decl") and
+            type(node.get("content")) is dict
+            )
+
+def decl_record(node: dict) -> Tuple[Optional[int], Optional[str], dict]:
+    # A declaration's own pointer, file and id are the first ones found
+    # above any nested node.
+    ptr = None
+    file_ = None
+    id_ = None
+    stack = [node["content"]]
+    while stack and (ptr is None or file_ is None or id_ is None):
+        item = stack.pop(0)
+        if type(item) is list:
+            stack.extend(item)
+            continue
+        if type(item) is not dict or "kind" in item:
+            continue
+        if ptr is None and type(item.get("pointer")) is int:
+            ptr = item["pointer"]
+        location = item.get("location")
+        if file_ is None and type(location) is dict:
+            file_ = location.get("file")
+        if (
+                id_ is None and
+                type(item.get("id")) is dict and
+                "qual_name" in item["id"]
+                ):
+            id_ = item["id"]
+        stack.extend(
+                x for x in item.values() if
+                type(x) in (dict, list) and
+                not (type(x) is dict and "kind" in x)
+                )
+    return ptr, file_, id_
+
+def stub(node: dict, ptr: int, id_: Optional[dict]) -> dict:
+    content = {"skipped": True, "reason": stub_reason, "pointer": ptr}
+    if id_ is not None:
+        content["id"] = id_
+    return {
+            "kind": node["kind"],
+            "clang_kind": node.get("clang_kind", node["kind"][:-4]),
+            "content": content
+            }
+
+def prune_translation_unit(
+        data: dict,
+        keep: List[str],
+        drop: List[str]) -> Tuple[int, int]:
+    if not len(keep) and not len(drop):
+        return 0, 0
+    stubs: Dict[int, dict] = {}
+    n_pruned = 0
+    stack = [data["content"]]
+    while stack:
+        item = stack.pop()
+        if type(item) is dict:
+            stack.extend(
+                    x for x in item.values() if type(x) in (dict, list)
+                    )
+            continue
+        if type(item) is not list:
+            continue
+        kept = []
+        for node in item:
+            if (
+                    is_decl(node) and
+                    not path_kept(decl_record(node)[1], keep, drop)
+                    ):
+                n_pruned += 1
+                for sub in document_order(node):
+                    if is_decl(sub):
+                        ptr, _, id_ = decl_record(sub)
+                        if ptr is not None and ptr not in stubs:
+                            stubs[ptr] = stub(sub, ptr, id_)
+            else:
+                kept.append(node)
+        item[:] = kept
+        stack.extend(x for x in item if type(x) in (dict, list))
+
+    # Stubs go out in order of first reference, so output stays
+    # deterministic.
+    needed = {}
+    for node in document_order(data):
+        for key in pointer_keys:
+            ptr = node.get(key)
+            if type(ptr) is int and ptr in stubs:
+                needed[ptr] = stubs[ptr]
+    data["content"].setdefault("referenced_decls", []).extend(
+            needed.values()
+            )
+    return n_pruned, len(needed)
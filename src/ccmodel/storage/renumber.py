@@ -0,0 +1,42 @@
+from typing import Dict, Iterator
+
+from ccmodel.storage.index import pointer_fields, reference_keys
+
+# Clang writes raw addresses for every pointer. The writer replaces them with
+# dense ids: nodes are numbered in document order of their own pointer, so
+# node k is the k-th node of the tree, and pointers to nodes outside the
+# translation unit are numbered after them in order of first reference.
+# The ids only depend on the tree, so the same source produces the same
+# output on every run, and readers can keep nodes in a list.
+pointer_keys = reference_keys + ("parent_pointer", "canonical_decl")
+
+
+def document_order(value: object) -> Iterator[dict]:
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if type(item) is dict:
+            yield item
+            stack.extend(
+                    x for x in reversed(list(item.values())) if
+                    type(x) in (dict, list)
+                    )
+        elif type(item) is list:
+            stack.extend(
+                    x for x in reversed(item) if type(x) in (dict, list)
+                    )
+    return
+
+def renumber_pointers(value: object) -> int:
+    ids: Dict[int, int] = {}
+    for node in document_order(value):
+        ptr = node.get("pointer")
+        if type(ptr) is int and ptr not in ids:
+            ids[ptr] = len(ids)
+    for node in document_order(value):
+        for key in pointer_fields(node, pointer_keys):
+            ptr = node[key]
+            if ptr not in ids:
+                ids[ptr] = len(ids)
+            node[key] = ids[ptr]
+    return len(ids)
@@ -0,0 +1,244 @@
+import os
+import sqlite3
+import zlib
+from typing import List, Optional, Tuple, Union
+
+from ccmodel.storage.database import (
+    CcmDatabase,
+    CcmDatabaseError,
+    busy_timeout,
+    reversed_key,
+    suffix_bounds
+)
+from ccmodel.storage.index import IndexEntry
+
+# A sharded database is a directory of CcmDatabase files, each holding the
+# translation units whose .ccs key hashes to it, plus a symbol table that
+# catalogues every header and maps each declaration's _ccm_identifier (its
+# qualified name, as captured by the index encoder) to the shard, header and
+# byte range holding it. The symbol table is the only file
+# a lookup reads before it goes to the one shard it needs. Headers stored
+# compressed have no byte ranges, so their rows only name the shard.
+symbol_table_name = "symbols.sqlite"
+symbol_schema = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS headers (
+    ccs TEXT PRIMARY KEY,
+    ccs_reversed TEXT NOT NULL,
+    shard INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS headers_ccs_reversed ON headers(ccs_reversed);
+CREATE TABLE IF NOT EXISTS symbols (
+    identifier TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    ccs TEXT NOT NULL,
+    offset INTEGER,
+    length INTEGER
+);
+CREATE INDEX IF NOT EXISTS symbols_identifier ON symbols(identifier);
+CREATE INDEX IF NOT EXISTS symbols_ccs ON symbols(ccs);
+"""
+
+
+def shard_name(shard: int) -> str:
+    return f"shard-{shard:03d}.sqlite"
+
+def shard_for(ccs: str, n_shards: int) -> int:
+    # crc32 rather than hash(), which is salted per process.
+    return zlib.crc32(ccs.encode()) % n_shards
+
+
+class SymbolTable(object):
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=busy_timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.executescript(symbol_schema)
+        return
+
+    def close(self) -> None:
+        self._conn.close()
+        return
+
+    def n_shards(self, n_shards: Optional[int] = None) -> int:
+        with self._conn:
+            if n_shards is not None:
+                self._conn.execute(
+                        "INSERT OR IGNORE INTO meta VALUES ('n_shards', ?)",
+                        (str(n_shards),)
+                        )
+            row = self._conn.execute(
+                    "SELECT value FROM meta WHERE key = 'n_shards'"
+                    ).fetchone()
+        if row is None:
+            raise CcmDatabaseError(f"{self.path}: shard count not recorded")
+        return int(row[0])
+
+    def update(
+            self,
+            ccs: str,
+            shard: int,
+            entries: List[IndexEntry]) -> None:
+        # Only the rows of the rewritten header change, so a rebuild of one
+        # translation unit costs one delete and one insert batch.
+        with self._conn:
+            self._conn.execute("DELETE FROM symbols WHERE ccs = ?", (ccs,))
+            self._conn.execute(
+                    "INSERT OR REPLACE INTO headers VALUES (?, ?, ?)",
+                    (ccs, reversed_key(ccs), shard)
+                    )
+            self._conn.executemany(
+                    "INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (x.name, x.kind, shard, ccs, x.offset, x.length) for
+                        x in entries if x.name is not None
+                        ]
+                    )
+        return
+
+    def remove(self, ccs: str) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM symbols WHERE ccs = ?", (ccs,))
+            self._conn.execute("DELETE FROM headers WHERE ccs = ?", (ccs,))
+        return
+
+    def shard_of(self, ccs: str) -> Optional[int]:
+        row = self._conn.execute(
+                "SELECT shard FROM headers WHERE ccs = ?",
+                (ccs,)
+                ).fetchone()
+        return None if row is None else row[0]
+
+    def find_ccs(self, suffix: str) -> List[str]:
+        if not len(suffix):
+            return [
+                    row[0] for row in
+                    self._conn.execute("SELECT ccs FROM headers ORDER BY ccs")
+                    ]
+        return [
+                row[0] for row in self._conn.execute(
+                    "SELECT ccs FROM headers " +
+                    "WHERE ccs_reversed >= ? AND ccs_reversed < ?",
+                    suffix_bounds(suffix)
+                    )
+                ]
+
+    def lookup(
+            self,
+            identifier: str,
+            kind: Optional[str] = None) -> List[Tuple[int, str, int, int]]:
+        query = (
+                "SELECT shard, ccs, offset, length FROM symbols " +
+                "WHERE identifier = ?"
+                )
+        args = [identifier]
+        if kind is not None:
+            query += " AND kind = ?"
+            args.append(kind)
+        return list(self._conn.execute(query, args))
+
+
+class ShardedCcmDatabase(object):
+
+    def __init__(self, path: str, n_shards: Optional[int] = None):
+        self.path = os.path.abspath(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.symbols = SymbolTable(os.path.join(self.path, symbol_table_name))
+        self.n_shards = self.symbols.n_shards(n_shards)
+        if n_shards is not None and n_shards != self.n_shards:
+            raise CcmDatabaseError(
+                    f"{self.path} holds {self.n_shards} shards, " +
+                    f"not {n_shards}"
+                    )
+        self._shards = {}
+        return
+
+    def close(self) -> None:
+        for shard in self._shards.values():
+            shard.close()
+        self._shards = {}
+        self.symbols.close()
+        return
+
+    def shard(self, shard: int) -> CcmDatabase:
+        # Shards are opened on first use, so a lookup only ever opens the
+        # one it needs.
+        if shard not in self._shards:
+            self._shards[shard] = CcmDatabase(
+                    os.path.join(self.path, shard_name(shard))
+                    )
+        return self._shards[shard]
+
+    def database_for(self, ccs: str) -> Optional[CcmDatabase]:
+        shard = self.symbols.shard_of(ccs)
+        return None if shard is None else self.shard(shard)
+
+    def write_header(
+            self,
+            ccs: str,
+            out: dict,
+            fmt: str,
+            payload: bytes,
+            entries: Optional[List[IndexEntry]] = None) -> None:
+        shard = shard_for(ccs, self.n_shards)
+        self.shard(shard).write_header(ccs, out, fmt, payload, entries)
+        self.symbols.update(ccs, shard, entries or [])
+        return
+
+    def remove_header(self, ccs: str) -> None:
+        database = self.database_for(ccs)
+        if database is not None:
+            database.remove_header(ccs)
+        self.symbols.remove(ccs)
+        return
+
+    def catalogue(self) -> List[str]:
+        return self.symbols.find_ccs("")
+
+    def find_ccs(self, suffix: str) -> List[str]:
+        return self.symbols.find_ccs(suffix)
+
+    def metadata(self, ccs: str) -> Optional[dict]:
+        database = self.database_for(ccs)
+        return None if database is None else database.metadata(ccs)
+
+    def payload(self, ccs: str) -> Optional[bytes]:
+        database = self.database_for(ccs)
+        return None if database is None else database.payload(ccs)
+
+    def find_declarations(
+            self,
+            qual_id: str,
+            kind: Optional[str] = None) -> List[Tuple[str, dict]]:
+        out = []
+        compressed = {}
+        for shard, ccs, offset, length in self.symbols.lookup(qual_id, kind):
+            if offset is None:
+                compressed.setdefault(shard, set()).add(ccs)
+                continue
+            decl = self.shard(shard).declaration_at(ccs, offset, length)
+            if decl is not None:
+                out.append((ccs, decl))
+        for shard, headers in compressed.items():
+            out.extend(
+                    x for x in
+                    self.shard(shard).find_declarations(qual_id, kind) if
+                    x[0] in headers
+                    )
+        return out
+
+
+def open_database(
+        path: str,
+        n_shards: int = 0) -> Union[CcmDatabase, ShardedCcmDatabase]:
+    if n_shards > 0:
+        return ShardedCcmDatabase(path, n_shards)
+    if os.path.isdir(path):
+        return ShardedCcmDatabase(path)
+    return CcmDatabase(path)
@@ -0,0 +1,70 @@
+from typing import Iterator, List, Tuple, Union
+
+# File paths of source ranges, the spellings of qualified types and the
+# components of qualified names repeat across a translation unit. The writer
+# stores each distinct one once in a string table and leaves its index in
+# the tree; readers map indices back. Strings that were never interned, as
+# in .ccs files written before the table existed, are left as they are.
+Slot = Tuple[Union[dict, list], Union[str, int]]
+
+
+def string_slots(value: object) -> Iterator[Slot]:
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if type(item) is dict:
+            if "file" in item and "begin" in item and "end" in item:
+                yield item, "file"
+            if "type_pointer" in item and "canonical" in item:
+                yield item, "type"
+                yield item, "canonical"
+            qual_name = item.get("qual_name")
+            if type(qual_name) is list:
+                if "name" in item:
+                    yield item, "name"
+                for idx in range(len(qual_name)):
+                    yield qual_name, idx
+            stack.extend(x for x in item.values() if type(x) in (dict, list))
+        elif type(item) is list:
+            stack.extend(x for x in item if type(x) in (dict, list))
+    return
+
+def intern_strings(value: object) -> List[str]:
+    table = []
+    ids = {}
+    for container, key in string_slots(value):
+        string = container[key]
+        # "None" stays literal, since readers turn it into None.
+        if type(string) is not str or string == "None":
+            continue
+        idx = ids.get(string)
+        if idx is None:
+            idx = ids[string] = len(table)
+            table.append(string)
+        container[key] = idx
+    return table
+
+def replace_none_sentinels(value: object) -> object:
+    # The clang plugin writes "None" for absent values. The writer stores
+    # them as null, so readers can index the decoded dicts directly. Like
+    # the wrapper readers used before, only object values are replaced.
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if type(item) is dict:
+            for key, val in item.items():
+                if type(val) is dict or type(val) is list:
+                    stack.append(val)
+                elif val == "None":
+                    item[key] = None
+        elif type(item) is list:
+            stack.extend(x for x in item if type(x) in (dict, list))
+    return value
+
+def resolve_strings(value: object, table: List[str]) -> object:
+    if not len(table):
+        return value
+    for container, key in string_slots(value):
+        if type(container[key]) is int:
+            container[key] = table[container[key]]
+    return value
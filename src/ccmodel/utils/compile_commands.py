@@ -0,0 +1,107 @@
+import os
+import shlex
+from typing import Dict, List, Tuple
+
+import ccmodel.__config__.ccmodel_config as ccmodel_config
+from ccmodel.utils.files import load_json_file
+
+# The backend forwards every argument to cc1 as -Xclang <arg>, and cc1
+# rejects driver-only flags such as -target, -fPIC or -march=, which would
+# drop the translation unit. So only flags that cc1 accepts and that change
+# what it sees in the translation unit are kept: include paths, forced
+# includes, macros, the language and its standard, and explicit -Xclang
+# arguments. Include paths are made absolute, and -I, -D and -U are joined to
+# their values so equal sets compare equal.
+path_flags = ("-I", "-isystem", "-iquote", "-idirafter", "-include")
+joined_path_flags = ("-I", "-isystem", "-iquote", "-idirafter")
+value_flags = ("-D", "-U", "-x")
+joined_flags = ("-I", "-D", "-U")
+launchers = ("ccache", "distcc", "sccache", "icecc")
+
+
+def entry_arguments(entry: dict) -> List[str]:
+    if "arguments" in entry:
+        return list(entry["arguments"])
+    return shlex.split(entry["command"])
+
+def entry_source(entry: dict) -> str:
+    return os.path.normpath(
+            os.path.join(entry["directory"], entry["file"])
+            )
+
+def compiler_arguments(entry: dict) -> List[str]:
+    # Drops launcher wrappers and the compiler itself. A launcher may also be
+    # run without naming a compiler, e.g. "ccache -c a.cc".
+    args = entry_arguments(entry)
+    idx = 0
+    while idx < len(args) and os.path.basename(args[idx]) in launchers:
+        idx += 1
+    if idx > 0 and idx < len(args) and args[idx].startswith("-"):
+        return args[idx:]
+    return args[idx + 1:]
+
+def effective_args(entry: dict) -> List[str]:
+    directory = entry["directory"]
+    args = compiler_arguments(entry)
+    out = []
+    idx = 0
+    while idx < len(args):
+        arg = args[idx]
+        idx += 1
+        if arg == "-Xclang":
+            # Already a cc1 argument; the backend adds the -Xclang itself.
+            if idx < len(args):
+                out.append(args[idx])
+                idx += 1
+            continue
+        if arg.startswith("-std="):
+            out.append(arg)
+            continue
+        flag = None
+        value = None
+        if arg in (*path_flags, *value_flags):
+            flag = arg
+            if idx < len(args):
+                value = args[idx]
+                idx += 1
+        else:
+            for prefix in (*joined_path_flags, *value_flags):
+                if arg.startswith(prefix):
+                    flag = prefix
+                    value = arg[len(prefix):]
+                    break
+        if flag is None or value is None:
+            continue
+        if flag in path_flags:
+            value = os.path.normpath(os.path.join(directory, value))
+        if flag in joined_flags:
+            out.append(flag + value)
+        else:
+            out.extend([flag, value])
+    return out
+
+def load_compile_commands(path: str) -> Dict[str, List[str]]:
+    file_args = {}
+    for entry in load_json_file(path):
+        source = entry_source(entry)
+        args = effective_args(entry)
+        if source in file_args:
+            if file_args[source] != args:
+                ccmodel_config.logger.bind(stage_log=True, color="yellow")\
+                        .opt(colors=True)\
+                        .warning(
+                        f"{os.path.relpath(source)} has conflicting " +
+                        "compile commands; keeping the first\n"
+                        )
+            continue
+        file_args[source] = args
+    return file_args
+
+def group_by_args(
+        files: List[str],
+        file_args: Dict[str, List[str]]) -> List[Tuple[List[str], List[str]]]:
+    groups = {}
+    for file_ in files:
+        args = tuple(file_args.get(file_, []))
+        groups.setdefault(args, []).append(file_)
+    return [(group, list(args)) for args, group in groups.items()]
@@ -11,3 +11,12 @@ def load_json_file(file_name: str) -> dict:
     with open(file_name, "r") as json_file:
         content = json.loads(json_file.read())
     return content
+
+def write_file_atomic(file_name: str, data: bytes) -> None:
+    # Readers must never see a partially written file, so write next to the
+    # target and move it into place.
+    tmp_name = file_name + f".{os.getpid()}.tmp"
+    with open(tmp_name, "wb") as out_file:
+        out_file.write(data)
+    os.replace(tmp_name, file_name)
+    return
@@ -0,0 +1,54 @@
+import fcntl
+import os
+
+
+def lock_path(path: str) -> str:
+    return os.path.splitext(path)[0] + ".lock"
+
+
+class FileLock(object):
+
+    # Advisory flock on a lock file that is never deleted, since removing it
+    # would let a second process lock a fresh inode while the first still
+    # holds the old one. Locks are released explicitly because forked worker
+    # processes share the open file description.
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+        return
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+        return
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(
+                    fd,
+                    fcntl.LOCK_EX if blocking else
+                    fcntl.LOCK_EX | fcntl.LOCK_NB
+                    )
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+        return
@@ -0,0 +1,101 @@
+import cProfile
+import os
+import sys
+import time
+import orjson as json
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import ccmodel.__config__.ccmodel_config as ccmodel_config
+from ccmodel.utils.files import write_file_atomic
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_kb(children: bool = False) -> Optional[int]:
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere.
+    if sys.platform == "darwin":
+        peak //= 1024
+    return peak
+
+
+class CcmProfile(object):
+
+    def __init__(self, path: str, use_cprofile: bool = False):
+        self.path = path
+        self.use_cprofile = use_cprofile
+        self.stages = []
+        self.files = {}
+        self._tic = time.perf_counter()
+        return
+
+    def cprofile_path(self, stage_idx: int, name: str) -> str:
+        root, _ = os.path.splitext(self.path)
+        return f"{root}-{stage_idx:03d}-{name}.prof"
+
+    @contextmanager
+    def stage(self, name: str, n_files: int, **extra) -> None:
+        record = {
+                "stage": name,
+                "files": n_files,
+                **extra
+                }
+        profiler = None
+        if self.use_cprofile:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        tic = time.perf_counter()
+        cpu_tic = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - tic
+            record["cpu_time"] = time.process_time() - cpu_tic
+            record["peak_rss_kb"] = peak_rss_kb()
+            if profiler is not None:
+                profiler.disable()
+                record["cprofile"] = self.cprofile_path(len(self.stages), name)
+                profiler.dump_stats(record["cprofile"])
+            self.stages.append(record)
+        return
+
+    def add_file(self, file_: str, stats: dict) -> None:
+        self.files.setdefault(file_, {}).update(stats)
+        return
+
+    def totals(self) -> Dict[str, float]:
+        totals = {}
+        for stats in self.files.values():
+            for key, value in stats.items():
+                if key.endswith(("_time", "_bytes")) or key in (
+                        "declarations",
+                        "includes"
+                        ):
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def save(self, argv: Optional[List[str]] = None) -> None:
+        write_file_atomic(
+                self.path,
+                json.dumps(
+                    {
+                        "tool_version": ccmodel_config.ccmodel_version,
+                        "argv": argv if argv is not None else sys.argv,
+                        "wall_time": time.perf_counter() - self._tic,
+                        "peak_rss_kb": peak_rss_kb(),
+                        "children_peak_rss_kb": peak_rss_kb(True),
+                        "totals": self.totals(),
+                        "stages": self.stages,
+                        "files": self.files
+                        },
+                    option=json.OPT_INDENT_2
+                    )
+                )
+        return
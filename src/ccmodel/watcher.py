@@ -0,0 +1,140 @@
+import os
+import queue
+import time
+from typing import Iterable, Optional, Set
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+_change_events = ("created", "modified", "moved", "deleted")
+
+
+class _EventForwarder(FileSystemEventHandler):
+
+    def __init__(self, watcher: "CcmWatcher"):
+        super().__init__()
+        self._watcher = watcher
+        return
+
+    def on_any_event(self, event) -> None:
+        # Reads by clang itself show up as open/close events; only content
+        # and directory entry changes matter.
+        if (
+                event.is_directory or
+                event.event_type not in _change_events
+                ):
+            return
+        for path in (
+                getattr(event, "src_path", None),
+                getattr(event, "dest_path", None)
+                ):
+            if path is None:
+                continue
+            path = os.path.normpath(path)
+            if path in self._watcher._paths:
+                self._watcher._events.put(path)
+        return
+
+
+class CcmWatcher(object):
+
+    def __init__(
+            self,
+            poll_interval: float = 1.0,
+            settle_time: float = 0.5,
+            use_polling: bool = False):
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.use_polling = use_polling or Observer is None
+        self._paths = set()
+        self._m_times = {}
+        self._events = queue.Queue()
+        self._observer = None
+        self._watched_dirs = set()
+        return
+
+    @staticmethod
+    def _m_time(path: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    def watch(self, paths: Iterable[str]) -> None:
+        self._paths = set(os.path.normpath(x) for x in paths)
+        # Paths that were already being watched keep their old snapshot, so
+        # an edit made while a rebuild was running is still reported.
+        self._m_times = {
+                path: self._m_times[path] if path in self._m_times else
+                self._m_time(path) for path in self._paths
+                }
+        if self.use_polling:
+            return
+        if self._observer is None:
+            self._observer = Observer()
+            self._observer.start()
+        for dir_ in set(os.path.dirname(x) for x in self._paths):
+            if dir_ in self._watched_dirs or not os.path.isdir(dir_):
+                continue
+            self._observer.schedule(
+                    _EventForwarder(self),
+                    dir_,
+                    recursive=False
+                    )
+            self._watched_dirs.add(dir_)
+        return
+
+    def _poll_changes(self) -> Set[str]:
+        changed = set()
+        for path in self._paths:
+            m_time = self._m_time(path)
+            if m_time != self._m_times.get(path):
+                self._m_times[path] = m_time
+                changed.add(path)
+        return changed
+
+    def _next_changes(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.use_polling:
+            while True:
+                changed = self._poll_changes()
+                if changed:
+                    return changed
+                if deadline is not None and time.monotonic() >= deadline:
+                    return set()
+                wait_for = self.poll_interval
+                if deadline is not None:
+                    wait_for = min(wait_for, deadline - time.monotonic())
+                time.sleep(max(wait_for, 0.0))
+        try:
+            changed = {self._events.get(timeout=timeout)}
+        except queue.Empty:
+            return set()
+        while True:
+            try:
+                changed.add(self._events.get_nowait())
+            except queue.Empty:
+                return changed
+
+    def wait(self) -> Set[str]:
+        changed = self._next_changes(None)
+        # Editors and build steps tend to touch files in bursts; keep
+        # collecting until the file system has been quiet for settle_time.
+        while True:
+            more = self._next_changes(self.settle_time)
+            if not more:
+                return changed
+            changed.update(more)
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+            self._watched_dirs = set()
+        return
@@ -0,0 +1,290 @@
+import os
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+import ccmodel.ccm as ccm
+import ccmodel.manifest as manifest_module
+from ccmodel.manifest import CcmManifest
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    src = tmp_path / "a.cc"
+    hdr = tmp_path / "a.hh"
+    out_dir = tmp_path / "ccm"
+    src.write_text('#include "a.hh"\n')
+    hdr.write_text("int a;\n")
+    out_dir.mkdir()
+    (out_dir / "a.ccs").write_bytes(b"{}")
+    manifest = CcmManifest(str(out_dir))
+    monkeypatch.setattr(ccm, "manifest", manifest)
+    return str(src), str(hdr), manifest
+
+
+def build(
+        manifest: CcmManifest,
+        src: str,
+        hdr: str,
+        during_clang=lambda: None) -> dict:
+    snapshot = ccm.source_snapshot(src)
+    during_clang()
+    dependencies = ccm.fingerprint_dependencies(
+            src,
+            [{"search_path": os.path.dirname(hdr), "file": hdr}],
+            set(),
+            snapshot
+            )
+    manifest.update(
+            src,
+            {
+                "ccs": "a.ccs",
+                "m_time": snapshot["m_time"],
+                "includes": [],
+                "dependencies": dependencies
+                }
+            )
+    return dependencies
+
+
+class TestDependencyFingerprints(object):
+
+    def test_untouched_tree_is_fresh(self, project, monkeypatch):
+        src, hdr, manifest = project
+        first = build(manifest, src, hdr)
+        assert first[hdr]["size"] == os.path.getsize(hdr)
+        hashed = []
+        monkeypatch.setattr(
+                manifest_module,
+                "file_hash",
+                lambda path: hashed.append(path) or ""
+                )
+        assert manifest.stale_reason(src) is None
+        assert build(manifest, src, hdr) == first
+        assert hashed == []
+
+    def test_edited_header_is_stale(self, project):
+        src, hdr, manifest = project
+        first = build(manifest, src, hdr)
+        # Same modification time, so only the size gives the edit away.
+        m_time = os.path.getmtime(hdr)
+        with open(hdr, "a") as hdr_file:
+            hdr_file.write("int b;\n")
+        os.utime(hdr, (m_time, m_time))
+        assert manifest.stale_reason(src).endswith("a.hh changed")
+        second = build(manifest, src, hdr)
+        assert second[hdr]["hash"] != first[hdr]["hash"]
+        assert manifest.stale_reason(src) is None
+
+    def test_touched_header_is_rehashed(self, project):
+        src, hdr, manifest = project
+        first = build(manifest, src, hdr)
+        os.utime(hdr, (0, 0))
+        assert manifest.stale_reason(src) is None
+        second = build(manifest, src, hdr)
+        assert second[hdr]["m_time"] == 0
+        assert second[hdr]["hash"] == first[hdr]["hash"]
+
+    def test_edit_during_clang_is_stale(self, project):
+        src, hdr, manifest = project
+        build(manifest, src, hdr)
+
+        def edit() -> None:
+            with open(hdr, "a") as hdr_file:
+                hdr_file.write("int b;\n")
+            os.utime(src, (10, 10))
+            return
+
+        # The fingerprints are the ones clang started from, not the files as
+        # they are once it is done.
+        build(manifest, src, hdr, edit)
+        assert manifest.stale_reason(src) == "source changed"
+        os.utime(src, (manifest[src]["m_time"],) * 2)
+        assert manifest.stale_reason(src).endswith("a.hh changed")
+
+    def test_new_dependency_edited_during_clang(self, project):
+        src, hdr, manifest = project
+        snapshot = ccm.source_snapshot(src)
+        # First seen in clang's output and modified after the snapshot.
+        os.utime(hdr, (snapshot["started"] + 1,) * 2)
+        dependencies = ccm.fingerprint_dependencies(
+                src,
+                [{"search_path": os.path.dirname(hdr), "file": hdr}],
+                set(),
+                snapshot
+                )
+        assert dependencies[hdr]["hash"] is None
+        assert manifest_module.file_changed(hdr, dependencies[hdr])
+
+
+@pytest.fixture
+def includes(tmp_path, monkeypatch):
+    # Stands in for a parse: run_stage records each wave and writes the
+    # include list the file was given into the manifest.
+    manifest = CcmManifest(str(tmp_path))
+    monkeypatch.setattr(ccm, "manifest", manifest)
+    monkeypatch.setattr(ccm.ccm_opt, "include_depth", -1)
+    monkeypatch.setattr(ccm.ccm_opt, "ccm_files", [])
+    tree = {}
+    waves = []
+
+    def run_stage() -> None:
+        waves.append(list(ccm.ccm_opt.ccm_files))
+        for file_ in ccm.ccm_opt.ccm_files:
+            manifest.update(
+                    file_,
+                    {"includes": [{"file": x} for x in tree.get(file_, [])]}
+                    )
+        return
+
+    monkeypatch.setattr(ccm, "run_stage", run_stage)
+    return manifest, tree, waves
+
+
+def recorded(manifest: CcmManifest, tree: dict) -> None:
+    for file_, incs in tree.items():
+        manifest.update(file_, {"includes": [{"file": x} for x in incs]})
+    return
+
+
+class TestIncludeClosure(object):
+
+    def test_headers_before_includers(self, includes):
+        manifest, tree, waves = includes
+        tree.update(
+                {
+                    "/a.cc": ["/b.hh", "/c.hh"],
+                    "/b.hh": ["/c.hh"],
+                    "/c.hh": []
+                    }
+                )
+        recorded(manifest, tree)
+        graph = ccm.include_graph(["/a.cc"])
+        assert graph == {
+                "/a.cc": {"/b.hh", "/c.hh"},
+                "/b.hh": {"/c.hh"},
+                "/c.hh": set()
+                }
+        ccm.process_include_closure(["/a.cc"])
+        assert waves == [["/c.hh"], ["/b.hh"], ["/a.cc"]]
+
+    def test_two_cycle(self, includes):
+        manifest, tree, waves = includes
+        tree.update({"/a.hh": ["/b.hh"], "/b.hh": ["/a.hh"]})
+        recorded(manifest, tree)
+        sorter = ccm.schedule_includes(ccm.include_graph(["/a.hh"]))
+        assert sorted(sorter.get_ready()) == ["/a.hh", "/b.hh"]
+        ccm.process_include_closure(["/a.hh"])
+        assert sorted(x for wave in waves for x in wave) == ["/a.hh", "/b.hh"]
+
+    def test_closure_terminates(self, includes):
+        # Nothing is known up front, so every parse uncovers more files,
+        # including a cycle back to one already processed.
+        manifest, tree, waves = includes
+        tree.update(
+                {
+                    "/a.cc": ["/b.hh"],
+                    "/b.hh": ["/c.hh"],
+                    "/c.hh": ["/b.hh", "/d.hh"],
+                    "/d.hh": []
+                    }
+                )
+        ccm.process_include_closure(["/a.cc"])
+        done = [x for wave in waves for x in wave]
+        assert sorted(done) == ["/a.cc", "/b.hh", "/c.hh", "/d.hh"]
+        assert len(done) == len(set(done))
+        assert ccm.include_stage is False
+
+
+@pytest.fixture
+def sources(monkeypatch):
+    files = [f"/src/{x}.cc" for x in "abcde"]
+    monkeypatch.setattr(ccm.ccm_opt, "ccm_files", files)
+    monkeypatch.setattr(ccm.ccm_opt, "file_args", {"/src/e.cc": ["-DE"]})
+    monkeypatch.setattr(ccm.ccm_opt, "jobs", 2)
+    return files
+
+
+class TestClangTasks(object):
+
+    def test_plugin_files_run_alone(self, sources, monkeypatch):
+        monkeypatch.setattr(
+                ccm.clang_config,
+                "tool_type",
+                ccm.clang_config.ToolType.PLUGIN
+                )
+        assert ccm.clang_tasks() == [([x], []) for x in sources[:4]] + [
+                (["/src/e.cc"], ["-DE"])
+                ]
+
+    def test_docker_files_are_batched(self, sources, monkeypatch):
+        monkeypatch.setattr(
+                ccm.clang_config,
+                "tool_type",
+                ccm.clang_config.ToolType.DOCKER
+                )
+        assert ccm.clang_tasks() == [
+                (["/src/a.cc", "/src/c.cc"], []),
+                (["/src/b.cc", "/src/d.cc"], []),
+                (["/src/e.cc"], ["-DE"])
+                ]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    # Threads stand in for the process pools, and the backend and converter
+    # only track which files have raw output that is not converted yet.
+    files = [f"/src/f{x}.cc" for x in range(20)] + ["/src/fail.cc"]
+    monkeypatch.setattr(ccm, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(ccm, "manifest", CcmManifest(str(tmp_path)))
+    monkeypatch.setattr(ccm, "prepare_backend", lambda: None)
+    monkeypatch.setattr(ccm, "source_snapshot", lambda file_: {})
+    monkeypatch.setattr(ccm.ccm_opt, "ccm_files", files)
+    monkeypatch.setattr(ccm.ccm_opt, "file_args", {})
+    monkeypatch.setattr(ccm.ccm_opt, "out_dir", str(tmp_path))
+    monkeypatch.setattr(ccm.ccm_opt, "jobs", 4)
+    monkeypatch.setattr(ccm.ccm_opt, "queue_size", 5)
+    lock = threading.Lock()
+    pending = set()
+    peak = [0]
+    written = []
+
+    def run_clang_backend(tool_type, files, file_args, opt) -> list:
+        with lock:
+            pending.update(files)
+            peak[0] = max(peak[0], len(pending))
+        time.sleep(0.002)
+        with lock:
+            pending.difference_update(x for x in files if "fail" in x)
+        return [(x, "fail" not in x, {}) for x in files]
+
+    def convert_clang_output(*args) -> tuple:
+        time.sleep(0.01)
+        return {}, {}
+
+    def report_ccs_written(full_file, entry, stats) -> None:
+        with lock:
+            pending.discard(full_file)
+        written.append(full_file)
+        return
+
+    monkeypatch.setattr(ccm, "run_clang_backend", run_clang_backend)
+    monkeypatch.setattr(ccm, "convert_clang_output", convert_clang_output)
+    monkeypatch.setattr(ccm, "report_ccs_written", report_ccs_written)
+    return files, peak, written
+
+
+class TestPipeline(object):
+
+    @pytest.mark.parametrize("kind", ["PLUGIN", "DOCKER"])
+    def test_pending_files_stay_bounded(self, pipeline, monkeypatch, kind):
+        files, peak, written = pipeline
+        monkeypatch.setattr(
+                ccm.clang_config,
+                "tool_type",
+                getattr(ccm.clang_config.ToolType, kind)
+                )
+        ccm.pipeline_ccm()
+        assert sorted(written) == sorted(x for x in files if "fail" not in x)
+        assert 1 < peak[0] <= ccm.ccm_opt.queue_size
@@ -0,0 +1,144 @@
+import io
+import os
+import pytest
+
+from ccmodel.storage import (
+    ccs_format,
+    codecs
+)
+from ccmodel.storage.ccs_format import CcsFile
+
+
+def ccs_content() -> dict:
+    return {
+            "file": "/src/a.hh",
+            "includes": [{"search_path": "/src", "file": "/src/b.hh"}],
+            "m_time": 1.5,
+            "dependencies": {"/src/b.hh": {"m_time": 1.0, "hash": "ab"}},
+            "translation_unit": {
+                "kind": "TranslationUnitDecl",
+                "clang_kind": "TranslationUnit",
+                "content": {
+                    "skipped": False,
+                    "main_context": {"declarations": [{"kind": "VarDecl"}]},
+                    "integer_type_widths": {},
+                    "includes": [{"search_path": "/src", "file": "/src/b.hh"}],
+                    "referenced_types": [{"kind": "BuiltinType"}],
+                    "referenced_decls": [],
+                    "pointer": 1
+                    }
+                }
+            }
+
+
+@pytest.fixture(
+        params=[
+            (fmt, codec) for fmt in ccs_format.formats for
+            codec in codecs.codecs
+            ]
+        )
+def ccs_path(request, tmp_path):
+    path = tmp_path / "a.ccs"
+    fmt, codec = request.param
+    path.write_bytes(
+            ccs_format.encode_ccs(ccs_content(), fmt, compress=codec)
+            )
+    return str(path)
+
+
+class TestCcsFormat(object):
+
+    def test_round_trip(self, ccs_path):
+        assert CcsFile(ccs_path).load() == ccs_content()
+
+    def test_metadata(self, ccs_path):
+        metadata = CcsFile(ccs_path).metadata()
+        assert metadata["file"] == "/src/a.hh"
+        assert metadata["m_time"] == 1.5
+        assert metadata["includes"] == ccs_content()["includes"]
+
+    def test_binary_sections(self, tmp_path):
+        path = tmp_path / "a.ccs"
+        path.write_bytes(ccs_format.encode_ccs(ccs_content(), "binary"))
+        ccs_file = CcsFile(str(path))
+        assert ccs_file.binary
+        assert ccs_file.section("referenced_types") == [{"kind": "BuiltinType"}]
+        assert "referenced_types" not in (
+                ccs_file.section("declarations")["content"]
+                )
+
+    def test_stream_in_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(codecs, "chunk_size", 7)
+        path = tmp_path / "a.ccs"
+        path.write_bytes(
+                ccs_format.encode_ccs(ccs_content(), "json", compress="lzma")
+                )
+        ccs_file = CcsFile(str(path))
+        assert ccs_file.codec == "lzma"
+        assert ccs_file.load() == ccs_content()
+
+    @pytest.mark.parametrize("codec", codecs.codecs[1:])
+    def test_truncated_compressed_section(self, tmp_path, codec):
+        path = tmp_path / "a.ccs"
+        path.write_bytes(
+                ccs_format.encode_ccs(ccs_content(), "binary", compress=codec)
+                )
+        offset, length, encoding = CcsFile(str(path))._sections["declarations"]
+        data = path.read_bytes()
+        for payload in (data[offset:offset + length // 2], b"\0" * length):
+            with pytest.raises(ccs_format.CcsFormatError):
+                ccs_format.decode_section(
+                        io.BytesIO(payload),
+                        len(payload),
+                        encoding
+                        )
+
+        path.write_bytes(
+                ccs_format.encode_ccs(ccs_content(), "json", compress=codec)
+                )
+        path.write_bytes(path.read_bytes()[:-8])
+        with pytest.raises(ccs_format.CcsFormatError):
+            CcsFile(str(path)).load()
+
+    def test_binary_header(self, tmp_path):
+        out = ccs_content()
+        out.update(
+                {
+                    "tool_version": "1.2.3",
+                    "backend": "clang-10",
+                    "format": "binary",
+                    "source_hash": "12" * 20,
+                    "args_hash": "34" * 20,
+                    "pointer_count": 7,
+                    "decl_count": 2
+                    }
+                )
+        path = tmp_path / "a.ccs"
+        path.write_bytes(ccs_format.encode_ccs(out, "binary"))
+        ccs = CcsFile(str(path))
+        ccs.validate()
+        assert ccs.header.tool_version == "1.2.3"
+        assert ccs.header.format == "binary"
+        assert ccs.header.source_hash == "12" * 20
+        assert ccs.header.n_pointers == 7
+        assert ccs.header.n_decls == 2
+        assert ccs.header.n_types == 1
+        assert ccs.header.file_size == os.path.getsize(path)
+        assert ccs.metadata()["decl_count"] == 2
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(ccs_format.CcsFormatError):
+            CcsFile(str(path)).validate()
+
+    def test_long_header_fields(self, tmp_path):
+        out = ccs_content()
+        label = "binary+paths-0123abcd@/a/long/path/to/the/ccm.sqlite"
+        out["format"] = label
+        path = tmp_path / "a.ccs"
+        path.write_bytes(ccs_format.encode_ccs(out, "binary"))
+        header = CcsFile(str(path)).header
+        assert header.format == ccs_format.header_label(label)
+        assert header.format != ccs_format.header_label(label + "2")
+        assert len(header.format) == 32
+        out["tool_version"] = "x" * 33
+        with pytest.raises(ccs_format.CcsFormatError):
+            ccs_format.encode_ccs(out, "binary")
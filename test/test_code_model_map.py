@@ -0,0 +1,66 @@
+import pytest
+
+from ccmodel.code_models.basic import Variant
+from ccmodel.code_models.variants import DeclFactory, FunctionDecl, TagType
+from ccmodel.rules.code_model_map import (
+        code_models,
+        reset_code_model,
+        use_code_model
+        )
+
+
+class LightFunctionDecl(Variant):
+
+    def __init__(self):
+        super().__init__()
+        self.name = None
+        return
+
+    def load_content(self, obj: dict) -> dict:
+        self.name = obj["name"]
+        return obj
+
+
+def function_decl() -> dict:
+    return {
+            "kind": "FunctionDecl",
+            "clang_kind": "Function",
+            "content": {"skipped": False, "name": "f"}
+            }
+
+
+class TestCodeModelMap(object):
+
+    def test_defaults(self):
+        assert code_models["decl"]["FunctionDecl"] is FunctionDecl
+        assert code_models["type"]["RecordType"] is TagType
+        assert "ParenType" in code_models["type"]
+
+    def test_use_code_model(self):
+        use_code_model("decl", "FunctionDecl", LightFunctionDecl)
+        try:
+            out = DeclFactory.create_variant(function_decl())
+        finally:
+            reset_code_model("decl", "FunctionDecl")
+        assert isinstance(out, LightFunctionDecl)
+        assert out.name == "f"
+        assert out.kind == "FunctionDecl"
+        assert code_models["decl"]["FunctionDecl"] is FunctionDecl
+
+    def test_new_kind(self):
+        obj = function_decl()
+        obj["kind"] = "LightDecl"
+        assert DeclFactory.create_variant(obj) is None
+        use_code_model("decl", "LightDecl", LightFunctionDecl)
+        try:
+            assert isinstance(
+                    DeclFactory.create_variant(obj),
+                    LightFunctionDecl
+                    )
+        finally:
+            reset_code_model("decl", "LightDecl")
+        assert "LightDecl" not in code_models["decl"]
+
+    def test_unknown_category(self):
+        with pytest.raises(ValueError):
+            use_code_model("comment", "FullComment", LightFunctionDecl)
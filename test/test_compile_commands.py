@@ -0,0 +1,114 @@
+import orjson as json
+import pytest
+
+from ccmodel.utils.compile_commands import (
+    effective_args,
+    load_compile_commands,
+    group_by_args
+)
+
+
+class TestCompileCommands(object):
+
+    def test_effective_args_keep_model_flags(self):
+        entry = {
+                "directory": "/proj/build",
+                "file": "../src/a.cc",
+                "arguments": [
+                    "c++", "-O2", "-g", "-I../inc", "-D", "A=1",
+                    "-isystem", "/opt/inc", "-std=c++17", "-c",
+                    "../src/a.cc", "-o", "a.o", "-MD", "-MF", "a.d",
+                    "-Wall", "-Werror", "-fno-exceptions", "-target",
+                    "x86_64-linux-gnu", "-fPIC", "-march=native",
+                    "-Xclang", "-fno-validate-pch", "-x", "c++"
+                    ]
+                }
+        # Driver-only flags would make cc1 reject the whole command.
+        assert effective_args(entry) == [
+                "-I/proj/inc",
+                "-DA=1",
+                "-isystem",
+                "/opt/inc",
+                "-std=c++17",
+                "-fno-validate-pch",
+                "-x",
+                "c++"
+                ]
+
+    def test_joined_include_flags(self):
+        entry = {
+                "directory": "/proj",
+                "file": "a.cc",
+                "arguments": [
+                    "cc", "-isystem../sys", "-iquote", "q", "-iquoteq2",
+                    "-MTa.o", "-oa.o", "-gdwarf-4", "-Wp,-DP", "-xc",
+                    "a.cc"
+                    ]
+                }
+        assert effective_args(entry) == [
+                "-isystem",
+                "/sys",
+                "-iquote",
+                "/proj/q",
+                "-iquote",
+                "/proj/q2",
+                "-x",
+                "c"
+                ]
+
+    def test_launcher_is_stripped(self):
+        for command in (
+                "/usr/bin/ccache clang++ -DX -c a.cc",
+                "distcc g++ -DX -c a.cc",
+                "ccache -DX -c a.cc"
+                ):
+            entry = {"directory": "/p", "file": "a.cc", "command": command}
+            assert effective_args(entry) == ["-DX"]
+
+    def test_command_string_matches_arguments(self):
+        entry = {
+                "directory": "/proj",
+                "file": "a.cc",
+                "command": "cc -I inc -DX -c a.cc"
+                }
+        assert effective_args(entry) == ["-I/proj/inc", "-DX"]
+
+    def test_duplicates_and_groups(self, tmp_path):
+        db = tmp_path / "compile_commands.json"
+        db.write_bytes(
+                json.dumps(
+                    [
+                        {
+                            "directory": "/p",
+                            "file": "a.cc",
+                            "command": "cc -DX -O2 -c a.cc"
+                            },
+                        {
+                            "directory": "/p",
+                            "file": "b.cc",
+                            "command": "cc -DX -O2 -Wall -g -c b.cc"
+                            },
+                        {
+                            "directory": "/p",
+                            "file": "a.cc",
+                            "command": "cc -DY -c a.cc"
+                            },
+                        {
+                            "directory": "/p",
+                            "file": "c.cc",
+                            "command": "cc -c c.cc"
+                            }
+                        ]
+                    )
+                )
+        file_args = load_compile_commands(str(db))
+        assert file_args == {
+                "/p/a.cc": ["-DX"],
+                "/p/b.cc": ["-DX"],
+                "/p/c.cc": []
+                }
+        groups = group_by_args(sorted(file_args), file_args)
+        assert groups == [
+                (["/p/a.cc", "/p/b.cc"], ["-DX"]),
+                (["/p/c.cc"], [])
+                ]
@@ -0,0 +1,180 @@
+import pytest
+
+from ccmodel.reader import CcsDbReader
+from ccmodel.storage import ccs_format
+from ccmodel.storage.database import CcmDatabase, CcmDatabaseError
+from ccmodel.storage.index import collect_entries
+from ccmodel.storage.shards import ShardedCcmDatabase, shard_for
+
+
+def ccs_content(file_: str) -> dict:
+    return {
+            "file": file_,
+            "includes": [{"search_path": "/src", "file": "/src/b.hh"}],
+            "m_time": 2.0,
+            "translation_unit": {
+                "kind": "TranslationUnitDecl",
+                "content": {
+                    "main_context": {
+                        "declarations": [
+                            {
+                                "kind": "VarDecl",
+                                "content": {
+                                    "decl": {
+                                        "pointer": 5,
+                                        "parent_pointer": 1,
+                                        "location": {
+                                            "file": file_,
+                                            "begin": {"line": 3}
+                                            }
+                                        },
+                                    "id": {"name": "v", "qual_name": ["v"]}
+                                    }
+                                }
+                            ]
+                        },
+                    "referenced_types": [],
+                    "referenced_decls": [],
+                    "pointer": 1
+                    }
+                }
+            }
+
+
+@pytest.fixture
+def database(tmp_path):
+    db = CcmDatabase(str(tmp_path / "ccm.sqlite"))
+    for key, file_ in (
+            ("src/a.ccs", "/src/a.hh"),
+            ("other/src/a.ccs", "/other/src/a.hh")
+            ):
+        entries = []
+        out = ccs_content(file_)
+        payload = ccs_format.encode_ccs(out, index_entries=entries)
+        db.write_header(key, out, "json", payload, entries)
+    yield db
+    db.close()
+
+
+class TestCcmDatabase(object):
+
+    def test_find_ccs_by_suffix(self, database):
+        assert sorted(database.find_ccs("src/a.ccs")) == [
+                "other/src/a.ccs",
+                "src/a.ccs"
+                ]
+        assert database.find_ccs("other/src/a.ccs") == ["other/src/a.ccs"]
+        assert database.find_ccs("b.ccs") == []
+
+    def test_metadata_and_payload(self, database):
+        metadata = database.metadata("src/a.ccs")
+        assert metadata["file"] == "/src/a.hh"
+        assert metadata["includes"] == [
+                {"file": "/src/b.hh", "search_path": "/src"}
+                ]
+        payload = database.payload("src/a.ccs")
+        assert ccs_format.CcsFile("a.ccs", payload).load() == (
+                ccs_content("/src/a.hh")
+                )
+
+    def test_rewrite_replaces_rows(self, database):
+        out = ccs_content("/src/a.hh")
+        entries = []
+        payload = ccs_format.encode_ccs(out, index_entries=entries)
+        database.write_header("src/a.ccs", out, "json", payload, entries)
+        assert len(database.find_declarations("v")) == 2
+
+    def test_compressed_payload(self, database):
+        out = ccs_content("/src/c.hh")
+        payload = ccs_format.encode_ccs(out, compress="zlib")
+        entries = collect_entries(out["translation_unit"])
+        assert [(x.name, x.pointer, x.offset) for x in entries] == [
+                (None, 1, None),
+                ("v", 5, None)
+                ]
+        database.write_header("src/c.ccs", out, "json", payload, entries)
+        found = database.find_declarations("v", "VarDecl")
+        assert sorted(x[0] for x in found) == [
+                "other/src/a.ccs",
+                "src/a.ccs",
+                "src/c.ccs"
+                ]
+        assert dict(found)["src/c.ccs"]["content"]["decl"]["pointer"] == 5
+
+    def test_reader(self, tmp_path, database):
+        reader = CcsDbReader(database.path)
+        assert reader.find_ccs("other/src/a.ccs") == "other/src/a.ccs"
+        found = reader.find_declarations("v", "VarDecl")
+        assert sorted(x[0] for x in found) == ["other/src/a.ccs", "src/a.ccs"]
+        assert found[0][1]["content"]["id"]["name"] == "v"
+        header = reader.open_header("src/a.ccs")
+        assert header.file_loaded
+        assert header.file == "/src/a.hh"
+        assert [x.file for x in header.includes] == ["/src/b.hh"]
+        reader.close()
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    db = ShardedCcmDatabase(str(tmp_path / "ccm"), 4)
+    for idx in range(8):
+        key = f"src/f{idx}.ccs"
+        entries = []
+        out = ccs_content(f"/src/f{idx}.hh")
+        out["translation_unit"]["content"]["main_context"]["declarations"][0][
+                "content"]["id"] = {"name": f"v{idx}", "qual_name": [f"v{idx}"]}
+        payload = ccs_format.encode_ccs(out, index_entries=entries)
+        db.write_header(key, out, "json", payload, entries)
+    yield db
+    db.close()
+
+
+class TestShardedCcmDatabase(object):
+
+    def test_layout(self, sharded):
+        assert len(sharded.catalogue()) == 8
+        for key in sharded.catalogue():
+            shard = shard_for(key, 4)
+            assert sharded.shard(shard).payload(key) is not None
+            assert sharded.symbols.shard_of(key) == shard
+        with pytest.raises(CcmDatabaseError):
+            ShardedCcmDatabase(sharded.path, 2)
+        assert ShardedCcmDatabase(sharded.path).n_shards == 4
+
+    def test_lookup_opens_one_shard(self, sharded):
+        reopened = ShardedCcmDatabase(sharded.path)
+        found = reopened.find_declarations("v3", "VarDecl")
+        assert [x[0] for x in found] == ["src/f3.ccs"]
+        assert found[0][1]["content"]["id"]["name"] == "v3"
+        assert list(reopened._shards) == [shard_for("src/f3.ccs", 4)]
+        reopened.close()
+
+    def test_incremental_update(self, sharded):
+        out = ccs_content("/src/f3.hh")
+        entries = []
+        payload = ccs_format.encode_ccs(out, index_entries=entries)
+        sharded.write_header("src/f3.ccs", out, "json", payload, entries)
+        assert sharded.find_declarations("v3") == []
+        assert [x[0] for x in sharded.find_declarations("v")] == [
+                "src/f3.ccs"
+                ]
+        sharded.remove_header("src/f3.ccs")
+        assert sharded.find_declarations("v") == []
+        assert "src/f3.ccs" not in sharded.catalogue()
+
+    def test_compressed_payload(self, sharded):
+        out = ccs_content("/src/c.hh")
+        payload = ccs_format.encode_ccs(out, compress="zlib")
+        entries = collect_entries(out["translation_unit"])
+        sharded.write_header("src/c.ccs", out, "json", payload, entries)
+        found = sharded.find_declarations("v", "VarDecl")
+        assert [x[0] for x in found] == ["src/c.ccs"]
+        assert found[0][1]["content"]["id"]["name"] == "v"
+
+    def test_reader(self, sharded):
+        reader = CcsDbReader(sharded.path)
+        assert reader.find_ccs("f5.ccs") == "src/f5.ccs"
+        header = reader.open_header("src/f5.ccs")
+        assert header.file == "/src/f5.hh"
+        assert [x.file for x in header.includes] == ["/src/b.hh"]
+        reader.close()
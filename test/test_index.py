@@ -0,0 +1,159 @@
+import orjson as json
+import pytest
+
+from ccmodel.code_models.variants import BuiltinType, VarDecl
+from ccmodel.reader import IndexedCcsReader
+from ccmodel.storage import ccs_format
+from ccmodel.storage.index import (
+    CcsIndexError,
+    IndexedEncoder,
+    encode_index,
+    index_path
+)
+from .test_lazy import context, var
+
+
+def named_decl(kind: str, ptr: int, qual_name: list, children: list) -> dict:
+    return {
+            "kind": kind,
+            "content": {
+                "skipped": False,
+                "named_decl": {
+                    "decl": {"pointer": ptr, "parent_pointer": 1},
+                    "id": {"name": qual_name[0], "qual_name": qual_name}
+                    },
+                "type_pointer": 30,
+                "context": {"declarations": children}
+                }
+            }
+
+
+def ccs_content() -> dict:
+    field = named_decl("FieldDecl", 12, ["x", "A", "ns"], [])
+    record = named_decl("CXXRecordDecl", 11, ["A", "ns"], [field])
+    namespace = named_decl("NamespaceDecl", 10, ["ns"], [record])
+    return {
+            "file": "/src/a.hh",
+            "includes": [],
+            "m_time": 0.0,
+            "translation_unit": {
+                "kind": "TranslationUnitDecl",
+                "content": {
+                    "main_context": {"declarations": [namespace]},
+                    "referenced_types": [
+                        {
+                            "kind": "BuiltinType",
+                            "content": {"type": {"pointer": 30}}
+                            }
+                        ],
+                    "referenced_decls": [],
+                    "pointer": 1
+                    }
+                }
+            }
+
+
+def write_indexed(path: str, content: dict, fmt: str) -> str:
+    entries = []
+    data = ccs_format.encode_ccs(content, fmt, index_entries=entries)
+    with open(path, "wb") as ccs_file:
+        ccs_file.write(data)
+    with open(index_path(path), "wb") as idx_file:
+        idx_file.write(encode_index(entries, len(data)))
+    return path
+
+
+@pytest.fixture(params=ccs_format.formats)
+def indexed_ccs(request, tmp_path):
+    return write_indexed(
+            str(tmp_path / "a.ccs"),
+            ccs_content(),
+            request.param
+            )
+
+
+class TestIndex(object):
+
+    def test_encoder_matches_orjson(self):
+        value = ccs_content()
+        encoder = IndexedEncoder()
+        assert json.loads(encoder.encode(value)) == value
+        names = sorted(x[1] for x in encoder.entries if x[1] is not None)
+        assert names == ["ns", "ns::A", "ns::A::x"]
+
+    def test_encoder_without_leading_kind(self):
+        value = ccs_content()
+        record = value["translation_unit"]["content"]["main_context"][
+                "declarations"][0]["content"]["context"]["declarations"][0]
+        kind = record.pop("kind")
+        record["kind"] = kind
+        encoder = IndexedEncoder()
+        data = encoder.encode(value)
+        assert json.loads(data) == value
+        # Offsets are searched for when a node does not open with its kind.
+        for entry in encoder.entries:
+            assert json.loads(
+                    data[entry.offset:entry.offset + entry.length]
+                    )["kind"] == entry.kind
+
+    def test_lookup(self, indexed_ccs):
+        reader = IndexedCcsReader(indexed_ccs)
+        found = reader.find("ns::A")
+        assert len(found) == 1
+        assert found[0]["kind"] == "CXXRecordDecl"
+        assert reader.find("ns::B") == []
+        assert reader.find_pointer(12)["kind"] == "FieldDecl"
+        assert reader.find_pointer(30)["kind"] == "BuiltinType"
+        reader.close()
+
+    def test_referenced(self, indexed_ccs):
+        reader = IndexedCcsReader(indexed_ccs)
+        ranges = reader.index.by_name("ns::A")
+        nodes = [reader._decode(*x) for x in ranges]
+        # The field inside the record is not decoded a second time.
+        assert list(reader.referenced(ranges, nodes)) == [30]
+        reader.close()
+
+    def test_qual_type_spelling_is_not_followed(self, indexed_ccs):
+        reader = IndexedCcsReader(indexed_ccs)
+        # Interned, the spelling of a qualified type is an int too; 12 would
+        # be the field if it were taken for a pointer.
+        node = {"type_pointer": 30, "type": 12, "canonical": 12}
+        assert list(reader.referenced([], [node])) == [30]
+        reader.close()
+
+    def test_out_of_date_index(self, indexed_ccs):
+        with open(indexed_ccs, "ab") as ccs_file:
+            ccs_file.write(b" ")
+        with pytest.raises(CcsIndexError):
+            IndexedCcsReader(indexed_ccs)
+
+    @pytest.mark.parametrize("fmt", ccs_format.formats)
+    def test_load(self, tmp_path, fmt):
+        content = ccs_content()
+        content["translation_unit"]["content"] = {
+                "skipped": False,
+                "main_context": context(1, [var(3, 1, ["x"])]),
+                "integer_type_widths": {},
+                "referenced_decls": [],
+                "referenced_types": [
+                    {
+                        "kind": "BuiltinType",
+                        "clang_kind": "Builtin",
+                        "content": {
+                            "skipped": False,
+                            "type": {"pointer": 9, "desugared_type": "None"},
+                            "type_name": "int"
+                            }
+                        }
+                    ],
+                "pointer": 1
+                }
+        path = write_indexed(str(tmp_path / "a.ccs"), content, fmt)
+        reader = IndexedCcsReader(path)
+        out = reader.load("x")
+        assert len(out) == 1
+        assert isinstance(out[0], VarDecl)
+        assert isinstance(out[0].type_object, BuiltinType)
+        assert reader.load("y") == []
+        reader.close()
@@ -0,0 +1,203 @@
+import json
+
+from ccmodel.code_models.variants import (
+    IntegerLiteral,
+    MemberExpr,
+    NamespaceDecl,
+    VarDecl
+)
+from ccmodel.reader import CcsReader
+
+from .test_lazy import context, named_decl, var
+
+location = {
+        "file": "/src/a.cc",
+        "begin": {"line": 1, "column": 1},
+        "end": {"line": 1, "column": 8}
+        }
+int_type = {
+        "type_pointer": 9,
+        "type": "int",
+        "canonical": "int",
+        "is_const": False,
+        "is_restrict": False,
+        "is_volatile": False
+        }
+
+
+def expr(ptr: int, children: list) -> dict:
+    return {
+            "pointer": ptr,
+            "location": location,
+            "content": children,
+            "expr": {
+                "qual_type": int_type,
+                "value_kind": "LValue",
+                "object_kind": "Ordinary"
+                }
+            }
+
+
+def member_chain(ptr: int, depth: int) -> dict:
+    # a.m.m.m..., built from the inside out like clang nests it.
+    out = {
+            "kind": "IntegerLiteral",
+            "clang_kind": "IntegerLiteral",
+            "content": {
+                "skipped": False,
+                "expr": expr(ptr, []),
+                "value": {"is_signed": True, "bitwidth": 32, "value": "0"}
+                }
+            }
+    for idx in range(1, depth):
+        out = {
+                "kind": "MemberExpr",
+                "clang_kind": "MemberExpr",
+                "content": {
+                    "skipped": False,
+                    "expr": expr(ptr + idx, [out]),
+                    "is_arrow": False,
+                    "performs_virtual_dispatch": False,
+                    "id": {"name": "m", "qual_name": ["m"]},
+                    "decl_ref": "None"
+                    }
+                }
+    return out
+
+
+def nested_namespaces(depth: int, chain: int) -> dict:
+    ptr = 10
+    qual_name = [f"ns{x}" for x in reversed(range(depth))]
+    inner = var(ptr, ptr + 1, ["x", *qual_name])
+    inner["content"]["init_expr"] = member_chain(100000, chain)
+    for level in reversed(range(depth)):
+        ptr += 1
+        inner = {
+                "kind": "NamespaceDecl",
+                "clang_kind": "Namespace",
+                "content": {
+                    "skipped": False,
+                    "named_decl": named_decl(
+                        ptr,
+                        ptr + 1 if level else 1,
+                        qual_name[-level - 1:]
+                        ),
+                    "context": context(
+                        ptr,
+                        [
+                            inner,
+                            var(
+                                ptr + 50000,
+                                ptr,
+                                ["y", *qual_name[-level - 1:]]
+                                )
+                            ]
+                        ),
+                    "is_inline": False,
+                    "original_namespace": "None"
+                    }
+                }
+    return inner
+
+
+def write_ccs(out_dir, depth: int, chain: int) -> str:
+    # Written with the standard encoder, since orjson refuses to encode
+    # trees nested as deeply as it will still decode.
+    out = {
+            "file": "/src/a.cc",
+            "includes": [],
+            "m_time": 0.0,
+            "translation_unit": {
+                "kind": "TranslationUnitDecl",
+                "clang_kind": "TranslationUnit",
+                "content": {
+                    "skipped": False,
+                    "main_context": context(
+                        1,
+                        [nested_namespaces(depth, chain), var(2, 1, ["z"])]
+                        ),
+                    "integer_type_widths": {},
+                    "referenced_decls": [],
+                    "referenced_types": [
+                        {
+                            "kind": "BuiltinType",
+                            "clang_kind": "Builtin",
+                            "content": {
+                                "skipped": False,
+                                "type": {
+                                    "pointer": 9,
+                                    "desugared_type": "None"
+                                    },
+                                "type_name": "int"
+                                }
+                            }
+                        ],
+                    "pointer": 1
+                    }
+                }
+            }
+    (out_dir / "a.ccs").write_text(json.dumps(out))
+    return str(out_dir)
+
+
+def innermost(header, depth: int):
+    qual_id = "::".join(f"ns{x}" for x in range(depth))
+    return header._all_ids[f"{qual_id}::x"]
+
+
+def id_kinds(header) -> dict:
+    return {x: type(y).__name__ for x, y in header._all_ids.items()}
+
+
+class TestIterativeLoad(object):
+
+    def test_matches_recursive(self, tmp_path):
+        out_dir = write_ccs(tmp_path, 4, 6)
+        recursive = CcsReader(out_dir).read("a.ccs")
+        iterative = CcsReader(out_dir, iterative=True).read("a.ccs")
+        assert iterative.ls(False) == recursive.ls(False)
+        assert id_kinds(iterative) == id_kinds(recursive)
+        for header in (recursive, iterative):
+            x = innermost(header, 4)
+            assert [type(y).__name__ for y in x._parent.declarations] == [
+                    "VarDecl",
+                    "VarDecl"
+                    ]
+            node = x.init_expr
+            kinds = []
+            while node is not None:
+                kinds.append(node.kind)
+                assert node.pointer == 100000 + 6 - len(kinds)
+                child = node.content[0] if len(node.content) else None
+                assert child is None or child._parent is node
+                node = child
+            assert kinds == ["MemberExpr"] * 5 + ["IntegerLiteral"]
+
+    def test_deep_nesting(self, tmp_path):
+        out_dir = write_ccs(tmp_path, 60, 150)
+        header = CcsReader(out_dir, iterative=True).read("a.ccs")
+        assert isinstance(header["z"], VarDecl)
+        for level in range(60):
+            qual_id = "::".join(f"ns{x}" for x in range(level + 1))
+            namespace = header._all_ids[qual_id]
+            assert isinstance(namespace, NamespaceDecl)
+            name = "x" if level == 59 else f"ns{level + 1}"
+            inner = header._all_ids[f"{qual_id}::{name}"]
+            assert type(inner) is (VarDecl if level == 59 else NamespaceDecl)
+            y = header._all_ids[f"{qual_id}::y"]
+            assert isinstance(y, VarDecl)
+            assert namespace.declarations == [inner, y]
+
+        x = innermost(header, 60)
+        node = x.init_expr
+        assert node._parent is x
+        length = 0
+        while isinstance(node, MemberExpr):
+            assert node.pointer == 100000 + 149 - length
+            child = node.content[0]
+            assert child._parent is node
+            node = child
+            length += 1
+        assert length == 149
+        assert isinstance(node, IntegerLiteral)
+        assert node.pointer == 100000
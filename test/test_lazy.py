@@ -0,0 +1,146 @@
+import pytest
+
+from ccmodel.code_models.variants import BuiltinType, NamespaceDecl
+from ccmodel.reader import CcsReader
+from ccmodel.storage import ccs_format
+
+
+def named_decl(ptr: int, parent_ptr: int, qual_name: list) -> dict:
+    return {
+            "decl": {
+                "skipped": False,
+                "pointer": ptr,
+                "parent_pointer": parent_ptr,
+                "location": {
+                    "file": "/src/a.cc",
+                    "begin": {"line": 1, "column": 1},
+                    "end": {"line": 1, "column": 8}
+                    },
+                "owning_module": "None",
+                "is_hidden": False,
+                "is_implicit": False,
+                "is_used": False,
+                "is_this_declaration_referenced": False,
+                "is_invalid_decl": False,
+                "attributes": [],
+                "full_comment": "None",
+                "access_specifier": "none"
+                },
+            "id": {"name": qual_name[0], "qual_name": qual_name}
+            }
+
+
+def context(ptr: int, declarations: list) -> dict:
+    return {
+            "skipped": False,
+            "c_linkage": False,
+            "has_external_lexical_storage": False,
+            "has_external_visible_storage": False,
+            "declarations": declarations,
+            "pointer": ptr
+            }
+
+
+def var(ptr: int, parent_ptr: int, qual_name: list) -> dict:
+    return {
+            "kind": "VarDecl",
+            "clang_kind": "Var",
+            "content": {
+                "skipped": False,
+                "value_decl": {
+                    "named_decl": named_decl(ptr, parent_ptr, qual_name),
+                    "qualified_type": {
+                        "type_pointer": 9,
+                        "type": "int",
+                        "canonical": "int",
+                        "is_const": False,
+                        "is_restrict": False,
+                        "is_volatile": False
+                        }
+                    },
+                "is_global": True,
+                "is_extern": False,
+                "is_static": False,
+                "is_static_local": False,
+                "is_static_data_member": False,
+                "is_const_expr": False,
+                "is_init_ice": False,
+                "has_default": False,
+                "init_expr": "None",
+                "is_init_expr_cxx11_constant": False,
+                "parm_index_in_function": -1
+                }
+            }
+
+
+@pytest.fixture
+def out_dir(tmp_path):
+    namespace = {
+            "kind": "NamespaceDecl",
+            "clang_kind": "Namespace",
+            "content": {
+                "skipped": False,
+                "named_decl": named_decl(2, 1, ["ns"]),
+                "context": context(2, [var(3, 2, ["x", "ns"])]),
+                "is_inline": False,
+                "original_namespace": "None"
+                }
+            }
+    out = {
+            "file": "/src/a.cc",
+            "includes": [],
+            "m_time": 0.0,
+            "translation_unit": {
+                "kind": "TranslationUnitDecl",
+                "clang_kind": "TranslationUnit",
+                "content": {
+                    "skipped": False,
+                    "main_context": context(1, [namespace, var(4, 1, ["y"])]),
+                    "integer_type_widths": {},
+                    "referenced_decls": [],
+                    "referenced_types": [
+                        {
+                            "kind": "BuiltinType",
+                            "clang_kind": "Builtin",
+                            "content": {
+                                "skipped": False,
+                                "type": {
+                                    "pointer": 9,
+                                    "desugared_type": "None"
+                                    },
+                                "type_name": "int"
+                                }
+                            }
+                        ],
+                    "pointer": 1
+                    }
+                }
+            }
+    (tmp_path / "a.ccs").write_bytes(ccs_format.encode_ccs(out, "json"))
+    return str(tmp_path)
+
+
+class TestLazyContexts(object):
+
+    def test_materialize_on_access(self, out_dir):
+        header = CcsReader(out_dir, lazy=True).read("a.ccs")
+        namespace = header["ns"]
+        assert isinstance(namespace, NamespaceDecl)
+        assert isinstance(header["y"].type_object, BuiltinType)
+        assert namespace._pending_declarations is not None
+        assert "ns::x" not in header.ls(False)
+
+        # Pointers resolve against the header's own map, which the reader
+        # has already cleared from the module globals.
+        x = namespace["x"]
+        assert isinstance(x.type_object, BuiltinType)
+        assert namespace._pending_declarations is None
+        assert namespace.variables == [x]
+        assert "ns::x" in header.ls(False)
+
+    def test_matches_eager(self, out_dir):
+        eager = CcsReader(out_dir).read("a.ccs")
+        lazy = CcsReader(out_dir, lazy=True).read("a.ccs")
+        assert eager["ns"]._pending_declarations is None
+        lazy["ns"].declarations
+        assert sorted(lazy.ls(False)) == sorted(eager.ls(False))
@@ -0,0 +1,32 @@
+import multiprocessing
+
+from ccmodel.utils.locks import FileLock, lock_path
+
+
+def try_lock(path: str, queue: multiprocessing.Queue) -> None:
+    lock = FileLock(path)
+    queue.put(lock.acquire(blocking=False))
+    lock.release()
+    return
+
+
+def locked_elsewhere(path: str) -> bool:
+    queue = multiprocessing.Queue()
+    proc = multiprocessing.Process(target=try_lock, args=(path, queue))
+    proc.start()
+    proc.join()
+    return not queue.get()
+
+
+class TestFileLock(object):
+
+    def test_lock_path(self):
+        assert lock_path("/out/src/a.ccs") == "/out/src/a.lock"
+
+    def test_exclusive(self, tmp_path):
+        path = str(tmp_path / "a.lock")
+        with FileLock(path) as lock:
+            assert lock.held
+            assert locked_elsewhere(path)
+        assert not lock.held
+        assert not locked_elsewhere(path)
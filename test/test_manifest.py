@@ -0,0 +1,172 @@
+import os
+import pytest
+
+import ccmodel.manifest as manifest_module
+from ccmodel.manifest import CcmManifest, args_hash, file_hash
+from ccmodel.storage import ccs_format
+import ccmodel.__config__.ccmodel_config as ccmodel_config
+
+
+@pytest.fixture
+def project(tmp_path):
+    src = tmp_path / "a.cc"
+    hdr = tmp_path / "a.hh"
+    out_dir = tmp_path / "ccm"
+    src.write_text('#include "a.hh"\n')
+    hdr.write_text("int a;\n")
+    out_dir.mkdir()
+    (out_dir / "a.ccs").write_bytes(b"{}")
+    return str(src), str(hdr), str(out_dir)
+
+
+def record(manifest: CcmManifest, src: str, hdr: str) -> None:
+    manifest.update(
+            src,
+            {
+                "ccs": "a.ccs",
+                "m_time": os.path.getmtime(src),
+                "includes": [],
+                "dependencies": {
+                    hdr: {
+                        "m_time": os.path.getmtime(hdr),
+                        "hash": "",
+                        }
+                    }
+                }
+            )
+    return
+
+
+class TestCcmManifest(object):
+
+    def test_round_trip(self, project):
+        src, hdr, out_dir = project
+        manifest = CcmManifest(out_dir)
+        record(manifest, src, hdr)
+        manifest.save()
+        reloaded = CcmManifest(out_dir)
+        assert src in reloaded
+        assert reloaded.ccs_path(src) == os.path.join(out_dir, "a.ccs")
+        assert reloaded.stale_reason(src) is None
+
+    def test_missing_entry_is_stale(self, project):
+        src, _, out_dir = project
+        assert CcmManifest(out_dir).stale_reason(src) == "no manifest entry"
+
+    def test_changed_dependency_is_stale(self, project):
+        src, hdr, out_dir = project
+        manifest = CcmManifest(out_dir)
+        record(manifest, src, hdr)
+        with open(hdr, "a") as hdr_file:
+            hdr_file.write("int b;\n")
+        os.utime(hdr, (0, 0))
+        assert manifest.stale_reason(src).endswith("changed")
+
+    def test_touched_dependency_is_refreshed(self, project, monkeypatch):
+        src, hdr, out_dir = project
+        other = os.path.join(os.path.dirname(src), "b.cc")
+        with open(other, "w") as other_file:
+            other_file.write('#include "a.hh"\n')
+        manifest = CcmManifest(out_dir)
+        for source in (src, other):
+            record(manifest, source, hdr)
+            manifest[source]["dependencies"][hdr]["hash"] = file_hash(hdr)
+        manifest.save()
+        os.utime(hdr, (0, 0))
+        manifest = CcmManifest(out_dir)
+        checked = {}
+        assert manifest.stale_reason(src, checked) is None
+        assert manifest.stale_reason(other, checked) is None
+        manifest.save()
+
+        # Both entries carry the new time, so the next run does not hash.
+        hashed = []
+        monkeypatch.setattr(
+                manifest_module,
+                "file_hash",
+                lambda path: hashed.append(path) or ""
+                )
+        manifest = CcmManifest(out_dir)
+        for source in (src, other):
+            recorded = manifest[source]["dependencies"][hdr]
+            assert recorded["m_time"] == 0
+            assert recorded["size"] == os.path.getsize(hdr)
+            assert manifest.stale_reason(source) is None
+        assert hashed == []
+
+    def test_other_tool_version_is_dropped(self, project):
+        src, hdr, out_dir = project
+        manifest = CcmManifest(out_dir)
+        record(manifest, src, hdr)
+        manifest.entries[src]["tool_version"] = "-1"
+        assert manifest.stale_reason(src).startswith("built by")
+
+    def test_concurrent_saves_merge(self, project):
+        src, hdr, out_dir = project
+        first = CcmManifest(out_dir)
+        second = CcmManifest(out_dir)
+        record(first, src, hdr)
+        first.save()
+        record(second, hdr, hdr)
+        second.save()
+        assert src in second
+        merged = CcmManifest(out_dir)
+        assert src in merged and hdr in merged
+        first.remove(src)
+        first.save()
+        assert src not in CcmManifest(out_dir)
+        assert hdr in CcmManifest(out_dir)
+
+
+def write_binary(src: str, hdr: str, out_dir: str, clang_args: list) -> str:
+    path = os.path.join(out_dir, "a.ccs")
+    out = {
+            "file": src,
+            "includes": [],
+            "m_time": os.path.getmtime(src),
+            "dependencies": {
+                hdr: {"m_time": os.path.getmtime(hdr), "hash": file_hash(hdr)}
+                },
+            "tool_version": ccmodel_config.ccmodel_version,
+            "format": "binary",
+            "source_hash": file_hash(src),
+            "args_hash": args_hash(clang_args),
+            "translation_unit": {
+                "kind": "TranslationUnitDecl",
+                "content": {"referenced_types": [], "referenced_decls": []}
+                }
+            }
+    with open(path, "wb") as ccs_file:
+        ccs_file.write(ccs_format.encode_ccs(out, "binary"))
+    return path
+
+
+class TestCcsHeader(object):
+
+    def test_adopt(self, project):
+        src, hdr, out_dir = project
+        path = write_binary(src, hdr, out_dir, ["-DA"])
+        manifest = CcmManifest(out_dir)
+        assert not manifest.adopt(src, path, None, ["-DB"], "binary")
+        assert not manifest.adopt(src, path, None, ["-DA"], "json")
+        assert manifest.adopt(src, path, None, ["-DA"], "binary")
+        assert manifest.stale_reason(src, None, ["-DA"], "binary") is None
+        assert manifest[src]["dependencies"][hdr]["hash"] == file_hash(hdr)
+
+    def test_adopt_rejects_changed_source(self, project):
+        src, hdr, out_dir = project
+        path = write_binary(src, hdr, out_dir, [])
+        with open(src, "a") as src_file:
+            src_file.write("int b;\n")
+        assert not CcmManifest(out_dir).adopt(src, path, None, [], "binary")
+
+    def test_truncated_ccs_is_stale(self, project):
+        src, hdr, out_dir = project
+        path = write_binary(src, hdr, out_dir, [])
+        manifest = CcmManifest(out_dir)
+        assert manifest.adopt(src, path, None, [], "binary")
+        with open(path, "r+b") as ccs_file:
+            ccs_file.truncate(os.path.getsize(path) - 4)
+        assert manifest.stale_reason(src, None, [], "binary").startswith(
+                "unreadable .ccs"
+                )
@@ -0,0 +1,42 @@
+import orjson as json
+import pytest
+
+from ccmodel.utils.profiling import CcmProfile
+
+
+class TestCcmProfile(object):
+
+    def test_stages_and_files(self, tmp_path):
+        path = str(tmp_path / "profile.json")
+        profile = CcmProfile(path)
+        with profile.stage("convert", 2, include_stage=False) as record:
+            record["note"] = "x"
+        profile.add_file("a.cc", {"backend_time": 1.0, "read_bytes": 10})
+        profile.add_file("a.cc", {"decode_time": 0.5, "declarations": 3})
+        profile.add_file("b.cc", {"backend_time": 2.0, "read_bytes": 5})
+        profile.save(["ccm"])
+        with open(path, "rb") as profile_file:
+            data = json.loads(profile_file.read())
+        assert data["argv"] == ["ccm"]
+        assert len(data["stages"]) == 1
+        stage = data["stages"][0]
+        assert stage["stage"] == "convert"
+        assert stage["files"] == 2
+        assert stage["note"] == "x"
+        assert stage["wall_time"] >= 0.0
+        assert "cprofile" not in stage
+        assert data["files"]["a.cc"] == {
+                "backend_time": 1.0,
+                "read_bytes": 10,
+                "decode_time": 0.5,
+                "declarations": 3
+                }
+        assert data["totals"]["backend_time"] == 3.0
+        assert data["totals"]["read_bytes"] == 15
+
+    def test_cprofile_dump(self, tmp_path):
+        profile = CcmProfile(str(tmp_path / "profile.json"), True)
+        with profile.stage("check", 0):
+            sum(range(100))
+        assert profile.stages[0]["cprofile"].endswith("-000-check.prof")
+        assert (tmp_path / "profile-000-check.prof").exists()
@@ -0,0 +1,99 @@
+from ccmodel.storage.prune import path_kept, prune_translation_unit, stub_reason
+
+
+def decl(kind: str, ptr: int, file_: str, name: str, **content) -> dict:
+    return {
+            "kind": kind,
+            "clang_kind": kind[:-4],
+            "content": {
+                "skipped": False,
+                "named_decl": {
+                    "decl": {
+                        "pointer": ptr,
+                        "parent_pointer": 1,
+                        "location": {
+                            "file": file_,
+                            "begin": {"line": 1},
+                            "end": {"line": 1}
+                            }
+                        },
+                    "id": {"name": name, "qual_name": [name]}
+                    },
+                **content
+                }
+            }
+
+
+def translation_unit() -> dict:
+    system = "/usr/include/c++/9/string"
+    method = decl("CXXMethodDecl", 12, system, "size")
+    record = decl(
+            "CXXRecordDecl",
+            11,
+            system,
+            "string",
+            context={"declarations": [method]}
+            )
+    unused = decl("VarDecl", 13, system, "npos")
+    user = decl(
+            "FunctionDecl",
+            20,
+            "/src/a.cc",
+            "f",
+            call={"decl_pointer": 12}
+            )
+    return {
+            "kind": "TranslationUnitDecl",
+            "content": {
+                "main_context": {"declarations": [record, unused, user]},
+                "referenced_types": [
+                    {
+                        "kind": "RecordType",
+                        "content": {
+                            "type": {"pointer": 30},
+                            "decl_pointer": 11
+                            }
+                        }
+                    ],
+                "referenced_decls": [],
+                "pointer": 1
+                }
+            }
+
+
+class TestPrune(object):
+
+    def test_path_kept(self):
+        assert path_kept("/src/a.cc", [], ["/usr/*"])
+        assert not path_kept("/usr/include/a.h", [], ["/usr/*"])
+        assert not path_kept("/opt/a.h", ["/src/*"], [])
+        assert not path_kept("/src/gen/a.h", ["/src/*"], ["*/gen/*"])
+        assert path_kept(None, ["/src/*"], [])
+
+    def test_no_filters(self):
+        value = translation_unit()
+        assert prune_translation_unit(value, [], []) == (0, 0)
+        assert value == translation_unit()
+
+    def test_prune_with_stubs(self):
+        value = translation_unit()
+        assert prune_translation_unit(value, [], ["/usr/*"]) == (2, 2)
+        content = value["content"]
+        kept = content["main_context"]["declarations"]
+        assert [x["kind"] for x in kept] == ["FunctionDecl"]
+        stubs = content["referenced_decls"]
+        assert [x["content"]["pointer"] for x in stubs] == [12, 11]
+        assert stubs[0] == {
+                "kind": "CXXMethodDecl",
+                "clang_kind": "CXXMethod",
+                "content": {
+                    "skipped": True,
+                    "reason": stub_reason,
+                    "pointer": 12,
+                    "id": {"name": "size", "qual_name": ["size"]}
+                    }
+                }
+
+    def test_keep_path(self):
+        value = translation_unit()
+        assert prune_translation_unit(value, ["/src/*"], []) == (2, 2)
@@ -0,0 +1,92 @@
+from ccmodel.code_models.pointers import DensePointerMap
+from ccmodel.storage.renumber import renumber_pointers
+
+
+def translation_unit(base: int) -> dict:
+    return {
+            "kind": "TranslationUnitDecl",
+            "content": {
+                "pointer": base,
+                "main_context": {
+                    "declarations": [
+                        {
+                            "kind": "VarDecl",
+                            "content": {
+                                "decl": {
+                                    "pointer": base + 0x40,
+                                    "parent_pointer": base
+                                    },
+                                "type": {
+                                    "type_pointer": base + 0x80,
+                                    "type": "int"
+                                    }
+                                }
+                            },
+                        {
+                            "kind": "CXXRecordDecl",
+                            "content": {
+                                "decl": {
+                                    "pointer": base + 0xc0,
+                                    "parent_pointer": base,
+                                    "canonical_decl": base + 0xc0
+                                    },
+                                "definition_pointer": "None",
+                                "bases": [{"type": base + 0x80}]
+                                }
+                            }
+                        ]
+                    },
+                "referenced_types": [
+                    {
+                        "kind": "BuiltinType",
+                        "content": {
+                            "type": {
+                                "pointer": base + 0x80,
+                                "desugared_type": 0x7f0000
+                                }
+                            }
+                        }
+                    ]
+                }
+            }
+
+
+class TestRenumber(object):
+
+    def test_dense_ids(self):
+        value = translation_unit(0x55d4c8a1e000)
+        assert renumber_pointers(value) == 5
+        content = value["content"]
+        var, record = content["main_context"]["declarations"]
+        assert content["pointer"] == 0
+        assert var["content"]["decl"] == {"pointer": 1, "parent_pointer": 0}
+        assert var["content"]["type"]["type_pointer"] == 3
+        assert record["content"]["decl"]["canonical_decl"] == 2
+        assert record["content"]["definition_pointer"] == "None"
+        assert record["content"]["bases"] == [{"type": 3}]
+        builtin = content["referenced_types"][0]["content"]["type"]
+        assert builtin == {"pointer": 3, "desugared_type": 4}
+
+    def test_independent_of_addresses(self):
+        first = translation_unit(0x55d4c8a1e000)
+        second = translation_unit(0x7ffd00001000)
+        renumber_pointers(first)
+        renumber_pointers(second)
+        assert first == second
+
+    def test_dense_pointer_map(self):
+        pointer_map = DensePointerMap(2)
+        pointer_map[3] = "c"
+        pointer_map[0] = "a"
+        assert 0 in pointer_map
+        assert 1 not in pointer_map
+        assert 7 not in pointer_map
+        assert pointer_map[3] == "c"
+        assert pointer_map.get(1) is None
+        assert list(pointer_map.items()) == [(0, "a"), (3, "c")]
+        assert len(pointer_map) == 2
+        pointer_map[None] = "n"
+        assert None in pointer_map
+        assert "x" not in pointer_map
+        assert pointer_map[None] == "n"
+        assert list(pointer_map.values()) == ["a", "c", "n"]
@@ -0,0 +1,147 @@
+import copy
+import pytest
+
+import ccmodel.code_models.pointers as pointers
+from ccmodel.code_models.basic import Name, SourceRange
+from ccmodel.code_models.variants import QualType
+from ccmodel.reader import IndexedCcsReader, clear_pointers
+from ccmodel.storage import ccs_format
+from ccmodel.storage.index import IndexedEncoder, encode_index, index_path
+from ccmodel.storage.strings import (
+    intern_strings,
+    replace_none_sentinels,
+    resolve_strings
+)
+
+
+def location(line: int) -> dict:
+    return {
+            "file": "/src/a.hh",
+            "begin": {"line": line, "column": 1},
+            "end": {"line": line, "column": 9}
+            }
+
+
+def var_decl(ptr: int, qual_name: list, line: int) -> dict:
+    return {
+            "kind": "VarDecl",
+            "content": {
+                "decl": {"pointer": ptr, "location": location(line)},
+                "id": {"name": qual_name[0], "qual_name": qual_name},
+                "type": {
+                    "type_pointer": 30,
+                    "type": "const int",
+                    "canonical": "const int",
+                    "is_const": True,
+                    "is_restrict": False,
+                    "is_volatile": False
+                    }
+                }
+            }
+
+
+def translation_unit() -> dict:
+    return {
+            "kind": "TranslationUnitDecl",
+            "content": {
+                "main_context": {
+                    "declarations": [
+                        var_decl(10, ["a", "ns"], 1),
+                        var_decl(11, ["b", "ns"], 2),
+                        var_decl(12, ["None"], 3)
+                        ]
+                    },
+                "referenced_types": [],
+                "referenced_decls": [],
+                "pointer": 1
+                }
+            }
+
+
+@pytest.fixture
+def string_table():
+    yield
+    clear_pointers()
+
+
+class TestStringTable(object):
+
+    def test_intern_and_resolve(self):
+        value = translation_unit()
+        table = intern_strings(value)
+        assert sorted(table) == ["/src/a.hh", "a", "b", "const int", "ns"]
+        decl = value["content"]["main_context"]["declarations"][0]["content"]
+        assert decl["decl"]["location"]["file"] == table.index("/src/a.hh")
+        assert decl["type"]["type"] == decl["type"]["canonical"]
+        assert decl["id"]["qual_name"] == [table.index("a"), table.index("ns")]
+        third = value["content"]["main_context"]["declarations"][2]
+        assert third["content"]["id"]["name"] == "None"
+        assert resolve_strings(value, table) == translation_unit()
+
+    def test_replace_none_sentinels(self):
+        value = translation_unit()
+        decl = value["content"]["main_context"]["declarations"][0]["content"]
+        decl["type"]["canonical"] = "None"
+        decl["init_expr"] = "None"
+        assert replace_none_sentinels(value) is value
+        assert decl["type"]["canonical"] is None
+        assert decl["init_expr"] is None
+        # List items are names, not absent values.
+        third = value["content"]["main_context"]["declarations"][2]
+        assert third["content"]["id"]["qual_name"] == ["None"]
+        assert third["content"]["id"]["name"] is None
+        assert replace_none_sentinels(copy.deepcopy(value)) == value
+
+    def test_variants_resolve(self, string_table):
+        value = translation_unit()
+        pointers.string_table = intern_strings(value)
+        decl = value["content"]["main_context"]["declarations"][1]["content"]
+        assert SourceRange.load_json(decl["decl"]["location"]).file == (
+                "/src/a.hh"
+                )
+        name = Name.load_json(decl["id"])
+        assert name.name == "b"
+        assert name.write_qual_name() == "ns::b"
+        qual_type = QualType.load_json(decl["type"])
+        assert qual_type.type == "const int"
+        assert qual_type.canonical == "const int"
+
+    def test_index_names(self):
+        value = translation_unit()
+        table = intern_strings(value)
+        encoder = IndexedEncoder(table)
+        encoder.encode(value)
+        names = sorted(x.name for x in encoder.entries if x.name is not None)
+        assert names == ["None", "ns::a", "ns::b"]
+        assert set(
+                x.file for x in encoder.entries if x.name is not None
+                ) == {"/src/a.hh"}
+
+    @pytest.mark.parametrize("fmt", ccs_format.formats)
+    def test_indexed_reader(self, tmp_path, fmt):
+        out = {
+                "file": "/src/a.hh",
+                "includes": [],
+                "m_time": 0.0,
+                "translation_unit": translation_unit()
+                }
+        out["string_table"] = intern_strings(out["translation_unit"])
+        expected = copy.deepcopy(out)
+        entries = []
+        data = ccs_format.encode_ccs(out, fmt, index_entries=entries)
+        path = str(tmp_path / "a.ccs")
+        with open(path, "wb") as ccs_file:
+            ccs_file.write(data)
+        with open(index_path(path), "wb") as idx_file:
+            idx_file.write(
+                    encode_index(entries, len(data), out["string_table"])
+                    )
+        reader = IndexedCcsReader(path)
+        found = reader.find("ns::b")
+        assert found == [var_decl(11, ["b", "ns"], 2)]
+        reader.close()
+        loaded = ccs_format.CcsFile(path).load()
+        assert loaded["string_table"] == expected["string_table"]
+        assert loaded["translation_unit"]["content"]["main_context"] == (
+                expected["translation_unit"]["content"]["main_context"]
+                )
@@ -0,0 +1,104 @@
+import os
+import pytest
+
+import ccmodel.watcher as watcher_module
+from ccmodel.watcher import CcmWatcher
+
+
+class FakeClock(object):
+
+    # Stands in for time.monotonic and time.sleep; edits scheduled with at()
+    # land once the clock has been slept past their time.
+    def __init__(self):
+        self.now = 0.
+        self.sleeps = []
+        self._actions = []
+        return
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        due = [x for x in self._actions if x[0] <= self.now]
+        self._actions = [x for x in self._actions if x[0] > self.now]
+        for _, action in sorted(due, key=lambda x: x[0]):
+            action()
+        return
+
+    def at(self, when: float, action) -> None:
+        self._actions.append((when, action))
+        return
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    out = FakeClock()
+    monkeypatch.setattr(watcher_module.time, "monotonic", out.monotonic)
+    monkeypatch.setattr(watcher_module.time, "sleep", out.sleep)
+    return out
+
+
+@pytest.fixture
+def files(tmp_path):
+    out = []
+    for name in ("a.hh", "b.hh", "c.hh"):
+        path = tmp_path / name
+        path.write_text("int x;\n")
+        os.utime(path, (1, 1))
+        out.append(str(path))
+    return out
+
+
+def touch(path: str, m_time: float):
+    return lambda: os.utime(path, (m_time, m_time))
+
+
+def polling(settle_time: float) -> CcmWatcher:
+    return CcmWatcher(
+            poll_interval=1.,
+            settle_time=settle_time,
+            use_polling=True
+            )
+
+
+class TestPolling(object):
+
+    def test_reports_edited_file(self, clock, files):
+        a, b, c = files
+        watcher = polling(settle_time=2.)
+        watcher.watch([a, b])
+        clock.at(2.5, touch(a, 10))
+        clock.at(2.5, touch(c, 10))
+        assert watcher.wait() == {a}
+        assert watcher._observer is None
+        assert clock.sleeps == [1.] * 5
+        assert clock.now == 5.
+
+    def test_burst_settles_into_one_rebuild(self, clock, files):
+        a, b, c = files
+        watcher = polling(settle_time=2.)
+        watcher.watch(files)
+        clock.at(1.5, touch(a, 10))
+        clock.at(3.5, touch(b, 10))
+        clock.at(7., touch(c, 10))
+        # b lands within settle_time of a, c only after things were quiet.
+        assert watcher.wait() == {a, b}
+        assert clock.now == 6.
+        assert watcher.wait() == {c}
+        assert clock.now == 9.
+
+    def test_rewatch_keeps_snapshot(self, clock, files):
+        a, b, c = files
+        watcher = polling(settle_time=1.)
+        watcher.watch([a])
+        os.utime(a, (10, 10))
+        watcher.watch([a, b])
+        os.remove(b)
+        assert watcher.wait() == {a, b}
+        assert clock.now == 1.
+
+    def test_polls_without_watchdog(self, monkeypatch):
+        monkeypatch.setattr(watcher_module, "Observer", None)
+        assert CcmWatcher().use_polling